@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+# Ayarların kaydedileceği JSON dosyası
+SETTINGS_FILE = "settings.json"
+
+
+def load_settings():
+    if os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_settings(settings):
+    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, ensure_ascii=False, indent=4)
+
+
+# Zaman aralıklarının ayarların yanında saklandığı dosya (bkz. intervals.IntervalIndex)
+INTERVALS_FILE = "intervals.json"
+
+
+def load_intervals():
+    """Kaydedilmiş aralıkları döndürür; dosya yoksa boş dizin döner."""
+    from intervals import IntervalIndex
+    if os.path.exists(INTERVALS_FILE):
+        return IntervalIndex.load(INTERVALS_FILE)
+    return IntervalIndex()
+
+
+def save_intervals(intervals):
+    intervals.save(INTERVALS_FILE)
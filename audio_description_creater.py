@@ -3,213 +3,56 @@
 import wx
 import os
 import threading
-import pyttsx3
-import json
 from datetime import timedelta
-from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_audioclips, CompositeAudioClip
-import subprocess
-
-# "conversion" adlı bir dizin yoksa oluşturulur
-if not os.path.exists('conversion'):
-    os.makedirs('conversion')
-
-# Ayarların kaydedileceği JSON dosyası
-SETTINGS_FILE = "settings.json"
-
-
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-
-def save_settings(settings):
-    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(settings, f, ensure_ascii=False, indent=4)
-
-
-def parse_time(time_str):
-    hours, minutes, seconds_milliseconds = time_str.split(':')
-    seconds, milliseconds = seconds_milliseconds.split(',')
-    return timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds), milliseconds=int(milliseconds))
-
-
-def format_time(td):
-    total_seconds = int(td.total_seconds())
-    milliseconds = int(td.microseconds / 1000)
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    seconds = total_seconds % 60
-    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
-
-
-def parse_srt_file(srt_path):
-    with open(srt_path, 'r', encoding='utf-8') as f:
-        srt_content = f.read()
-    srt_blocks = list(filter(None, srt_content.split('\n\n')))
-    captions = []
-    for block in srt_blocks:
-        lines = block.strip().split('\n')
-        if len(lines) >= 3:
-            number = lines[0]
-            time_range = lines[1]
-            text_lines = lines[2:]
-            start_time_str, _, end_time_str = time_range.split()
-            start_time = parse_time(start_time_str)
-            end_time = parse_time(end_time_str)
-            captions.append({
-                'start': start_time,
-                'end': end_time,
-                'text': ' '.join(text_lines)
-            })
-    return captions
-
-
-def text_to_speech(text, filename, volume=1.0, rate=200, voice=None):
-    engine = pyttsx3.init()
-    if voice:
-        engine.setProperty('voice', voice)
-    engine.setProperty('volume', volume)
-    engine.setProperty('rate', rate)
-    engine.save_to_file(text, filename)
-    engine.runAndWait()
-    engine.stop()  # Motoru kapat
-
-
-def merge_audio_with_srt(video_path, srt_path, tts_volume=1.0, tts_rate=200, voice=None, output_format="mp4",
-                         video_volume=1.0, log_callback=None, volume_intervals=None):
-    captions = parse_srt_file(srt_path)
-    tts_files = []
-
-    if log_callback:
-        log_callback(f"SRT dosyasında toplam {len(captions)} altyazı bulundu.")
-
-    for index, entry in enumerate(captions):
-        text = entry['text']
-        audio_filename = os.path.join("conversion", f"temp_tts_{index}.wav")
-        # TTS ses seviyesini burada varsayılan olarak ayarlıyoruz
-        text_to_speech(text, audio_filename, 1.0, tts_rate, voice)
-        tts_audio = AudioFileClip(audio_filename)
-        tts_duration = tts_audio.duration
-        tts_audio.close()
-        tts_files.append({
-            'file': audio_filename,
-            'start': entry['start'].total_seconds(),
-            'duration': tts_duration
-        })
-        if log_callback:
-            log_callback(f"{index + 1}/{len(captions)}: '{text}' içeriği seslendirildi.")
-
-    video = VideoFileClip(video_path)
-    video_audio = video.audio
-
-    # Video sürelerini al - Otomatik algılama
-    video_duration = video.duration
-
-    # Tüm zaman noktalarını topla
-    times = set([0, video_duration])
-    for tts in tts_files:
-        times.add(tts['start'])
-        times.add(tts['start'] + tts['duration'])
-    if volume_intervals:
-        for interval in volume_intervals:
-            times.add(interval['start'])
-            times.add(interval['end'])
-    times = sorted(times)
-
-    # Zaman aralıklarını oluştur ve ses seviyelerini belirle
-    intervals = []
-    for i in range(len(times) - 1):
-        start = times[i]
-        end = times[i + 1]
-        # Varsayılan ses seviyelerini kullan
-        tts_vol = tts_volume
-        video_vol = video_volume
-        if volume_intervals:
-            for interval in volume_intervals:
-                if interval['start'] <= start < interval['end']:
-                    tts_vol = interval['tts_volume']
-                    video_vol = interval['video_volume']
-                    break
-        intervals.append({
-            'start': start,
-            'end': end,
-            'tts_volume': tts_vol,
-            'video_volume': video_vol
-        })
-
-    # Video sesini parçalarına ayır ve ses seviyesini ayarla
-    adjusted_video_audio_segments = []
-    for interval in intervals:
-        start = interval['start']
-        end = interval['end']
-        video_vol = interval['video_volume']
-        segment = video_audio.subclip(start, end).volumex(video_vol)
-        segment = segment.set_start(start)
-        adjusted_video_audio_segments.append(segment)
-
-    # TTS seslerini ayarla
-    adjusted_tts_audio_clips = []
-    tts_audio_clips = []  # TTS ses kliplerini saklamak için
-    for tts in tts_files:
-        tts_start = tts['start']
-        tts_duration = tts['duration']
-        tts_audio = AudioFileClip(tts['file'])
-        tts_audio_clips.append(tts_audio)  # Kapatmak için saklıyoruz
-        tts_end = tts_start + tts_duration
-        for interval in intervals:
-            interval_start = interval['start']
-            interval_end = interval['end']
-            tts_vol = interval['tts_volume']
-            # Çakışma kontrolü
-            overlap_start = max(tts_start, interval_start)
-            overlap_end = min(tts_end, interval_end)
-            if overlap_start < overlap_end:
-                # Çakışma var
-                tts_clip_start = overlap_start - tts_start
-                tts_clip_end = overlap_end - tts_start
-                if tts_clip_end > tts_duration:
-                    tts_clip_end = tts_duration
-                tts_clip = tts_audio.subclip(tts_clip_start, tts_clip_end)
-                tts_clip = tts_clip.volumex(tts_vol)
-                tts_clip = tts_clip.set_start(overlap_start)
-                adjusted_tts_audio_clips.append(tts_clip)
-
-    # Tüm sesleri birleştir
-    all_audio_clips = adjusted_video_audio_segments + adjusted_tts_audio_clips
-    final_audio = CompositeAudioClip(all_audio_clips)
-
-    # Final videoyu oluştur
-    final_video = video.set_audio(final_audio)
-
-    video_output_path = os.path.join("conversion", f"final_output.{output_format}")
-
-    # FFMPEG kullanarak videoyu kaydet
-    if output_format == "mp4":
-        final_video.write_videofile(video_output_path, codec='libx264', audio_codec='aac')
-    elif output_format == "mp3":
-        final_audio.fps = 44100  # Audio FPS ayarlanıyor
-        final_audio.write_audiofile(video_output_path, codec='mp3')
-
-    # Geçici TTS dosyalarını temizle
-    for tts in tts_files:
-        if os.path.exists(tts['file']):
-            os.remove(tts['file'])
-
-    # TTS ses kliplerini kapatın
-    for tts_audio in tts_audio_clips:
-        tts_audio.close()
-
-    # Video ve final video kliplerini kapatın
-    final_video.close()
-    video.close()
-    # final_audio.close()  # CompositeAudioClip'in close metodu yok
-
-    if log_callback:
-        log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
-
-    return video_output_path
+from app_settings import load_settings, save_settings, load_intervals, save_intervals
+from srt_parser import CaptionStore, parse_time_ms, format_time
+from intervals import IntervalIndex
+from tts_backends import BACKENDS, DEFAULT_BACKEND, get_backend
+from render import merge_audio_with_srt
+from media_probe import probe_media
+from progress import format_progress
+from checkpoint import CancelToken, RenderCancelled
+from loudness import loudness_index, suggest_intervals
+
+# Arayüzün günlük ve ilerleme çubuğunu güncelleme aralığı (ms); olaylar arada biriktirilir
+UI_REFRESH_MS = 200
+
+# Aralık içe/dışa aktarma dosya türleri; sıra dışa aktarmada eklenen uzantıyla aynıdır
+INTERVAL_WILDCARD = "JSON dosyaları (*.json)|*.json|CSV dosyaları (*.csv)|*.csv"
+INTERVAL_EXTENSIONS = ('.json', '.csv')
+
+
+class IntervalListCtrl(wx.ListCtrl):
+    """
+    Aralıkları intervals.IntervalIndex'ten okuyan sanal liste. Satırlar saklanmaz; yalnızca görünür
+    satırlar çizilirken biçimlenir, bu nedenle binlerce aralık listeyi yavaşlatmaz.
+    """
+
+    COLUMNS = ('start', 'end', 'tts_volume', 'video_volume')
+
+    def __init__(self, parent, intervals):
+        super(IntervalListCtrl, self).__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        self.InsertColumn(0, 'Başlangıç Zamanı')
+        self.InsertColumn(1, 'Bitiş Zamanı')
+        self.InsertColumn(2, 'TTS Ses Seviyesi (%)')
+        self.InsertColumn(3, 'Video Ses Seviyesi (%)')
+        self.set_intervals(intervals)
+
+    def OnGetItemText(self, item, column):
+        return str(self.intervals.row(item)[self.COLUMNS[column]])
+
+    def set_intervals(self, intervals, select=None):
+        """Dizin değiştikten sonra listeyi yeniler; select verilirse o satır seçilip görünür yapılır."""
+        self.intervals = intervals
+        selected = self.GetFirstSelected()
+        while selected != -1:
+            self.Select(selected, False)
+            selected = self.GetNextSelected(selected)
+        self.SetItemCount(len(intervals))
+        if select is not None:
+            self.Select(select)
+            self.EnsureVisible(select)
+        self.Refresh()
 
 
 class IntervalDialog(wx.Dialog):
@@ -267,7 +110,6 @@ class IntervalDialog(wx.Dialog):
 class AppFrame(wx.Frame):
     def __init__(self, *args, **kw):
         super(AppFrame, self).__init__(*args, **kw)
-        self.engine = pyttsx3.init()
         self.init_ui()
         self.load_previous_settings()
 
@@ -324,12 +166,9 @@ class AppFrame(wx.Frame):
     def init_tab2_ui(self):
         sizer = wx.BoxSizer(wx.VERTICAL)
 
-        # Zaman Aralığı Ayarları
-        self.intervalList = wx.ListCtrl(self.tab2, style=wx.LC_REPORT)
-        self.intervalList.InsertColumn(0, 'Başlangıç Zamanı')
-        self.intervalList.InsertColumn(1, 'Bitiş Zamanı')
-        self.intervalList.InsertColumn(2, 'TTS Ses Seviyesi (%)')
-        self.intervalList.InsertColumn(3, 'Video Ses Seviyesi (%)')
+        # Zaman Aralığı Ayarları; aralıklar dizinde tutulur, liste yalnızca gösterir
+        self.intervals = IntervalIndex()
+        self.intervalList = IntervalListCtrl(self.tab2, self.intervals)
         self.intervalList.Bind(wx.EVT_LIST_ITEM_RIGHT_CLICK, self.on_interval_right_click)
         sizer.Add(self.intervalList, 1, wx.EXPAND | wx.ALL, 5)
 
@@ -338,20 +177,56 @@ class AppFrame(wx.Frame):
         self.addIntervalBtn = wx.Button(self.tab2, label="Yeni Aralık Ekle")
         self.removeIntervalBtn = wx.Button(self.tab2, label="Seçili Aralığı Sil")
         self.editIntervalBtn = wx.Button(self.tab2, label="Seçili Aralığı Düzenle")
+        self.suggestIntervalsBtn = wx.Button(self.tab2, label="Aralıkları Öner")
         btn_sizer.Add(self.addIntervalBtn)
         btn_sizer.Add(self.removeIntervalBtn)
         btn_sizer.Add(self.editIntervalBtn)
+        btn_sizer.Add(self.suggestIntervalsBtn)
         sizer.Add(btn_sizer, 0, wx.ALIGN_CENTER)
 
+        # Toplu içe/dışa aktarma (JSON veya CSV)
+        io_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.importIntervalsBtn = wx.Button(self.tab2, label="Aralıkları İçe Aktar")
+        self.exportIntervalsBtn = wx.Button(self.tab2, label="Aralıkları Dışa Aktar")
+        io_sizer.Add(self.importIntervalsBtn)
+        io_sizer.Add(self.exportIntervalsBtn)
+        sizer.Add(io_sizer, 0, wx.ALIGN_CENTER | wx.TOP, 5)
+        self.importIntervalsBtn.Bind(wx.EVT_BUTTON, self.on_import_intervals)
+        self.exportIntervalsBtn.Bind(wx.EVT_BUTTON, self.on_export_intervals)
+
         self.addIntervalBtn.Bind(wx.EVT_BUTTON, self.on_add_interval)
         self.removeIntervalBtn.Bind(wx.EVT_BUTTON, self.on_remove_interval)
         self.editIntervalBtn.Bind(wx.EVT_BUTTON, self.on_edit_interval)
+        self.suggestIntervalsBtn.Bind(wx.EVT_BUTTON, self.on_suggest_intervals)
+
+        # Önizleme: yalnızca seçili aralığın veya altyazının çevresi render edilir
+        preview_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.previewIntervalBtn = wx.Button(self.tab2, label="Seçili Aralığı Önizle")
+        self.previewCaptionLabel = wx.StaticText(self.tab2, label="Altyazı No:")
+        self.previewCaptionCtrl = wx.SpinCtrl(self.tab2, value="1", min=1, max=1)
+        self.previewCaptionBtn = wx.Button(self.tab2, label="Altyazıyı Önizle")
+        preview_sizer.Add(self.previewIntervalBtn)
+        preview_sizer.Add(self.previewCaptionLabel, 0, wx.ALL | wx.CENTER, 5)
+        preview_sizer.Add(self.previewCaptionCtrl)
+        preview_sizer.Add(self.previewCaptionBtn)
+        sizer.Add(preview_sizer, 0, wx.ALIGN_CENTER | wx.TOP, 5)
+
+        self.previewIntervalBtn.Bind(wx.EVT_BUTTON, self.on_preview_interval)
+        self.previewCaptionBtn.Bind(wx.EVT_BUTTON, self.on_preview_caption)
 
         self.tab2.SetSizer(sizer)
 
     def init_tab3_ui(self):
         sizer = wx.BoxSizer(wx.VERTICAL)
 
+        # Seslendirme arka ucu; ses listesi seçilen arka uca göre doldurulur
+        self.backendLabel = wx.StaticText(self.tab3, label="TTS Motoru:")
+        sizer.Add(self.backendLabel, 0, flag=wx.EXPAND)
+        self.backendComboBox = wx.ComboBox(self.tab3, choices=sorted(BACKENDS), value=DEFAULT_BACKEND,
+                                           style=wx.CB_READONLY)
+        self.backendComboBox.Bind(wx.EVT_COMBOBOX, self.on_choose_backend)
+        sizer.Add(self.backendComboBox, 0, flag=wx.EXPAND)
+
         self.voiceLabel = wx.StaticText(self.tab3, label="Ses Seçimi:")
         sizer.Add(self.voiceLabel, 0, flag=wx.EXPAND)
         self.voiceComboBox = wx.ComboBox(self.tab3, choices=self.get_voice_names())
@@ -373,6 +248,28 @@ class AppFrame(wx.Frame):
         self.videoVolumeSlider = wx.Slider(self.tab3, value=100, minValue=0, maxValue=200)
         sizer.Add(self.videoVolumeSlider, 0, flag=wx.EXPAND)
 
+        # Anlatım sırasında otomatik kısma; zaman aralıkları istisna olarak geçerli kalır
+        self.duckingCheckBox = wx.CheckBox(self.tab3, label="Anlatım Sırasında Video Sesini Otomatik Kıs")
+        sizer.Add(self.duckingCheckBox, 0, flag=wx.EXPAND)
+        self.duckDepthLabel = wx.StaticText(self.tab3, label="Kısma Miktarı (dB):")
+        sizer.Add(self.duckDepthLabel, 0, flag=wx.EXPAND)
+        self.duckDepthCtrl = wx.SpinCtrl(self.tab3, min=1, max=60, initial=12)
+        sizer.Add(self.duckDepthCtrl, 0, flag=wx.EXPAND)
+        self.duckAttackLabel = wx.StaticText(self.tab3, label="Kısma Başlangıç Süresi (ms):")
+        sizer.Add(self.duckAttackLabel, 0, flag=wx.EXPAND)
+        self.duckAttackCtrl = wx.SpinCtrl(self.tab3, min=0, max=5000, initial=300)
+        sizer.Add(self.duckAttackCtrl, 0, flag=wx.EXPAND)
+        self.duckReleaseLabel = wx.StaticText(self.tab3, label="Kısma Bitiş Süresi (ms):")
+        sizer.Add(self.duckReleaseLabel, 0, flag=wx.EXPAND)
+        self.duckReleaseCtrl = wx.SpinCtrl(self.tab3, min=0, max=5000, initial=500)
+        sizer.Add(self.duckReleaseCtrl, 0, flag=wx.EXPAND)
+
+        # Paralel seslendirme için işçi süreç sayısı
+        self.ttsWorkersLabel = wx.StaticText(self.tab3, label="Paralel TTS İşçi Sayısı:")
+        sizer.Add(self.ttsWorkersLabel, 0, flag=wx.EXPAND)
+        self.ttsWorkersCtrl = wx.SpinCtrl(self.tab3, min=1, max=os.cpu_count() or 1, initial=1)
+        sizer.Add(self.ttsWorkersCtrl, 0, flag=wx.EXPAND)
+
         # Çıkış Formatı Seçimi
         self.outputFormatLabel = wx.StaticText(self.tab3, label="Çıkış Formatı:")
         sizer.Add(self.outputFormatLabel, 0, flag=wx.EXPAND)
@@ -393,33 +290,90 @@ class AppFrame(wx.Frame):
 
     def init_tab4_ui(self):
         sizer = wx.BoxSizer(wx.VERTICAL)
+        self.progressLabel = wx.StaticText(self.tab4, label="")
+        sizer.Add(self.progressLabel, 0, flag=wx.EXPAND)
+        self.progressGauge = wx.Gauge(self.tab4, range=1000)
+        sizer.Add(self.progressGauge, 0, flag=wx.EXPAND)
         self.logTextCtrl = wx.TextCtrl(self.tab4, style=wx.TE_MULTILINE | wx.TE_READONLY)
         sizer.Add(self.logTextCtrl, 1, flag=wx.EXPAND)
+
+        # İptal Et
+        self.cancelBtn = wx.Button(self.tab4, label="İptal Et")
+        self.cancelBtn.Bind(wx.EVT_BUTTON, self.on_cancel_processing)
+        self.cancelBtn.Disable()
+        sizer.Add(self.cancelBtn, 0, flag=wx.EXPAND)
         self.tab4.SetSizer(sizer)
 
+        # Çalışan render'ın iptal işareti; pencere kapatılırken de kullanılır
+        self.cancel_token = None
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
+        # Render'lar kontrol noktasıyla çalışır; kapanan veya iptal edilen render aynı ayarlarla kaldığı yerden sürer.
+        # settings.json'daki "checkpoint": false ile kapatılabilir
+        self.checkpoint = True
+
+        # İşlem iş parçacığı günlük satırlarını ve ilerleme olaylarını biriktirir; zamanlayıcı bunları toplu uygular
+        self.ui_lock = threading.Lock()
+        self.pending_log = []
+        self.pending_progress = None
+        self.uiTimer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_ui_timer, self.uiTimer)
+        self.uiTimer.Start(UI_REFRESH_MS)
+
     def load_previous_settings(self):
+        # Aralıklar ayarların yanında ayrı dosyada saklanır; bozuk dosya ayarların yüklenmesini engellemez
+        try:
+            self.set_intervals(load_intervals())
+        except (OSError, ValueError, KeyError) as e:
+            self.log_message(f"Kaydedilmiş aralıklar yüklenemedi: {e}")
         settings = load_settings()
         if settings:
+            if settings.get('tts_backend') in BACKENDS:
+                self.backendComboBox.SetValue(settings['tts_backend'])
+                self.voiceComboBox.Set(self.get_voice_names())
             self.voiceComboBox.SetValue(settings.get('voice', ''))
             self.outputFormatComboBox.SetValue(settings.get('output_format', 'mp4'))
             self.ttsVolumeSlider.SetValue(int(settings.get('tts_volume', 100)))
             self.ttsRateSlider.SetValue(int(settings.get('tts_rate', 200)))
             self.videoVolumeSlider.SetValue(int(settings.get('video_volume', 100)))
+            self.ttsWorkersCtrl.SetValue(int(settings.get('tts_workers', 1)))
+            self.duckingCheckBox.SetValue(bool(settings.get('ducking', False)))
+            self.duckDepthCtrl.SetValue(int(round(settings.get('duck_depth_db', 12))))
+            self.duckAttackCtrl.SetValue(int(round(settings.get('duck_attack', 0.3) * 1000)))
+            self.duckReleaseCtrl.SetValue(int(round(settings.get('duck_release', 0.5) * 1000)))
+            self.checkpoint = bool(settings.get('checkpoint', True))
 
     def save_current_settings(self):
         settings = {
+            'tts_backend': self.backendComboBox.GetValue(),
             'voice': self.voiceComboBox.GetValue(),
             'output_format': self.outputFormatComboBox.GetValue(),
             'tts_volume': self.ttsVolumeSlider.GetValue(),
             'tts_rate': self.ttsRateSlider.GetValue(),
-            'video_volume': self.videoVolumeSlider.GetValue()
+            'video_volume': self.videoVolumeSlider.GetValue(),
+            'tts_workers': self.ttsWorkersCtrl.GetValue(),
+            'ducking': self.duckingCheckBox.GetValue(),
+            'duck_depth_db': self.duckDepthCtrl.GetValue(),
+            'duck_attack': self.duckAttackCtrl.GetValue() / 1000.0,
+            'duck_release': self.duckReleaseCtrl.GetValue() / 1000.0,
+            'checkpoint': self.checkpoint
         }
         save_settings(settings)
+        save_intervals(self.intervals)
+
+    def get_backend(self):
+        return get_backend(self.backendComboBox.GetValue() or DEFAULT_BACKEND)
 
     def get_voice_names(self):
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-        return [voice.name for voice in voices]
+        try:
+            return [name for _, name in self.get_backend().list_voices()]
+        except (OSError, RuntimeError, ImportError):
+            # Seçilen motor bu sistemde kurulu değil
+            return []
+
+    def on_choose_backend(self, event):
+        self.voiceComboBox.Set(self.get_voice_names())
+        self.voiceComboBox.SetValue('')
 
     def on_choose_srt(self, event):
         with wx.FileDialog(self, "SRT dosyasını seçin", wildcard="SRT files (*.srt)|*.srt",
@@ -429,8 +383,9 @@ class AppFrame(wx.Frame):
             self.srt_path = fileDialog.GetPath()
             self.srtPathText.SetLabel(f"Seçilen SRT: {self.srt_path}")
 
-            # SRT dosyasını parse edip altyazıları saklayalım
-            self.captions = parse_srt_file(self.srt_path)
+            # SRT dosyasını parse edip altyazıları sıkışık depoda saklayalım
+            self.captions = CaptionStore.from_srt(self.srt_path)
+            self.previewCaptionCtrl.SetRange(1, max(1, len(self.captions)))
 
     def on_choose_video(self, event):
         with wx.FileDialog(self, "Video dosyasını seçin", wildcard="MP4 files (*.mp4)|*.mp4",
@@ -440,14 +395,27 @@ class AppFrame(wx.Frame):
             self.video_path = fileDialog.GetPath()
             self.videoPathText.SetLabel(f"Seçilen Video: {self.video_path}")
 
-            # Video süresini alalım
-            video = VideoFileClip(self.video_path)
-            self.video_duration = video.duration
-            video.close()
+            # Video süresini tek bir ffprobe çağrısıyla alalım
+            self.video_duration = probe_media(self.video_path)['duration']
 
     def on_next_tab(self, event):
         self.notebook.SetSelection(1)
 
+    def set_intervals(self, intervals, select=None):
+        self.intervals = intervals
+        self.intervalList.set_intervals(intervals, select)
+
+    def read_interval_dialog(self, dlg):
+        """Diyalogdaki değerleri (başlangıç ms, bitiş ms, TTS %, video %) olarak döndürür; zaman geçersizse None."""
+        try:
+            start_ms = parse_time_ms(dlg.start_time_ctrl.GetValue())
+            end_ms = parse_time_ms(dlg.end_time_ctrl.GetValue())
+        except ValueError:
+            wx.MessageBox("Geçersiz zaman formatı. Lütfen ss:dd:ss,ms formatında girin.", "Hata",
+                          wx.OK | wx.ICON_ERROR)
+            return None
+        return start_ms, end_ms, dlg.tts_volume_ctrl.GetValue(), dlg.video_volume_ctrl.GetValue()
+
     def on_add_interval(self, event):
         """Zaman aralığı ekleme diyaloğunu aç."""
         # Varsayılan başlangıç ve bitiş zamanlarını belirleyelim
@@ -462,36 +430,15 @@ class AppFrame(wx.Frame):
 
         dlg = IntervalDialog(self, default_start_time, default_end_time)
         if dlg.ShowModal() == wx.ID_OK:
-            start_time = dlg.start_time_ctrl.GetValue()
-            end_time = dlg.end_time_ctrl.GetValue()
-            tts_volume = dlg.tts_volume_ctrl.GetValue()
-            video_volume = dlg.video_volume_ctrl.GetValue()
-
-            # Zaman formatlarını doğrula
-            try:
-                parsed_start = parse_time(start_time)
-                parsed_end = parse_time(end_time)
-                if parsed_end <= parsed_start:
-                    wx.MessageBox("Bitiş zamanı başlangıç zamanından sonra olmalı.", "Hata", wx.OK | wx.ICON_ERROR)
-                    return
-            except Exception as e:
-                wx.MessageBox("Geçersiz zaman formatı. Lütfen ss:dd:ss,ms formatında girin.", "Hata",
-                              wx.OK | wx.ICON_ERROR)
-                return
-
-            # Zaman aralıklarının çakışıp çakışmadığını kontrol et
-            for i in range(self.intervalList.GetItemCount()):
-                existing_start = parse_time(self.intervalList.GetItem(i, 0).GetText())
-                existing_end = parse_time(self.intervalList.GetItem(i, 1).GetText())
-                if not (parsed_end <= existing_start or parsed_start >= existing_end):
-                    wx.MessageBox("Yeni zaman aralığı mevcut aralıklarla çakışıyor.", "Hata", wx.OK | wx.ICON_ERROR)
-                    return
-
-            # ListControl'e yeni zaman aralığını ekle
-            index = self.intervalList.InsertItem(self.intervalList.GetItemCount(), start_time)
-            self.intervalList.SetItem(index, 1, end_time)
-            self.intervalList.SetItem(index, 2, str(tts_volume))
-            self.intervalList.SetItem(index, 3, str(video_volume))
+            values = self.read_interval_dialog(dlg)
+            if values is not None:
+                # Geçersiz veya çakışan aralık dizin tarafından reddedilir
+                try:
+                    index = self.intervals.add(*values)
+                except ValueError as e:
+                    wx.MessageBox(str(e), "Hata", wx.OK | wx.ICON_ERROR)
+                else:
+                    self.intervalList.set_intervals(self.intervals, index)
         dlg.Destroy()
 
     def on_edit_interval(self, event):
@@ -499,41 +446,21 @@ class AppFrame(wx.Frame):
         selected = self.intervalList.GetFirstSelected()
         if selected != -1:
             # Seçili satırdaki mevcut değerleri al
-            start_time = self.intervalList.GetItem(selected, 0).GetText()
-            end_time = self.intervalList.GetItem(selected, 1).GetText()
-            tts_volume = self.intervalList.GetItem(selected, 2).GetText()
-            video_volume = self.intervalList.GetItem(selected, 3).GetText()
-
-            # Düzenleme penceresini aç
-            dlg = IntervalDialog(self, start_time, end_time)
-            dlg.start_time_ctrl.SetValue(start_time)
-            dlg.end_time_ctrl.SetValue(end_time)
-            dlg.tts_volume_ctrl.SetValue(int(tts_volume))
-            dlg.video_volume_ctrl.SetValue(int(video_volume))
+            row = self.intervals.row(selected)
+            dlg = IntervalDialog(self, row['start'], row['end'])
+            dlg.tts_volume_ctrl.SetValue(row['tts_volume'])
+            dlg.video_volume_ctrl.SetValue(row['video_volume'])
 
             if dlg.ShowModal() == wx.ID_OK:
-                start_time = dlg.start_time_ctrl.GetValue()
-                end_time = dlg.end_time_ctrl.GetValue()
-                tts_volume = dlg.tts_volume_ctrl.GetValue()
-                video_volume = dlg.video_volume_ctrl.GetValue()
-
-                # Zaman formatlarını doğrula
-                try:
-                    parsed_start = parse_time(start_time)
-                    parsed_end = parse_time(end_time)
-                    if parsed_end <= parsed_start:
-                        wx.MessageBox("Bitiş zamanı başlangıç zamanından sonra olmalı.", "Hata", wx.OK | wx.ICON_ERROR)
-                        return
-                except Exception as e:
-                    wx.MessageBox("Geçersiz zaman formatı. Lütfen ss:dd:ss,ms formatında girin.", "Hata",
-                                  wx.OK | wx.ICON_ERROR)
-                    return
-
-                # ListControl'deki mevcut aralığı güncelle
-                self.intervalList.SetItem(selected, 0, start_time)
-                self.intervalList.SetItem(selected, 1, end_time)
-                self.intervalList.SetItem(selected, 2, str(tts_volume))
-                self.intervalList.SetItem(selected, 3, str(video_volume))
+                values = self.read_interval_dialog(dlg)
+                if values is not None:
+                    # Düzenlenen aralık diğerleriyle çakışıyorsa değiştirilmez
+                    try:
+                        index = self.intervals.update(selected, *values)
+                    except ValueError as e:
+                        wx.MessageBox(str(e), "Hata", wx.OK | wx.ICON_ERROR)
+                    else:
+                        self.intervalList.set_intervals(self.intervals, index)
             dlg.Destroy()
         else:
             wx.MessageBox("Lütfen düzenlemek istediğiniz aralığı seçin.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
@@ -544,10 +471,76 @@ class AppFrame(wx.Frame):
         if selected != -1:
             if wx.MessageBox("Seçili aralığı silmek istediğinizden emin misiniz?", "Onay",
                              wx.YES_NO | wx.ICON_QUESTION) == wx.YES:
-                self.intervalList.DeleteItem(selected)
+                self.intervals.remove(selected)
+                self.intervalList.set_intervals(self.intervals)
         else:
             wx.MessageBox("Lütfen silmek istediğiniz aralığı seçin.", "Bilgi", wx.OK | wx.ICON_ERROR)
 
+    def on_import_intervals(self, event):
+        """JSON veya CSV dosyasındaki aralıkları mevcut aralıkların yerine yükler."""
+        with wx.FileDialog(self, "Aralık dosyasını seçin", wildcard=INTERVAL_WILDCARD,
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            path = fileDialog.GetPath()
+        if len(self.intervals) and \
+                wx.MessageBox("Mevcut aralıklar içe aktarılanlarla değiştirilsin mi?", "Onay",
+                              wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
+            return
+        try:
+            intervals = IntervalIndex.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            wx.MessageBox(f"Aralıklar içe aktarılamadı: {e}", "Hata", wx.OK | wx.ICON_ERROR)
+            return
+        self.set_intervals(intervals)
+        wx.MessageBox(f"{len(intervals)} aralık içe aktarıldı.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+
+    def on_export_intervals(self, event):
+        with wx.FileDialog(self, "Aralıkları kaydet", wildcard=INTERVAL_WILDCARD,
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            path = fileDialog.GetPath()
+            # Uzantı yazılmadıysa seçilen dosya türününki eklenir; biçim uzantıdan belirlenir
+            if os.path.splitext(path)[1].lower() not in INTERVAL_EXTENSIONS:
+                path += INTERVAL_EXTENSIONS[fileDialog.GetFilterIndex()]
+        try:
+            self.intervals.save(path)
+        except OSError as e:
+            wx.MessageBox(f"Aralıklar dışa aktarılamadı: {e}", "Hata", wx.OK | wx.ICON_ERROR)
+
+    def on_suggest_intervals(self, event):
+        """Video sesinin yüksekliğine göre altyazılar için video ses seviyesi önerip aralık listesine yükler."""
+        if not getattr(self, 'captions', None) or not hasattr(self, 'video_path'):
+            wx.MessageBox("Lütfen önce SRT ve video dosyalarını seçin.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+            return
+        if len(self.intervals) and \
+                wx.MessageBox("Mevcut aralıklar önerilenlerle değiştirilsin mi?", "Onay",
+                              wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
+            return
+        video_volume = self.videoVolumeSlider.GetValue() / 100.0
+        tts_volume = self.ttsVolumeSlider.GetValue() / 100.0
+        self.suggestIntervalsBtn.Disable()
+        thread = threading.Thread(target=self.run_suggest_intervals,
+                                  args=(self.video_path, self.captions, video_volume, tts_volume))
+        thread.start()
+
+    def run_suggest_intervals(self, video_path, captions, video_volume, tts_volume):
+        try:
+            # Ses yüksekliği dizini video başına bir kez hesaplanır; sonraki öneriler anında gelir
+            index = loudness_index(video_path)
+            volume_intervals = suggest_intervals(index, captions, video_volume, tts_volume)
+        except Exception as e:
+            wx.CallAfter(wx.MessageBox, f"Aralıklar önerilemedi: {e}", "Hata", wx.OK | wx.ICON_ERROR)
+        else:
+            wx.CallAfter(self.load_suggested_intervals, volume_intervals)
+        finally:
+            wx.CallAfter(self.suggestIntervalsBtn.Enable)
+
+    def load_suggested_intervals(self, volume_intervals):
+        self.set_intervals(IntervalIndex.from_volume_intervals(volume_intervals))
+        wx.MessageBox(f"{len(volume_intervals)} aralık önerildi.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+
     def on_interval_right_click(self, event):
         """Seçili aralığı sağ tıkladığında menü oluştur."""
         menu = wx.Menu()
@@ -558,6 +551,77 @@ class AppFrame(wx.Frame):
         self.PopupMenu(menu)
         menu.Destroy()
 
+    def on_preview_interval(self, event):
+        selected = self.intervalList.GetFirstSelected()
+        if selected == -1:
+            wx.MessageBox("Lütfen önizlemek istediğiniz aralığı seçin.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+            return
+        interval = self.intervals[selected]
+        self.start_preview((interval['start'], interval['end']))
+
+    def on_preview_caption(self, event):
+        if not getattr(self, 'captions', None):
+            wx.MessageBox("Lütfen önce SRT dosyasını seçin.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+            return
+        caption = self.captions[self.previewCaptionCtrl.GetValue() - 1]
+        self.start_preview((caption['start'].total_seconds(), caption['end'].total_seconds()))
+
+    def start_preview(self, window):
+        """Ayarları arayüz iş parçacığında okuyup önizlemeyi arka planda oluşturur."""
+        if not hasattr(self, 'srt_path') or not hasattr(self, 'video_path'):
+            wx.MessageBox("Lütfen önce SRT ve video dosyalarını seçin.", "Bilgi", wx.OK | wx.ICON_INFORMATION)
+            return
+        backend = self.get_backend()
+        voice_name = self.voiceComboBox.GetValue()
+        voice = next((voice_id for voice_id, name in backend.list_voices() if name == voice_name), None)
+        if not voice:
+            wx.MessageBox(f"Seçilen ses bulunamadı: {voice_name}", "Hata", wx.OK | wx.ICON_ERROR)
+            return
+        options = {
+            'tts_volume': self.ttsVolumeSlider.GetValue() / 100.0,
+            'tts_rate': self.ttsRateSlider.GetValue(),
+            'voice': voice,
+            'output_format': self.outputFormatComboBox.GetValue(),
+            'video_volume': self.videoVolumeSlider.GetValue() / 100.0,
+            'volume_intervals': self.get_volume_intervals(),
+            'tts_backend': backend,
+            'ducking': self.get_ducking(),
+            'preview': window
+        }
+        self.previewIntervalBtn.Disable()
+        self.previewCaptionBtn.Disable()
+        thread = threading.Thread(target=self.run_preview, args=(options,))
+        thread.start()
+
+    def run_preview(self, options):
+        try:
+            preview_path = merge_audio_with_srt(self.video_path, self.srt_path, **options)
+        except Exception as e:
+            wx.CallAfter(wx.MessageBox, f"Önizleme oluşturulamadı: {e}", "Hata", wx.OK | wx.ICON_ERROR)
+        else:
+            # Önizleme sistemin varsayılan oynatıcısında açılır
+            wx.CallAfter(wx.LaunchDefaultApplication, os.path.abspath(preview_path))
+        finally:
+            wx.CallAfter(self.on_preview_finished)
+
+    def on_preview_finished(self):
+        self.previewIntervalBtn.Enable()
+        self.previewCaptionBtn.Enable()
+
+    def get_volume_intervals(self):
+        """Aralıkları merge_audio_with_srt'nin beklediği saniye tabanlı sözlüklere çevirir."""
+        return self.intervals.to_volume_intervals()
+
+    def get_ducking(self):
+        """Otomatik kısma ayarlarını audio_mixer.Ducking olarak döndürür; kapalıysa None."""
+        from audio_mixer import Ducking
+        return Ducking.from_settings({
+            'ducking': self.duckingCheckBox.GetValue(),
+            'duck_depth_db': self.duckDepthCtrl.GetValue(),
+            'duck_attack': self.duckAttackCtrl.GetValue() / 1000.0,
+            'duck_release': self.duckReleaseCtrl.GetValue() / 1000.0
+        })
+
     def on_save_settings(self, event):
         """Ayarları kaydet."""
         self.save_current_settings()
@@ -566,10 +630,42 @@ class AppFrame(wx.Frame):
     def on_start_processing(self, event):
         self.notebook.SetSelection(3)
         self.logTextCtrl.Clear()
-        thread = threading.Thread(target=self.process_video)
+        self.progressGauge.SetValue(0)
+        self.progressLabel.SetLabel("")
+        self.cancel_token = CancelToken()
+        self.startBtn.Disable()
+        self.cancelBtn.Enable()
+        thread = threading.Thread(target=self.run_processing, args=(self.cancel_token,))
         thread.start()
 
-    def process_video(self):
+    def on_cancel_processing(self, event):
+        if self.cancel_token:
+            self.cancel_token.cancel()
+            self.cancelBtn.Disable()
+            self.log_message("İptal ediliyor...")
+
+    def on_close(self, event):
+        # Render iş parçacığı bir sonraki blokta durur; kontrol noktası sonraki çalışmada kullanılır
+        if self.cancel_token:
+            self.cancel_token.cancel()
+        event.Skip()
+
+    def run_processing(self, cancel_token):
+        try:
+            self.process_video(cancel_token)
+        except RenderCancelled:
+            self.log_message("İşlem iptal edildi. Aynı dosyalarla yeniden başlatıldığında kaldığı yerden devam edecek.")
+        except Exception as e:
+            self.log_message(f"Hata: {e}")
+        finally:
+            wx.CallAfter(self.on_processing_finished)
+
+    def on_processing_finished(self):
+        self.cancel_token = None
+        self.startBtn.Enable()
+        self.cancelBtn.Disable()
+
+    def process_video(self, cancel_token=None):
         self.log_message("İşleme başlandı...")
         self.log_message("SRT dosyasındaki içerikler ayıklanıyor ve işleniyor...")
 
@@ -578,8 +674,8 @@ class AppFrame(wx.Frame):
             return
 
         voice_name = self.voiceComboBox.GetValue()
-        voices = self.engine.getProperty('voices')
-        voice = next((v.id for v in voices if v.name == voice_name), None)
+        backend = self.get_backend()
+        voice = next((voice_id for voice_id, name in backend.list_voices() if name == voice_name), None)
         if not voice:
             self.log_message(f"Hata: Seçilen ses bulunamadı: {voice_name}")
             return
@@ -592,18 +688,8 @@ class AppFrame(wx.Frame):
         video_volume = self.videoVolumeSlider.GetValue() / 100.0
 
         # Zaman aralıklarını al
-        volume_intervals = []
-        for i in range(self.intervalList.GetItemCount()):
-            start_time = self.intervalList.GetItem(i, 0).GetText()
-            end_time = self.intervalList.GetItem(i, 1).GetText()
-            tts_volume_interval = int(self.intervalList.GetItem(i, 2).GetText()) / 100  # TTS ses seviyesi
-            video_volume_interval = int(self.intervalList.GetItem(i, 3).GetText()) / 100  # Video ses seviyesi
-            volume_intervals.append({
-                'start': parse_time(start_time).total_seconds(),
-                'end': parse_time(end_time).total_seconds(),
-                'tts_volume': tts_volume_interval,
-                'video_volume': video_volume_interval
-            })
+        volume_intervals = self.get_volume_intervals()
+        ducking = self.get_ducking()
 
         self.log_message("SRT içeriği seçilen TTS ile seslendiriliyor...")
         self.log_message("Oluşturulan ses dosyaları videonun ilgili zamanlarına ekleniyor...")
@@ -617,14 +703,38 @@ class AppFrame(wx.Frame):
             output_format,
             video_volume,
             self.log_message,
-            volume_intervals
+            volume_intervals,
+            tts_workers=self.ttsWorkersCtrl.GetValue(),
+            progress_callback=self.on_progress,
+            tts_backend=backend,
+            cancel_token=cancel_token,
+            checkpoint=self.checkpoint,
+            ducking=ducking
         )
 
         self.log_message(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
         self.log_message("İşlemler başarıyla tamamlandı ve sesli betimlemeli içeriğiniz oluşturuldu.")
 
     def log_message(self, message):
-        wx.CallAfter(self.logTextCtrl.AppendText, message + '\n')
+        with self.ui_lock:
+            self.pending_log.append(message)
+
+    def on_progress(self, event):
+        # Yalnızca en son ilerleme olayı gösterilir; aradakiler atlanır
+        if event['type'] == 'progress':
+            with self.ui_lock:
+                self.pending_progress = event
+
+    def on_ui_timer(self, event):
+        with self.ui_lock:
+            pending_log, self.pending_log = self.pending_log, []
+            progress, self.pending_progress = self.pending_progress, None
+        if pending_log:
+            self.logTextCtrl.AppendText('\n'.join(pending_log) + '\n')
+        if progress:
+            total = progress['total'] or 1
+            self.progressGauge.SetValue(int(1000 * min(1.0, progress['done'] / total)))
+            self.progressLabel.SetLabel(format_progress(progress))
 
 
 if __name__ == '__main__':
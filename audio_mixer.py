@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+from bisect import bisect_left
+import numpy as np
+from moviepy.editor import AudioFileClip
+from moviepy.audio.AudioClip import AudioClip
+from srt_parser import overlapping_range
+from wav_io import read_wav_header
+
+# Karışımın örnekleme hızı (moviepy'nin varsayılan ses fps değeri)
+MIX_FPS = 44100
+
+# Akış halinde render'da tek seferde karıştırılan zaman bloğunun uzunluğu (saniye)
+BLOCK_SECONDS = 1.0
+
+# Otomatik kısmanın varsayılanları: anlatım sırasında video sesinin azaltıldığı miktar (dB),
+# anlatımdan önceki iniş ve sonraki çıkış süreleri (saniye)
+DUCKING_DEPTH_DB = 12.0
+DUCKING_ATTACK_SECONDS = 0.3
+DUCKING_RELEASE_SECONDS = 0.5
+
+
+class Ducking:
+    """
+    Anlatım sırasında video sesini otomatik kısan ayarlar. Kısma TTS zaman çizelgesinden örnek düzeyinde hesaplanır:
+    video sesi anlatım başlamadan attack saniye önce inmeye başlar, anlatım boyunca depth_db kadar kısık kalır ve
+    anlatım bittikten sonra release saniyede eski düzeyine döner. Geçişler dB cinsinden doğrusaldır.
+    Her örnek için tek bir ikili arama yapılır; maliyet kısılan bölge sayısıyla artmaz.
+    """
+
+    def __init__(self, depth_db=DUCKING_DEPTH_DB, attack=DUCKING_ATTACK_SECONDS, release=DUCKING_RELEASE_SECONDS):
+        self.depth_db = float(depth_db)
+        self.attack = float(attack)
+        self.release = float(release)
+
+    @classmethod
+    def from_settings(cls, settings):
+        """settings.json biçimindeki ayarlardan oluşturur; otomatik kısma kapalıysa None döner."""
+        if not settings.get('ducking'):
+            return None
+        return cls(settings.get('duck_depth_db', DUCKING_DEPTH_DB),
+                   settings.get('duck_attack', DUCKING_ATTACK_SECONDS),
+                   settings.get('duck_release', DUCKING_RELEASE_SECONDS))
+
+    def to_list(self):
+        """Karışım imzaları ve zaman çizelgeleri için JSON'a yazılabilir biçim."""
+        return [self.depth_db, self.attack, self.release]
+
+    def factors(self, t, timeline):
+        """Verilen zamanlarda video sesinin çarpılacağı kısma katsayılarını (0, 1] döndürür."""
+        starts, max_ends = timeline.arrays()
+        if not len(starts):
+            return np.ones(len(t))
+        index = np.searchsorted(starts, t, side='right') - 1
+        # Önceki girişlerin en geç bitişi; anlatım sürüyorsa t'den büyüktür
+        previous_end = np.where(index >= 0, max_ends[np.maximum(index, 0)], -np.inf)
+        following = index + 1 < len(starts)
+        next_start = np.where(following, starts[np.minimum(index + 1, len(starts) - 1)], np.inf)
+        released = np.clip(1.0 - (t - previous_end) / max(self.release, 1e-9), 0.0, 1.0)
+        attacked = np.clip(1.0 - (next_start - t) / max(self.attack, 1e-9), 0.0, 1.0)
+        return 10 ** (-self.depth_db * np.maximum(released, attacked) / 20)
+
+
+class GainEnvelope:
+    """
+    volume_intervals listesinden bir kez oluşturulan parçalı sabit kazanç eğrisi.
+    Sınır noktaları sıralı tutulur; bir zamanın kazancı ikili arama ile bulunur.
+    Aralıklar çakışırsa, merge_audio_with_srt'de olduğu gibi listede önce gelen geçerlidir.
+    ducking (Ducking) verilirse aralık dışındaki video sesi anlatım boyunca otomatik kısılır;
+    elle girilen aralıklar otomatik kısmayı geçersiz kılar.
+    """
+
+    def __init__(self, volume_intervals=None, tts_volume=1.0, video_volume=1.0, ducking=None):
+        volume_intervals = volume_intervals or []
+        self.ducking = ducking
+        bounds = sorted({interval['start'] for interval in volume_intervals} |
+                        {interval['end'] for interval in volume_intervals})
+        self.bounds = np.array(bounds, dtype=float)
+        # gains[k], [bounds[k-1], bounds[k]) parçasına aittir; ilk ve son eleman sınırların dışını kapsar
+        self.tts_gains = np.full(len(bounds) + 1, float(tts_volume))
+        self.video_gains = np.full(len(bounds) + 1, float(video_volume))
+        self.manual = np.zeros(len(bounds) + 1, dtype=bool)
+        for interval in reversed(volume_intervals):
+            lo = bisect_left(bounds, interval['start'])
+            hi = bisect_left(bounds, interval['end'])
+            self.tts_gains[lo + 1:hi + 1] = interval['tts_volume']
+            self.video_gains[lo + 1:hi + 1] = interval['video_volume']
+            self.manual[lo + 1:hi + 1] = True
+
+    @property
+    def lookahead(self):
+        """Bir zamanın kazancını bulmak için TTS zaman çizelgesinin ne kadar ilerisinin bilinmesi gerektiği (saniye)."""
+        return self.ducking.attack if self.ducking else 0.0
+
+    def segment_indices(self, t):
+        return np.searchsorted(self.bounds, t, side='right')
+
+    def gains_at(self, t, timeline=None):
+        """
+        Verilen zaman(lar) için (tts kazancı, video kazancı) döndürür.
+        Otomatik kısma açıksa kısma timeline (TTSTimeline) girişlerinden hesaplanır.
+        """
+        index = self.segment_indices(t)
+        tts_gains, video_gains = self.tts_gains[index], self.video_gains[index]
+        if self.ducking is not None and timeline is not None:
+            t = np.atleast_1d(t)
+            video_gains = np.where(self.manual[index], video_gains,
+                                   video_gains * self.ducking.factors(t, timeline))
+        return tts_gains, video_gains
+
+
+class TTSTimeline:
+    """
+    Başlangıç zamanına göre sıralı TTS dosyaları. Bir zaman penceresiyle çakışan
+    dosyalar ikili arama ile bulunur; PCM verisi yalnızca ihtiyaç duyulduğunda yüklenir.
+    """
+
+    def __init__(self, tts_files, fps=MIX_FPS):
+        self.fps = fps
+        self.entries = []
+        self.starts = []
+        self.max_ends = []
+        self.end = 0.0
+        self._loaded = {}
+        self._arrays = None
+        self.extend(tts_files)
+
+    def extend(self, tts_files):
+        """Zaman çizelgesine yeni TTS girişleri ekler; sırayla gelen girişler yeniden sıralama gerektirmez."""
+        tts_files = sorted(tts_files, key=lambda tts: tts['start'])
+        if tts_files and self.starts and tts_files[0]['start'] < self.starts[-1]:
+            tts_files = sorted(self.entries + tts_files, key=lambda tts: tts['start'])
+            self.entries, self.starts, self.max_ends = [], [], []
+        for tts in tts_files:
+            self.entries.append(tts)
+            self.starts.append(tts['start'])
+            self.max_ends.append(max(self.max_ends[-1] if self.max_ends else 0.0, tts['start'] + tts['duration']))
+        self.end = self.max_ends[-1] if self.max_ends else 0.0
+        self._arrays = None
+
+    def arrays(self):
+        """Başlangıçlar ve birikimli en geç bitişler; numpy dizileri yalnızca çizelge değiştiğinde yeniden kurulur."""
+        if self._arrays is None:
+            self._arrays = (np.array(self.starts, dtype=float), np.array(self.max_ends, dtype=float))
+        return self._arrays
+
+    def active(self, t0, t1):
+        """[t0, t1] penceresiyle (her iki uç dahil) çakışan girişleri döndürür."""
+        lo, hi = overlapping_range(self.starts, self.max_ends, t0, t1 + 1.0 / self.fps)
+        return [tts for tts in self.entries[lo:hi] if tts['start'] + tts['duration'] >= t0]
+
+    def load(self, tts):
+        samples = self._loaded.get(tts['file'])
+        if samples is None:
+            if 'data' in tts:
+                samples = self._decode_wav_bytes(tts['data'])
+            else:
+                samples = self._read_pcm_wav(tts['file'])
+            if samples is None:
+                clip = AudioFileClip(tts['file'], fps=self.fps)
+                try:
+                    samples = np.vstack(list(clip.iter_chunks(fps=self.fps, chunksize=50000)))
+                finally:
+                    clip.close()
+            if samples.ndim == 1:
+                samples = samples[:, np.newaxis]
+            self._loaded[tts['file']] = samples
+        return samples
+
+    def _read_pcm_wav(self, path):
+        """
+        Örnekleme hızı karışımınkiyle aynı olan 16 bit PCM WAV dosyasını ffmpeg başlatmadan okur.
+        Dönüşüm gerekiyorsa None döner ve dosya AudioFileClip ile okunur.
+        """
+        try:
+            header = read_wav_header(path)
+        except ValueError:
+            return None
+        if header['sample_rate'] != self.fps or header['sample_width'] != 2:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(header['data_offset'])
+            data = np.fromfile(f, dtype='<i2', count=header['frames'] * header['channels'])
+        # moviepy'nin ffmpeg okuyucusuyla aynı ölçekleme
+        return data.reshape(-1, header['channels']) / 2 ** 15
+
+    def _decode_wav_bytes(self, data):
+        """
+        Bellek içi seslendirmenin WAV baytlarını diske yazmadan örneklere çevirir. Örnekleme hızı karışımınkinden
+        farklıysa dönüşüm, AudioFileClip'in yaptığı gibi ffmpeg ile (giriş ve çıkış borudan) yapılır.
+        """
+        from wav_io import wav_bytes_samples
+        from ffmpeg_mux import get_ffmpeg_binary
+
+        header = read_wav_header(data)
+        if header['sample_rate'] == self.fps and header['sample_width'] == 2:
+            return wav_bytes_samples(data) / 2 ** 15
+        command = [get_ffmpeg_binary(), '-v', 'error', '-f', 'wav', '-i', 'pipe:0', '-f', 's16le',
+                   '-acodec', 'pcm_s16le', '-ar', str(self.fps), '-ac', '2', 'pipe:1']
+        decoded = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 check=True).stdout
+        return np.frombuffer(decoded, dtype='<i2').reshape(-1, 2) / 2 ** 15
+
+    def release_inactive(self, keep):
+        """keep içinde olmayan dosyaların PCM verisini bellekten atar."""
+        keep_files = {tts['file'] for tts in keep}
+        for path in [path for path in self._loaded if path not in keep_files]:
+            del self._loaded[path]
+
+
+class PCMStreamReader:
+    """
+    Bir medya dosyasının sesini ffmpeg borusundan baştan sona sırayla okuyan okuyucu.
+    moviepy'nin okuyucusunun aksine büyük bloklarda geri sarıp yeniden konumlanmaz; bellekte
+    yalnızca istenen son blok tutulur. Geriye dönük istekte okuma baştan başlatılır.
+    start verilirse ffmpeg o saniyeye atlayarak çözmeye başlar (önceki kısım hiç çözülmez);
+    get_frame yine dosyanın başına göre zaman alır ve start'tan önceki zamanlar istenmemelidir.
+    """
+
+    def __init__(self, path, duration, fps=MIX_FPS, nchannels=2, start=0.0):
+        self.path = path
+        self.duration = duration
+        self.start = start
+        self.fps = fps
+        self.nchannels = nchannels
+        self.proc = None
+        self.pos = 0
+        self.buffer = np.zeros((0, nchannels))
+
+    def _start(self):
+        from ffmpeg_mux import get_ffmpeg_binary
+        self.close()
+        command = [get_ffmpeg_binary(), '-v', 'error']
+        if self.start:
+            command += ['-ss', f"{self.start:.6f}", '-t', f"{self.duration - self.start:.6f}"]
+        command += ['-i', self.path, '-vn', '-f', 's16le',
+                   '-acodec', 'pcm_s16le', '-ar', str(self.fps), '-ac', str(self.nchannels), '-']
+        self.proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.pos = 0
+        self.buffer = np.zeros((0, self.nchannels))
+
+    def _read(self, frames):
+        data = self.proc.stdout.read(frames * self.nchannels * 2) if frames > 0 else b''
+        samples = np.frombuffer(data, dtype='<i2').reshape(-1, self.nchannels) / 2 ** 15
+        if len(samples) < frames:
+            samples = np.vstack([samples, np.zeros((frames - len(samples), self.nchannels))])
+        return samples
+
+    def get_frame(self, t):
+        index = np.round(self.fps * (np.asarray(t) - self.start)).astype(int)
+        first, last = int(index.min()), int(index.max())
+        if self.proc is None or first < self.pos:
+            self._start()
+        # Tamponun önündeki kısım atlanır, eksik kısım borudan okunur
+        end = self.pos + len(self.buffer)
+        if first >= end:
+            self._read(first - end)
+            self.pos, self.buffer = first, np.zeros((0, self.nchannels))
+            end = first
+        if last >= end:
+            self.buffer = np.vstack([self.buffer, self._read(last + 1 - end)])
+        self.buffer = self.buffer[first - self.pos:]
+        self.pos = first
+        return self.buffer[index - first]
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.stdout.close()
+            self.proc.terminate()
+            self.proc.wait()
+            self.proc = None
+
+
+class MemmapPCMReader(AudioClip):
+    """
+    Önbelleğe alınmış 16 bit PCM WAV dosyasını bellek eşlemesiyle okuyan ses klibi.
+    Her zaman rastgele erişilebilir; okunan kısım kopyalanmadan dosyadan gelir ve yalnızca
+    karıştırma için ölçeklenirken kayan noktaya çevrilir. duration'dan sonraki örnekler sessiz sayılır.
+    PCMStreamReader'ın yerine ve moviepy klibi olarak (ör. CompositeAudioClip içinde) kullanılabilir.
+    """
+
+    def __init__(self, path, duration=None):
+        from wav_io import open_wav_memmap
+        AudioClip.__init__(self)
+        self.path = path
+        self.samples = open_wav_memmap(path)
+        header = read_wav_header(path)
+        self.fps = header['sample_rate']
+        self.nchannels = header['channels']
+        self.duration = header['duration'] if duration is None else duration
+        self.end = self.duration
+        # Kap süresinden uzun çözülen örnekler, VideoFileClip.audio'da olduğu gibi kullanılmaz
+        self.total = min(len(self.samples), int(self.fps * self.duration))
+        self.make_frame = self.get_frame
+
+    def frames(self, i0, i1):
+        """[i0, i1) örneklerini kopyalamadan int16 görünümü olarak döndürür (dosya sonunda kısalabilir)."""
+        return self.samples[max(0, i0):max(0, min(i1, self.total))]
+
+    def get_frame(self, t):
+        scalar = np.isscalar(t)
+        index = np.round(self.fps * np.atleast_1d(np.asarray(t, dtype=float))).astype(int)
+        first, last = int(index.min()), int(index.max())
+        out = np.zeros((len(index), self.nchannels))
+        if last - first == len(index) - 1 and np.all(np.diff(index) == 1):
+            # Ardışık zamanlar (karıştırıcının blokları) dilimle okunur
+            block = self.frames(first, last + 1)
+            lo = max(0, -first)
+            out[lo:lo + len(block)] = block
+        else:
+            valid = (index >= 0) & (index < self.total)
+            out[valid] = self.samples[index[valid]]
+        out /= 2 ** 15
+        return out[0] if scalar else out
+
+    def close(self):
+        # Windows'ta eşleme açıkken dosya silinemediğinden eşleme bırakılır
+        self.samples = None
+
+
+class MixedAudioClip(AudioClip):
+    """
+    Video sesini kazanç eğrisiyle ölçekleyip TTS seslerini örnek konumlarına ekleyen ses klibi.
+    Her parça için tek bir vektörel işlem yapılır; aralık veya altyazı başına alt klip oluşturulmaz.
+    """
+
+    def __init__(self, video_audio, tts_files, envelope, duration, fps=MIX_FPS):
+        AudioClip.__init__(self)
+        self.video_audio = video_audio
+        self.timeline = TTSTimeline(tts_files, fps)
+        self.envelope = envelope
+        self.fps = fps
+        # TTS dosyaları AudioFileClip ile iki kanallı okunur
+        self.nchannels = max(video_audio.nchannels, 2) if video_audio is not None else 2
+        self.duration = duration
+        self.end = duration
+        self.make_frame = self.mix
+
+    def mix(self, t):
+        scalar = np.isscalar(t)
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        video_frames = None
+        if self.video_audio is not None:
+            inside = t < self.video_audio.duration
+            if inside.any():
+                frames = np.asarray(self.video_audio.get_frame(t[inside]), dtype=float)
+                if frames.ndim == 1:
+                    frames = frames[:, np.newaxis]
+                video_frames = np.zeros((len(t), frames.shape[1]))
+                video_frames[inside] = frames
+        out = self.mix_frames(t, video_frames)
+        return out[0] if scalar else out
+
+    def mix_frames(self, t, video_frames=None):
+        """Önceden çözülmüş video örneklerini (len(t), kanal) kazanç eğrisiyle ölçekleyip TTS seslerini ekler."""
+        tts_gain, video_gain = self.envelope.gains_at(t, self.timeline)
+        out = np.zeros((len(t), self.nchannels))
+        if video_frames is not None:
+            out += video_frames * video_gain[:, np.newaxis]
+
+        t0, t1 = t.min(), t.max()
+        active = self.timeline.active(t0, t1)
+        self.timeline.release_inactive(active)
+        for tts in active:
+            samples = self.timeline.load(tts)
+            offsets = np.round((t - tts['start']) * self.fps).astype(int)
+            length = min(len(samples), int(round(tts['duration'] * self.fps)))
+            playing = (offsets >= 0) & (offsets < length)
+            if playing.any():
+                out[playing] += samples[offsets[playing]] * tts_gain[playing, np.newaxis]
+        return out
+
+    def iter_blocks(self, block_seconds=BLOCK_SECONDS, start=0.0):
+        """
+        Zaman çizelgesini sabit uzunluklu bloklar halinde karıştırır ve (ilk örnek indeksi, blok) üretir.
+        Bellekte yalnızca o an çalan TTS sesleri ve tek bir blok tutulur. start verilirse o saniyeden başlanır.
+        """
+        total = int(self.fps * self.duration)
+        block = max(1, int(block_seconds * self.fps))
+        for i0 in range(int(round(start * self.fps)), total, block):
+            i1 = min(total, i0 + block)
+            yield i0, self.mix((1.0 / self.fps) * np.arange(i0, i1))
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+Birden fazla sesli betimleme işini sınırlı bir süreç havuzunda çalıştıran toplu iş aracı.
+
+Örnek:
+    python batch_runner.py isler.json --workers 2 --results sonuclar.json
+
+İş listesi dosyası:
+    {
+        "output_dir": "batch_output",
+        "jobs": [
+            {"name": "ders1", "video": "ders1.mp4", "srt": "ders1.srt",
+             "settings": {"voice": "Microsoft Tolga", "tts_rate": 180, "video_volume": 80, "output_format": "mp4"},
+             "intervals": [{"start": "00:00:05,000", "end": "00:00:09,500", "tts_volume": 100, "video_volume": 30}]}
+        ]
+    }
+"settings" anahtarları settings.json ile aynıdır (otomatik kısma için "ducking": true ve isteğe bağlı
+"duck_depth_db", "duck_attack", "duck_release"; bölümlü çıktı için "segment_seconds"); "intervals" yerine
+"intervals_file" de verilebilir.
+Her iş output_dir/<name> altında kendi çalışma dizininde çalışır (name dizin ayırıcısı içermeyen bir dosya adıdır);
+günlük render.log, ölçümler metrics.json dosyasına yazılır.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from cli import load_intervals_json
+from intervals import IntervalIndex
+
+BATCH_OUTPUT_DIR = "batch_output"
+
+# İş adında bulunamayacak dizin ayırıcıları; ad platformdan bağımsız olarak tek bir dosya adı olmalı
+_NAME_SEPARATORS = ('/', '\\')
+
+
+def job_name(job):
+    """
+    İş adını çalışma dizini adı olarak döndürür. Ad output_dir altında tek bir dosya adı olmalıdır; dizin ayırıcısı
+    içeren, boş, '.' veya '..' olan adlar aynı dizine çözülebildiğinden ya da dışarı taşabildiğinden ValueError yükseltir.
+    """
+    name = str(job.get('name', '')).strip()
+    if name in ('', '.', '..') or any(separator in name for separator in _NAME_SEPARATORS) or \
+            os.path.basename(name) != name:
+        raise ValueError(f"Geçersiz iş adı: {job.get('name')!r}; ad dizin ayırıcısı içermeyen bir dosya adı olmalı.")
+    return name
+
+
+def job_render_options(job, work_dir):
+    """İş tanımındaki ayarları merge_audio_with_srt argümanlarına çevirir."""
+    from tts_backends import get_backend
+    from tts_cache import TTS_CACHE_DIR
+    from pcm_cache import PCM_CACHE_DIR
+    from audio_mixer import Ducking
+
+    settings = job.get('settings', {})
+    backend = get_backend(settings.get('tts_backend'))
+    voice = None
+    if settings.get('voice'):
+        voice = backend.resolve_voice(settings['voice'])
+        if not voice:
+            raise ValueError(f"Seçilen ses bulunamadı: {settings['voice']}")
+
+    if 'intervals_file' in job:
+        volume_intervals = load_intervals_json(job['intervals_file'])
+    else:
+        volume_intervals = IntervalIndex.from_rows(job.get('intervals', [])).to_volume_intervals()
+
+    return {
+        'tts_volume': int(settings.get('tts_volume', 100)) / 100.0,
+        'tts_rate': int(settings.get('tts_rate', 200)),
+        'voice': voice,
+        'output_format': settings.get('output_format') or 'mp4',
+        'video_volume': int(settings.get('video_volume', 100)) / 100.0,
+        'volume_intervals': volume_intervals,
+        'tts_cache_dir': None if settings.get('no_cache') else TTS_CACHE_DIR,
+        'pcm_cache_dir': None if settings.get('no_pcm_cache') else PCM_CACHE_DIR,
+        'tts_workers': int(settings.get('tts_workers', 1)),
+        'mixer': settings.get('mixer', 'composite'),
+        'stream_copy': settings.get('stream_copy', True),
+        'work_dir': work_dir,
+        'output_name': job_name(job),
+        'incremental': settings.get('incremental', False),
+        'pipelined': settings.get('pipelined', False),
+        'checkpoint': settings.get('checkpoint', False),
+        'ducking': Ducking.from_settings(settings),
+        'segment_seconds': settings.get('segment_seconds'),
+        'tts_backend': backend
+    }
+
+
+def run_job(job, output_dir):
+    """
+    Tek bir işi kendi çalışma dizininde çalıştırır; günlük work_dir/render.log, ölçümler work_dir/metrics.json
+    dosyasına yazılır.
+    Çıkış: iş adı, durum, çıktı yolu, hata ve süreleri içeren sonuç sözlüğü
+    """
+    from render import merge_audio_with_srt
+
+    work_dir = os.path.join(output_dir, job_name(job))
+    os.makedirs(work_dir, exist_ok=True)
+    result = {'name': job['name'], 'video': job['video'], 'srt': job['srt'], 'work_dir': work_dir,
+              'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    started = time.perf_counter()
+    with open(os.path.join(work_dir, "render.log"), 'w', encoding='utf-8') as log_file:
+        def log_callback(message):
+            log_file.write(message + '\n')
+            log_file.flush()
+
+        try:
+            options = job_render_options(job, work_dir)
+            result['metrics'] = os.path.join(work_dir, "metrics.json")
+            result['output'] = merge_audio_with_srt(job['video'], job['srt'], log_callback=log_callback,
+                                                    metrics_path=result['metrics'], **options)
+            result['status'] = 'ok'
+        except Exception as e:
+            log_callback(traceback.format_exc())
+            result['status'] = 'error'
+            result['error'] = str(e)
+    result['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(manifest, workers=1, results_path=None, log_callback=None):
+    """
+    İş listesindeki işleri en fazla workers süreçte çalıştırır ve sonuçları iş sırasıyla döndürür.
+    results_path verilirse sonuç listesi her iş bittiğinde bu JSON dosyasına yeniden yazılır.
+    """
+    output_dir = manifest.get('output_dir', BATCH_OUTPUT_DIR)
+    jobs = manifest['jobs']
+    # Büyük/küçük harf duyarsız dosya sistemlerinde yalnızca harf büyüklüğüyle ayrılan adlar da aynı dizindir
+    names = [os.path.normcase(job_name(job)) for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("İş adları benzersiz olmalı; her iş kendi dizinini kullanır.")
+
+    results = [None] * len(jobs)
+    started = time.perf_counter()
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(run_job, job, output_dir): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = {'name': jobs[index]['name'], 'status': 'error', 'error': str(e)}
+            if log_callback:
+                result = results[index]
+                log_callback(f"{result['name']}: {result['status']} ({result.get('elapsed_seconds', 0)} sn)")
+            if results_path:
+                write_results(results_path, results, time.perf_counter() - started)
+    return results
+
+
+def write_results(results_path, results, elapsed):
+    summary = {
+        'total_elapsed_seconds': round(elapsed, 3),
+        'succeeded': sum(1 for result in results if result and result['status'] == 'ok'),
+        'failed': sum(1 for result in results if result and result['status'] == 'error'),
+        'pending': sum(1 for result in results if result is None),
+        'jobs': [result for result in results if result]
+    }
+    temp_path = results_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=4)
+    os.replace(temp_path, results_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Toplu sesli betimleme işlerini çalıştırır.")
+    parser.add_argument('manifest', help="İş listesini içeren JSON dosyası")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Aynı anda çalışacak iş sayısı")
+    parser.add_argument('--results', default=None, help="Sonuç listesinin yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    results_path = args.results or os.path.join(manifest.get('output_dir', BATCH_OUTPUT_DIR), "results.json")
+    os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+
+    results = run_batch(manifest, args.workers, results_path, print)
+    return 0 if all(result['status'] == 'ok' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
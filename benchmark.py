@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+Gerçek ses ve görüntü gerektirmeyen render performans ölçüm aracı.
+
+Örnek:
+    python benchmark.py --captions 50 500 --durations 30 120 --mixers numpy stream pipelined
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --tolerance 1.25
+
+Sentetik SRT dosyaları (gerçekçi boşluk ve çakışmalarla) ve ffmpeg ile kısa bir test videosu üretilir.
+Seslendirme, metin uzunluğuyla orantılı ton WAV dosyaları yazan deterministik bir yer tutucuyla yapılır.
+Her durum için merge_audio_with_srt aşama süreleri ve parse_srt_file süresi JSON olarak yazılır.
+--baseline verilirse süresi tolerans oranından fazla artan durumlar listelenir ve çıkış kodu 1 olur.
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import random
+import zlib
+import shutil
+import platform
+import argparse
+import subprocess
+from datetime import timedelta
+import asyncio
+import numpy as np
+from srt_parser import format_time, parse_srt_file
+from tts_backends import SynthesisBackend, BackendCapabilities
+
+BENCHMARK_DIR = "benchmark_work"
+
+# Yer tutucu seslendirmenin örnekleme hızı ve karakter başına süresi (200 kelime/dk civarı)
+STUB_TTS_FPS = 22050
+STUB_SECONDS_PER_CHAR = 0.06
+
+_WORDS = ("kapı", "açılır", "bir", "adam", "masaya", "oturur", "pencereden", "bakar", "kadın", "gülümser",
+          "araba", "hızla", "uzaklaşır", "yağmur", "başlar", "çocuklar", "koşar", "ışıklar", "söner", "sessizce")
+_MAX_WORDS = 12
+
+
+def generate_srt(path, count, duration, seed=0, overlap_ratio=0.05):
+    """
+    count altyazılı sentetik bir SRT dosyası yazar; altyazılar duration saniyeye yayılır.
+    Aralıklar düzensizdir ve altyazıların yaklaşık overlap_ratio kadarı bir öncekiyle çakışır.
+    Son seslendirmenin video sonunu aşmaması için sonda en uzun yer tutucu ses kadar boşluk bırakılır.
+    """
+    rng = random.Random(seed)
+    tail = min(duration / 2, _MAX_WORDS * max(map(len, _WORDS)) * STUB_SECONDS_PER_CHAR)
+    slot = (duration - tail) / max(1, count) / 1.2
+    lines = []
+    start = 0.0
+    for index in range(count):
+        length = slot * rng.uniform(0.4, 0.9)
+        if index and rng.random() < overlap_ratio:
+            start = max(0.0, start - slot * 0.3)
+        text = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(2, _MAX_WORDS)))
+        lines.append(f"{index + 1}\n{format_time(timedelta(seconds=start))} --> "
+                     f"{format_time(timedelta(seconds=start + length))}\n{text}\n")
+        start += slot * rng.uniform(0.8, 1.2)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def generate_media(path, duration, with_video=True):
+    """ffmpeg'in test kaynaklarıyla duration saniyelik küçük bir video (veya yalnızca ses) dosyası üretir."""
+    from ffmpeg_mux import get_ffmpeg_binary
+
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error']
+    if with_video:
+        command += ['-f', 'lavfi', '-i', f"testsrc=size=160x120:rate=10:duration={duration}"]
+    command += ['-f', 'lavfi', '-i', f"sine=frequency=220:sample_rate=44100:duration={duration}"]
+    if with_video:
+        command += ['-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p']
+    command += ['-c:a', 'aac', '-ac', '2', path]
+    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return path
+
+
+def stub_text_to_speech_batch(jobs, volume=1.0, rate=200, voice=None, log_callback=None, progress_callback=None):
+    """
+    text_to_speech_batch yerine geçen deterministik seslendirme: metin uzunluğuyla orantılı süreli,
+    frekansı metinden türetilen bir ton ve ardından kısa bir sessizlik yazar.
+    """
+    for index, (text, filename) in enumerate(jobs):
+        seconds = max(0.2, len(text) * STUB_SECONDS_PER_CHAR * 200.0 / max(1, rate))
+        n = int(STUB_TTS_FPS * seconds)
+        frequency = 200 + zlib.crc32(text.encode('utf-8')) % 400
+        samples = np.zeros(n + STUB_TTS_FPS // 10)
+        samples[:n] = 0.3 * volume * np.sin(2 * np.pi * frequency * np.arange(n) / STUB_TTS_FPS)
+        with wave.open(filename, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(STUB_TTS_FPS)
+            f.writeframes((samples * 32767).astype('<i2').tobytes())
+        if progress_callback:
+            progress_callback(index + 1, len(jobs))
+        elif log_callback:
+            log_callback(f"{index + 1}/{len(jobs)}: '{text}' içeriği seslendirildi.")
+
+
+class StubBackend(SynthesisBackend):
+    """stub_text_to_speech_batch'i kullanan, gerçek ses motoru gerektirmeyen seslendirme arka ucu."""
+
+    name = "benchmark-stub"
+    capabilities = BackendCapabilities(native_batching=True, in_memory=False, max_parallelism=1)
+
+    def list_voices(self):
+        return (("stub", "Stub"),)
+
+    def version(self):
+        return "benchmark-stub-1"
+
+    async def synthesize_many(self, jobs, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                              progress_callback=None):
+        await asyncio.to_thread(stub_text_to_speech_batch, jobs, volume, rate, voice, log_callback,
+                                progress_callback)
+        return []
+
+
+def time_parse(srt_path, repeat=3):
+    """parse_srt_file'ın en iyi süresini döndürür (saniye)."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_srt_file(srt_path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(work_dir, video_path, srt_path, mixer, output_format):
+    """Tek bir durumu önbelleksiz çalıştırır ve merge_audio_with_srt'nin ölçüm sözlüğünü döndürür."""
+    from render import merge_audio_with_srt
+
+    metrics_path = os.path.join(work_dir, "metrics.json")
+    merge_audio_with_srt(video_path, srt_path, output_format=output_format, tts_cache_dir=None, pcm_cache_dir=None,
+                         mixer='stream' if mixer == 'pipelined' else mixer, pipelined=mixer == 'pipelined',
+                         work_dir=work_dir, metrics_path=metrics_path, tts_backend=StubBackend(),
+                         # moviepy'nin konsol ilerleme çubuğu ölçümü ve çıktıyı kirletmesin diye olaylar yutulur
+                         progress_callback=lambda event: None)
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def case_key(result):
+    return f"{result['mixer']}/{result['format']}/{result['captions']}c/{result['duration']}s"
+
+
+def run_benchmark(caption_counts, durations, mixers, output_format="mp4", work_dir=BENCHMARK_DIR, seed=0,
+                  log_callback=None):
+    """Tüm durum kombinasyonlarını çalıştırır ve makine bilgisiyle birlikte sonuç sözlüğünü döndürür."""
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for duration in durations:
+        video_path = generate_media(os.path.join(work_dir, f"source_{duration}s.mp4"), duration)
+        for count in caption_counts:
+            srt_path = generate_srt(os.path.join(work_dir, f"captions_{count}_{duration}s.srt"), count, duration,
+                                    seed)
+            parse_seconds = time_parse(srt_path)
+            for mixer in mixers:
+                case_dir = os.path.join(work_dir, f"{mixer}_{count}_{duration}s")
+                shutil.rmtree(case_dir, ignore_errors=True)
+                result = {
+                    'mixer': mixer,
+                    'format': output_format,
+                    'captions': count,
+                    'duration': duration,
+                    'parse_srt_file_seconds': round(parse_seconds, 4)
+                }
+                result['key'] = case_key(result)
+                try:
+                    metrics = run_case(case_dir, video_path, srt_path, mixer, output_format)
+                except Exception as e:
+                    # Başarısız durum kaydedilir; diğer durumların ölçümü sürer
+                    result.update({'status': 'error', 'error': str(e)})
+                    results.append(result)
+                    if log_callback:
+                        log_callback(f"{result['key']}: hata: {e}")
+                    continue
+                result.update({
+                    'status': 'ok',
+                    'total_seconds': metrics['total_seconds'],
+                    'stages': metrics['stages'],
+                    'captions_per_second': metrics.get('captions_per_second'),
+                    'peak_rss_bytes': metrics['peak_rss_bytes']
+                })
+                results.append(result)
+                if log_callback:
+                    log_callback(f"{result['key']}: {result['total_seconds']:.2f} sn")
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                    'cpu_count': os.cpu_count()},
+        'results': results
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=1.25):
+    """
+    Süresi baseline'dakinin tolerance katından fazla olan durumları döndürür.
+    Çıkış: [(durum anahtarı, baseline süresi, yeni süre), ...]; baseline'da başarılı olup şimdi hata veren
+    durumların yeni süresi None olur.
+    """
+    previous = {result['key']: result for result in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(result['key'])
+        if not old or old.get('status') != 'ok':
+            continue
+        if result.get('status') != 'ok':
+            regressions.append((result['key'], old['total_seconds'], None))
+        elif result['total_seconds'] > old['total_seconds'] * tolerance:
+            regressions.append((result['key'], old['total_seconds'], result['total_seconds']))
+    return regressions
+
+
+def write_report(path, report):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    os.replace(temp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render aşamalarının süresini sentetik girdilerle ölçer.")
+    parser.add_argument('--captions', type=int, nargs='+', default=[50, 500], help="Altyazı sayıları")
+    parser.add_argument('--durations', type=int, nargs='+', default=[30, 120], help="Video süreleri (saniye)")
+    parser.add_argument('--mixers', nargs='+', default=['numpy', 'stream', 'pipelined'],
+                        choices=['composite', 'numpy', 'stream', 'pipelined'], help="Ölçülecek render yolları")
+    parser.add_argument('--format', dest='output_format', choices=['mp4', 'mp3'], default='mp4',
+                        help="Çıkış formatı")
+    parser.add_argument('--work-dir', default=BENCHMARK_DIR, help="Üretilen dosyaların yazılacağı dizin")
+    parser.add_argument('--seed', type=int, default=0, help="Sentetik SRT üretiminin tohumu")
+    parser.add_argument('--output', default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', default=None, help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument('--tolerance', type=float, default=1.25, help="Gerileme sayılacak süre oranı")
+    parser.add_argument('--save-baseline', default=None, help="Sonuçları yeni baseline olarak bu dosyaya yazar")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.captions, args.durations, args.mixers, args.output_format, args.work_dir,
+                           args.seed, print)
+    output = args.output or os.path.join(args.work_dir, "benchmark_results.json")
+    write_report(output, report)
+    if args.save_baseline:
+        write_report(args.save_baseline, report)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        for key, old, new in regressions:
+            print(f"Gerileme: {key}: {old:.2f} sn -> " + (f"{new:.2f} sn" if new is not None else "hata"))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import threading
+
+# Kontrol noktası biçimi değiştiğinde artırılır; eski dosyalar yok sayılır
+CHECKPOINT_VERSION = 1
+
+# Seslendirme bu kadar altyazılık parçalar halinde yapılır; her parçadan sonra kontrol noktası yazılır
+CHECKPOINT_CAPTIONS = 16
+
+# Karışım bu kadar saniyede bir diske işlenip kontrol noktasına yazılır
+CHECKPOINT_MIX_SECONDS = 10.0
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Render'ı başka bir iş parçacığından iptal etmek için paylaşılan işaret; render aşamalar arasında denetler."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise RenderCancelled("İşlem iptal edildi.")
+
+
+def check_cancelled(cancel_token):
+    if cancel_token is not None:
+        cancel_token.check()
+
+
+def checkpoint_path(work_dir, output_name):
+    return os.path.join(work_dir, f"{output_name}_checkpoint.json")
+
+
+def signature(data):
+    """JSON'a yazılabilir girdilerin kararlı özetini döndürür."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class RenderCheckpoint:
+    """
+    Yarıda kalan bir render'ın tamamlanan altyazı seslendirmelerini ve karışımın yazılan kısmını tutar.
+    Seslendirme girdileri (SRT, ses, hız, motor) değiştiyse tüm kayıt, yalnızca karışım girdileri
+    (video, ses seviyeleri, aralıklar) değiştiyse karışım kısmı geçersiz sayılır.
+    """
+
+    def __init__(self, path, synthesis_signature, mix_signature):
+        self.path = path
+        self.synthesis_signature = synthesis_signature
+        self.mix_signature = mix_signature
+        self.captions = {}
+        self.mixed_frames = 0
+        self.total_frames = None
+
+        data = self._load()
+        if data and data.get('version') == CHECKPOINT_VERSION and \
+                data.get('synthesis_signature') == synthesis_signature:
+            self.captions = {int(index): path for index, path in data.get('captions', {}).items()
+                             if os.path.exists(path)}
+            if data.get('mix_signature') == mix_signature:
+                self.mixed_frames = data.get('mixed_frames', 0)
+                self.total_frames = data.get('total_frames')
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def resumed(self):
+        return bool(self.captions) or self.mixed_frames > 0
+
+    def caption_file(self, index):
+        return self.captions.get(index)
+
+    def add_captions(self, files):
+        """{altyazı indeksi: WAV yolu} eşlemesini ekler ve kaydeder."""
+        self.captions.update(files)
+        self.save()
+
+    def set_mixed(self, mixed_frames, total_frames):
+        self.mixed_frames = mixed_frames
+        self.total_frames = total_frames
+        self.save()
+
+    def save(self):
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'synthesis_signature': self.synthesis_signature,
+            'mix_signature': self.mix_signature,
+            'captions': {str(index): path for index, path in sorted(self.captions.items())},
+            'mixed_frames': self.mixed_frames,
+            'total_frames': self.total_frames
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
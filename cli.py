@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sesli betimleme içeriğini grafik arayüz olmadan oluşturan komut satırı aracı.
+
+Örnek:
+    python cli.py video.mp4 altyazi.srt --voice "Microsoft Tolga" --intervals araliklar.json
+
+Aralık dosyası, GUI'deki "Zaman Aralığı Ayarları" sekmesiyle aynı biçimde bir JSON listesi veya aynı
+sütunlu bir CSV dosyasıdır (bkz. intervals):
+    [{"start": "00:00:05,000", "end": "00:00:09,500", "tts_volume": 100, "video_volume": 30}]
+start/end saniye cinsinden sayı da olabilir; ses seviyeleri yüzde olarak verilir. Aralıklar çakışmamalıdır.
+"""
+
+import sys
+import argparse
+from app_settings import load_settings, load_intervals
+from srt_parser import parse_time
+from intervals import IntervalIndex
+from tts_backends import BACKENDS, DEFAULT_BACKEND, get_backend
+
+
+def parse_window_time(value):
+    """Önizleme zamanını saniye ("12.5") veya SRT biçiminde ("00:00:12,500") kabul eder."""
+    try:
+        return float(value)
+    except ValueError:
+        return parse_time(value).total_seconds()
+
+
+def load_intervals_json(path):
+    """
+    JSON veya CSV aralık dosyasını merge_audio_with_srt'nin beklediği volume_intervals listesine çevirir.
+    Aralıklar sıralanır; çakışan aralık varsa ValueError yükseltilir (bkz. intervals.IntervalIndex).
+    """
+    return IntervalIndex.load(path).to_volume_intervals()
+
+
+def build_parser(settings):
+    parser = argparse.ArgumentParser(description="SRT altyazılarını seslendirip videonun sesiyle birleştirir.")
+    parser.add_argument('video', help="Kaynak video dosyası")
+    parser.add_argument('srt', help="SRT altyazı dosyası")
+    parser.add_argument('--voice', default=settings.get('voice') or None, help="Ses adı veya kimliği")
+    parser.add_argument('--list-voices', action='store_true', help="Kullanılabilir sesleri listeler ve çıkar")
+    parser.add_argument('--tts-backend', choices=sorted(BACKENDS),
+                        default=settings.get('tts_backend') or DEFAULT_BACKEND, help="Seslendirme arka ucu")
+    parser.add_argument('--tts-volume', type=int, default=int(settings.get('tts_volume', 100)),
+                        help="TTS genel ses seviyesi (%%)")
+    parser.add_argument('--tts-rate', type=int, default=int(settings.get('tts_rate', 200)), help="Konuşma hızı")
+    parser.add_argument('--video-volume', type=int, default=int(settings.get('video_volume', 100)),
+                        help="Video varsayılan ses seviyesi (%%)")
+    parser.add_argument('--format', dest='output_format', choices=['mp4', 'mp3'],
+                        default=settings.get('output_format') or 'mp4', help="Çıkış formatı")
+    parser.add_argument('--intervals', help="Zaman aralıklarını içeren JSON veya CSV dosyası")
+    parser.add_argument('--saved-intervals', action='store_true',
+                        help="GUI'de ayarlarla birlikte kaydedilen zaman aralıklarını kullanır")
+    parser.add_argument('--tts-workers', type=int, default=int(settings.get('tts_workers', 1)),
+                        help="Paralel seslendirme süreç sayısı")
+    parser.add_argument('--mixer', choices=['composite', 'numpy', 'stream'], default='composite', help="Ses karıştırıcı")
+    parser.add_argument('--no-stream-copy', action='store_true', help="mp4 çıktısında videoyu yeniden kodlar")
+    parser.add_argument('--no-cache', action='store_true', help="TTS önbelleğini kullanmaz")
+    parser.add_argument('--no-pcm-cache', action='store_true',
+                        help="Video sesini önbelleğe almaz; her render sesi yeniden çözer")
+    parser.add_argument('--work-dir', default="conversion", help="Geçici dosyaların ve çıktının yazılacağı dizin")
+    parser.add_argument('--output-name', default="final_output", help="Uzantısız çıktı dosyası adı")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="Seslendirme, çözme, karıştırma ve kodlamayı eş zamanlı çalıştırır")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Önceki çalışmaya göre yalnızca değişen altyazıları yeniden işler")
+    parser.add_argument('--metrics', default=None,
+                        help="Aşama sürelerinin ve tepe bellek kullanımının yazılacağı JSON dosyası")
+    parser.add_argument('--preview', nargs=2, metavar=('BAŞLANGIÇ', 'BİTİŞ'), type=parse_window_time,
+                        help="Yalnızca bu pencerenin çevresini render eder (saniye veya ss:dd:ss,ms)")
+    parser.add_argument('--preview-caption', type=int, metavar='NO',
+                        help="Yalnızca verilen (1'den başlayan) altyazının çevresini render eder")
+    parser.add_argument('--suggest-intervals', metavar='DOSYA',
+                        help="Video sesinin yüksekliğine göre altyazı aralıkları önerip JSON veya CSV olarak yazar ve çıkar "
+                             "(--intervals ile kullanılabilir)")
+    parser.add_argument('--duck', action=argparse.BooleanOptionalAction, default=bool(settings.get('ducking')),
+                        help="Video sesini anlatım boyunca otomatik kısar; --intervals aralıkları istisna olarak kalır "
+                             "(--no-duck ayarlardaki kısmayı kapatır)")
+    parser.add_argument('--duck-depth', type=float, default=settings.get('duck_depth_db'), metavar='DB',
+                        help="Otomatik kısmada video sesinin azaltılacağı miktar (dB)")
+    parser.add_argument('--duck-attack', type=float, default=settings.get('duck_attack'), metavar='SN',
+                        help="Anlatım başlamadan önce video sesinin inme süresi")
+    parser.add_argument('--duck-release', type=float, default=settings.get('duck_release'), metavar='SN',
+                        help="Anlatım bittikten sonra video sesinin eski düzeyine dönme süresi")
+    parser.add_argument('--segment-seconds', type=float, default=settings.get('segment_seconds'), metavar='SN',
+                        help="Çıktıyı bu uzunlukta, render sürerken oynatılabilen bölümler ve bir m3u8 oynatma "
+                             "listesi olarak yazar")
+    parser.add_argument('--resume', action='store_true',
+                        help="Kontrol noktası yazar; yarıda kalan bir render'a kaldığı yerden devam eder")
+    return parser
+
+
+def main(argv=None):
+    # --list-voices video ve srt gerektirmediğinden konumsal argümanlardan önce ele alınır
+    argv = sys.argv[1:] if argv is None else argv
+    settings = load_settings()
+    if '--list-voices' in argv:
+        backend_parser = argparse.ArgumentParser(add_help=False)
+        backend_parser.add_argument('--tts-backend', choices=sorted(BACKENDS),
+                                    default=settings.get('tts_backend') or DEFAULT_BACKEND)
+        backend = get_backend(backend_parser.parse_known_args(argv)[0].tts_backend)
+        for voice_id, name in backend.list_voices():
+            print(f"{name}\t{voice_id}")
+        return 0
+
+    args = build_parser(settings).parse_args(argv)
+
+    if args.suggest_intervals:
+        from srt_parser import CaptionStore
+        from pcm_cache import PCM_CACHE_DIR
+        from loudness import loudness_index, suggest_intervals
+        index = loudness_index(args.video, PCM_CACHE_DIR, print)
+        volume_intervals = suggest_intervals(index, CaptionStore.from_srt(args.srt), args.video_volume / 100.0,
+                                             args.tts_volume / 100.0)
+        IntervalIndex.from_volume_intervals(volume_intervals).save(args.suggest_intervals)
+        print(f"{len(volume_intervals)} aralık önerildi: {args.suggest_intervals}")
+        return 0
+
+    from tts_cache import TTS_CACHE_DIR
+    from pcm_cache import PCM_CACHE_DIR
+    from render import merge_audio_with_srt
+
+    backend = get_backend(args.tts_backend)
+    voice = None
+    if args.voice:
+        voice = backend.resolve_voice(args.voice)
+        if not voice:
+            print(f"Hata: Seçilen ses bulunamadı: {args.voice}", file=sys.stderr)
+            return 1
+
+    try:
+        if args.intervals:
+            volume_intervals = load_intervals_json(args.intervals)
+        elif args.saved_intervals:
+            volume_intervals = load_intervals().to_volume_intervals()
+        else:
+            volume_intervals = []
+    except ValueError as e:
+        print(f"Hata: Aralıklar okunamadı: {e}", file=sys.stderr)
+        return 1
+
+    ducking = None
+    if args.duck:
+        from audio_mixer import Ducking
+        values = {'duck_depth_db': args.duck_depth, 'duck_attack': args.duck_attack,
+                  'duck_release': args.duck_release}
+        ducking = Ducking.from_settings(dict({key: value for key, value in values.items() if value is not None},
+                                             ducking=True))
+
+    preview = args.preview
+    if args.preview_caption:
+        from srt_parser import CaptionStore
+        captions = CaptionStore.from_srt(args.srt)
+        if not 1 <= args.preview_caption <= len(captions):
+            print(f"Hata: Altyazı numarası 1-{len(captions)} aralığında olmalı", file=sys.stderr)
+            return 1
+        caption = captions[args.preview_caption - 1]
+        preview = (caption['start'].total_seconds(), caption['end'].total_seconds())
+
+    output_path = merge_audio_with_srt(
+        args.video,
+        args.srt,
+        args.tts_volume / 100.0,
+        args.tts_rate,
+        voice,
+        args.output_format,
+        args.video_volume / 100.0,
+        print,
+        volume_intervals,
+        tts_cache_dir=None if args.no_cache else TTS_CACHE_DIR,
+        pcm_cache_dir=None if args.no_pcm_cache else PCM_CACHE_DIR,
+        tts_workers=args.tts_workers,
+        mixer=args.mixer,
+        stream_copy=not args.no_stream_copy,
+        work_dir=args.work_dir,
+        output_name=args.output_name,
+        incremental=args.incremental,
+        pipelined=args.pipelined,
+        metrics_path=args.metrics,
+        tts_backend=backend,
+        checkpoint=args.resume,
+        preview=preview,
+        ducking=ducking,
+        segment_seconds=args.segment_seconds
+    )
+    print(output_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
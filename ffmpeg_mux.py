@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+
+# MPEG-1 Layer III çerçevesindeki örnek sayısı; bundan kısa bir mp3 bölümü tek başına çözülemez
+MP3_FRAME_SAMPLES = 1152
+
+
+def get_ffmpeg_binary():
+    """moviepy'nin kullandığı yerel ffmpeg programının yolunu döndürür."""
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+
+def mux_audio(video_path, audio_path, output_path, video_codec='copy', audio_codec='aac'):
+    """
+    Kaynak videonun görüntü akışını yeni ses dosyasıyla birleştirir.
+    Giriş: video_path (kaynak video), audio_path (karıştırılmış ses), output_path, video_codec, audio_codec
+    video_codec 'copy' ise görüntü yeniden kodlanmaz; ffmpeg başarısız olursa subprocess.CalledProcessError yükseltilir.
+    """
+    command = [
+        get_ffmpeg_binary(), '-y', '-loglevel', 'error',
+        '-i', video_path,
+        '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', video_codec,
+        '-c:a', audio_codec,
+        '-shortest',
+        output_path
+    ]
+    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return output_path
+
+
+def mux_audio_stream_copy(video_path, audio_path, output_path, audio_codec='aac'):
+    """Kaynak videonun görüntü akışını yeniden kodlamadan (stream copy) yeni ses dosyasıyla birleştirir."""
+    return mux_audio(video_path, audio_path, output_path, 'copy', audio_codec)
+
+
+def mux_audio_tracks(video_path, audio_paths, output_path, titles=None, languages=None, video_codec='copy',
+                     audio_codec='aac'):
+    """
+    Kaynak videonun görüntü akışını birden fazla ses dosyasıyla tek mp4'te birleştirir; her ses ayrı bir akış olur.
+    titles ve languages verilirse akışların başlık ve dil (ISO 639-2, ör. 'tur') etiketleri olarak yazılır.
+    İlk ses akışı varsayılan olarak işaretlenir.
+    """
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', video_path]
+    for audio_path in audio_paths:
+        command += ['-i', audio_path]
+    command += ['-map', '0:v:0']
+    for index in range(len(audio_paths)):
+        command += ['-map', f'{index + 1}:a:0']
+    command += ['-c:v', video_codec, '-c:a', audio_codec]
+    for index in range(len(audio_paths)):
+        if titles and titles[index]:
+            # mp4 kabı başlığı akışın işleyici adı olarak saklar; oynatıcılar parça adını buradan okur
+            command += [f'-metadata:s:a:{index}', f'title={titles[index]}',
+                        f'-metadata:s:a:{index}', f'handler_name={titles[index]}']
+        if languages and languages[index]:
+            command += [f'-metadata:s:a:{index}', f'language={languages[index]}']
+        command += [f'-disposition:a:{index}', 'default' if index == 0 else '0']
+    command += ['-shortest', output_path]
+    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return output_path
+
+
+def encode_audio(audio_path, output_path, audio_codec='libmp3lame'):
+    """Ses dosyasını verilen kodlayıcıyla yeniden kodlar (ör. WAV -> MP3)."""
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', audio_path, '-c:a', audio_codec, output_path]
+    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return output_path
+
+
+def segment_output_args(playlist_path, segment_seconds, video=True, reencode_video=False):
+    """
+    Çıktıyı tek dosya yerine segment_seconds uzunluğunda, tek başına oynatılabilen bölümlere ve her bölüm
+    kapandığında güncellenen bir m3u8 oynatma listesine yazan ffmpeg çıkış seçeneklerini döndürür.
+    Görüntülü çıktı HLS (MPEG-TS bölümleri), yalnızca ses çıktısı ayrı mp3 dosyaları olarak yazılır; bölümler
+    oynatma listesinin yanında <liste adı>_00000.ts/.mp3 adlarını alır. Görüntü kopyalanıyorsa bölümler yalnızca
+    anahtar karelerde kesilebildiğinden süreleri değişebilir; yeniden kodlanıyorsa sınırlara anahtar kare konur.
+    """
+    base = os.path.splitext(playlist_path)[0]
+    if not video:
+        # Bölümün ilk çerçevesi öncekinin bit rezervuarına başvurmasın diye rezervuar kapatılır. Xing/LAME başlığı
+        # yazılır; oynatıcılar kodlayıcı gecikmesini bu başlıktan okuyup ilk bölümün başındaki boşluğu atlar.
+        # Akışın sonunda kalan, bir çerçeveden kısa bölüm drop_partial_last_segment ile atılır
+        return ['-reservoir', '0', '-f', 'segment', '-segment_time', str(segment_seconds), '-segment_format', 'mp3',
+                '-segment_list', playlist_path, '-segment_list_type', 'm3u8', '-segment_list_flags', '+live',
+                f"{base}_%05d.mp3"]
+    args = []
+    if reencode_video:
+        args += ['-force_key_frames', f"expr:gte(t,n_forced*{segment_seconds})"]
+    return args + ['-f', 'hls', '-hls_time', str(segment_seconds), '-hls_list_size', '0',
+                   '-hls_playlist_type', 'event', '-hls_segment_filename', f"{base}_%05d.ts", playlist_path]
+
+
+def drop_partial_last_segment(playlist_path, fps):
+    """
+    mp3 bölüm listesinin son bölümü tek bir çerçeveden (MP3_FRAME_SAMPLES örnek) kısaysa dosyayı siler ve
+    oynatma listesinden çıkarır. Kodlayıcının sonda boşalttığı bu kırıntı tek başına çözülemez; içindeki ses
+    bir çerçeveden kısa olduğundan atılması duyulmaz. Silinen bölümün yolunu, yoksa None döndürür.
+    """
+    with open(playlist_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    entries = [i for i, line in enumerate(lines) if line.startswith('#EXTINF:')]
+    # Tek bölümlük çıktı boş kalmasın diye ilk bölüm hiç atılmaz
+    if len(entries) < 2:
+        return None
+    last = entries[-1]
+    duration = float(lines[last][len('#EXTINF:'):].split(',', 1)[0])
+    if duration * fps >= MP3_FRAME_SAMPLES:
+        return None
+    segment_path = os.path.join(os.path.dirname(playlist_path), lines[last + 1])
+    del lines[last:last + 2]
+    temp_path = playlist_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, playlist_path)
+    if os.path.exists(segment_path):
+        os.remove(segment_path)
+    return segment_path
+
+
+def open_pcm_encoder(output_path, fps, channels, audio_codec, video_path=None, video_codec='copy',
+                     video_window=None, video_args=(), segment_seconds=None):
+    """
+    Standart girişten ham 16 bit PCM okuyan bir ffmpeg süreci başlatır.
+    video_path verilirse görüntü akışı bu dosyadan alınır (video_codec 'copy' ise yeniden kodlanmaz).
+    video_window (başlangıç, süre) saniye olarak verilirse görüntünün yalnızca bu kesiti kullanılır;
+    video_args görüntü kodlayıcısına ek seçeneklerdir (ör. ['-preset', 'ultrafast']).
+    segment_seconds verilirse output_path bir m3u8 oynatma listesidir ve çıktı bölümler halinde yazılır
+    (bkz. segment_output_args); her bölüm karışım o noktaya ulaşır ulaşmaz oynatılabilir.
+    Çıkış: stdin'e blok blok PCM yazılacak subprocess.Popen nesnesi
+    """
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error']
+    if video_path and video_window:
+        command += ['-ss', f"{video_window[0]:.6f}", '-t', f"{video_window[1]:.6f}"]
+    if video_path:
+        command += ['-i', video_path]
+    command += ['-f', 's16le', '-ar', str(fps), '-ac', str(channels), '-i', 'pipe:0']
+    if video_path:
+        command += ['-map', '0:v:0', '-map', '1:a:0', '-c:v', video_codec] + list(video_args) + ['-shortest']
+    command += ['-c:a', audio_codec]
+    if segment_seconds:
+        command += segment_output_args(output_path, segment_seconds, video_path is not None, video_codec != 'copy')
+    else:
+        command += [output_path]
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def close_pcm_encoder(encoder, check=True):
+    """
+    open_pcm_encoder ile başlatılan sürecin girişini kapatıp bitmesini bekler ve hata çıktısını döndürür.
+    check True ise ffmpeg başarısız olduğunda subprocess.CalledProcessError yükseltilir; karıştırma başka bir
+    hatayla (ör. iptal) yarıda kaldığında o hatanın üzerine yazılmasın diye check=False verilir.
+    """
+    try:
+        encoder.stdin.close()
+    except BrokenPipeError:
+        pass
+    stderr = encoder.stderr.read()
+    encoder.wait()
+    if check and encoder.returncode != 0:
+        raise subprocess.CalledProcessError(encoder.returncode, 'ffmpeg', stderr=stderr)
+    return stderr
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import math
+import numpy as np
+from wav_io import open_wav_memmap, quantize
+from checkpoint import check_cancelled
+
+# Zaman çizelgesi biçimi değiştiğinde artırılır; eski sürümler tam render gerektirir
+TIMELINE_VERSION = 1
+
+
+def incremental_paths(work_dir, output_name):
+    """Önceki çalışmanın karışım WAV dosyası ve zaman çizelgesi JSON dosyasının yollarını döndürür."""
+    return (os.path.join(work_dir, f"{output_name}_mix.wav"),
+            os.path.join(work_dir, f"{output_name}_timeline.json"))
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def build_timeline(video_path, tts_files, volume_intervals, tts_volume, video_volume, audio_duration, fps,
+                   ducking=None):
+    """Bir render'ın karışımı belirleyen tüm girdilerini JSON'a yazılabilir bir sözlük olarak toplar."""
+    return {
+        'version': TIMELINE_VERSION,
+        'video': file_signature(video_path),
+        'fps': fps,
+        'duration': audio_duration,
+        'tts_volume': tts_volume,
+        'video_volume': video_volume,
+        'ducking': ducking.to_list() if ducking else None,
+        'intervals': [[interval['start'], interval['end'], interval['tts_volume'], interval['video_volume']]
+                      for interval in volume_intervals or []],
+        'tts': [[tts['start'], tts['duration'], os.path.abspath(tts['file'])] for tts in tts_files]
+    }
+
+
+def load_timeline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_timeline(path, timeline):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(timeline, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def affected_ranges(old, new):
+    """
+    İki zaman çizelgesi arasında karışımı değişen zaman aralıklarını döndürür.
+    Video, genel ses seviyeleri, otomatik kısma ayarları veya toplam süre değiştiyse tam render gerektiği için
+    None döner. Otomatik kısma açıksa değişen TTS girişlerinin aralığı iniş ve çıkış süreleri kadar genişletilir.
+    """
+    if not old or old.get('version') != new['version']:
+        return None
+    for key in ('video', 'fps', 'duration', 'tts_volume', 'video_volume', 'ducking'):
+        if old.get(key) != new[key]:
+            return None
+
+    ranges = []
+    attack, release = new['ducking'][1:] if new['ducking'] else (0.0, 0.0)
+    old_tts = {tuple(entry) for entry in old['tts']}
+    new_tts = {tuple(entry) for entry in new['tts']}
+    for start, duration, _ in old_tts ^ new_tts:
+        ranges.append((start - attack, start + duration + release))
+    old_intervals = {tuple(entry) for entry in old['intervals']}
+    new_intervals = {tuple(entry) for entry in new['intervals']}
+    for start, end, _, _ in old_intervals ^ new_intervals:
+        ranges.append((start, end))
+    return merge_ranges(ranges)
+
+
+def patch_mix_wav(mix_path, mixed_clip, ranges, fps, block_seconds=1.0, cancel_token=None):
+    """
+    Karışım WAV dosyasının yalnızca verilen zaman aralıklarını yeniden hesaplayıp yerinde yazar.
+    mixed_clip, audio_mixer.MixedAudioClip gibi zaman dizisi alan bir mix(t) yöntemine sahip olmalıdır.
+    cancel_token iptal edilirse bloklar arasında checkpoint.RenderCancelled yükselir; zaman çizelgesi
+    yazılmadığından sonraki çalışma tam render yapar.
+    """
+    samples = open_wav_memmap(mix_path, mode='r+')
+    block = max(1, int(block_seconds * fps))
+    for start, end in ranges:
+        i0 = max(0, int(math.floor(start * fps)))
+        i1 = min(len(samples), int(math.ceil(end * fps)) + 1)
+        for j0 in range(i0, i1, block):
+            check_cancelled(cancel_token)
+            j1 = min(i1, j0 + block)
+            t = (1.0 / fps) * np.arange(j0, j1)
+            mixed = mixed_clip.mix(t)
+            samples[j0:j1] = quantize(mixed[:, :samples.shape[1]])
+    samples.flush()
+    del samples
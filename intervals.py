@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ses seviyesi aralıkları için sıralı, çakışmasız dizin ve JSON/CSV aktarımı.
+
+Dosya biçimleri GUI'deki "Zaman Aralığı Ayarları" sekmesiyle aynıdır:
+    JSON: [{"start": "00:00:05,000", "end": "00:00:09,500", "tts_volume": 100, "video_volume": 30}]
+    CSV:  start,end,tts_volume,video_volume başlıklı satırlar
+start/end saniye cinsinden sayı da olabilir; ses seviyeleri yüzde olarak verilir.
+"""
+
+import os
+import csv
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from srt_parser import parse_time, format_time
+
+# Dışa aktarılan CSV dosyalarının sütunları
+CSV_FIELDS = ('start', 'end', 'tts_volume', 'video_volume')
+
+
+def parse_interval_time(value):
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return parse_time(value).total_seconds()
+    return float(value)
+
+
+def _percent(value):
+    # CSV'de boş bırakılan ses seviyesi varsayılan (%100) sayılır
+    return 100 if value in (None, '') else int(value)
+
+
+def intervals_from_rows(rows):
+    """GUI biçimindeki aralık satırlarını (yüzde ses seviyeli) volume_intervals listesine çevirir."""
+    volume_intervals = []
+    for row in rows:
+        volume_intervals.append({
+            'start': parse_interval_time(row['start']),
+            'end': parse_interval_time(row['end']),
+            'tts_volume': _percent(row.get('tts_volume')) / 100,
+            'video_volume': _percent(row.get('video_volume')) / 100
+        })
+    return volume_intervals
+
+
+class IntervalIndex:
+    """
+    Ses seviyesi aralıklarını tam sayı milisaniye ve yüzde dizilerinde, başlangıca göre sıralı ve
+    çakışmasız tutan dizin. Aralıklar çakışmadığından bitişler de sıralıdır; çakışma denetimi ve bir
+    zamanı içeren aralığın bulunması ikili aramayla yapılır. Uç uca değen aralıklar çakışmış sayılmaz.
+    İndekslenince merge_audio_with_srt'nin beklediği volume_intervals sözlüğü döner.
+    """
+
+    def __init__(self):
+        self.start_ms = array('q')
+        self.end_ms = array('q')
+        self.tts_volumes = array('h')
+        self.video_volumes = array('h')
+
+    @classmethod
+    def from_volume_intervals(cls, volume_intervals):
+        """
+        Toplu yükleme: aralıklar bir kez sıralanır ve yalnızca komşular karşılaştırılır (O(n log n)).
+        Geçersiz veya çakışan aralık varsa ValueError yükseltilir.
+        """
+        rows = sorted((int(round(interval['start'] * 1000)), int(round(interval['end'] * 1000)),
+                       int(round(interval['tts_volume'] * 100)), int(round(interval['video_volume'] * 100)))
+                      for interval in volume_intervals)
+        for i, row in enumerate(rows):
+            if row[1] <= row[0]:
+                raise ValueError(f"Bitiş zamanı başlangıç zamanından sonra olmalı: {cls._describe(row)}")
+            if i and row[0] < rows[i - 1][1]:
+                raise ValueError(f"Zaman aralıkları çakışıyor: {cls._describe(rows[i - 1])} ve {cls._describe(row)}")
+        index = cls()
+        for column, values in zip((index.start_ms, index.end_ms, index.tts_volumes, index.video_volumes),
+                                  zip(*rows)):
+            column.extend(values)
+        return index
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls.from_volume_intervals(intervals_from_rows(rows))
+
+    @classmethod
+    def load(cls, path):
+        """Uzantısına göre JSON veya CSV aralık dosyasını okur."""
+        if os.path.splitext(path)[1].lower() == '.csv':
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                return cls.from_rows(csv.DictReader(f))
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_rows(json.load(f))
+
+    def save(self, path):
+        """Uzantısına göre JSON veya CSV olarak yazar; dosya yarım kalmasın diye önce geçici dosyaya yazılır."""
+        temp_path = path + '.tmp'
+        if os.path.splitext(path)[1].lower() == '.csv':
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.rows())
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.rows(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _describe(row):
+        return f"{format_time(timedelta(milliseconds=row[0]))} - {format_time(timedelta(milliseconds=row[1]))}"
+
+    def __len__(self):
+        return len(self.start_ms)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return {
+            'start': self.start_ms[index] / 1000,
+            'end': self.end_ms[index] / 1000,
+            'tts_volume': self.tts_volumes[index] / 100,
+            'video_volume': self.video_volumes[index] / 100
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def row(self, index):
+        """GUI biçimindeki satır: SRT zamanları ve yüzde ses seviyeleri."""
+        return {
+            'start': format_time(timedelta(milliseconds=self.start_ms[index])),
+            'end': format_time(timedelta(milliseconds=self.end_ms[index])),
+            'tts_volume': self.tts_volumes[index],
+            'video_volume': self.video_volumes[index]
+        }
+
+    def rows(self):
+        return [self.row(index) for index in range(len(self))]
+
+    def to_volume_intervals(self):
+        return list(self)
+
+    def conflict(self, start_ms, end_ms, ignore=None):
+        """[start_ms, end_ms) ile çakışan aralığın indeksini, yoksa None döndürür; ignore indeksi atlanır."""
+        # Başlangıcı end_ms'den önce olan son aralık, bitişi start_ms'den sonraysa çakışır; öncekiler daha erken biter
+        index = bisect_left(self.start_ms, end_ms) - 1
+        if index == ignore:
+            index -= 1
+        if index >= 0 and self.end_ms[index] > start_ms:
+            return index
+        return None
+
+    def find(self, t_ms):
+        """t_ms anını içeren aralığın indeksini, yoksa None döndürür."""
+        index = bisect_right(self.start_ms, t_ms) - 1
+        if index >= 0 and t_ms < self.end_ms[index]:
+            return index
+        return None
+
+    def add(self, start_ms, end_ms, tts_volume=100, video_volume=100):
+        """
+        Aralığı sıralı yerine ekler ve indeksini döndürür; ses seviyeleri yüzdedir.
+        Geçersiz veya mevcut bir aralıkla çakışan aralıkta ValueError yükseltilir.
+        """
+        start_ms, end_ms = int(start_ms), int(end_ms)
+        if end_ms <= start_ms:
+            raise ValueError("Bitiş zamanı başlangıç zamanından sonra olmalı.")
+        existing = self.conflict(start_ms, end_ms)
+        if existing is not None:
+            raise ValueError(f"Yeni zaman aralığı mevcut aralıkla çakışıyor: "
+                             f"{self._describe((self.start_ms[existing], self.end_ms[existing]))}")
+        index = bisect_left(self.start_ms, start_ms)
+        self.start_ms.insert(index, start_ms)
+        self.end_ms.insert(index, end_ms)
+        self.tts_volumes.insert(index, int(tts_volume))
+        self.video_volumes.insert(index, int(video_volume))
+        return index
+
+    def remove(self, index):
+        for column in (self.start_ms, self.end_ms, self.tts_volumes, self.video_volumes):
+            del column[index]
+
+    def update(self, index, start_ms, end_ms, tts_volume=100, video_volume=100):
+        """Aralığı değiştirir ve yeni indeksini döndürür; çakışma varsa aralık olduğu gibi kalır."""
+        start_ms, end_ms = int(start_ms), int(end_ms)
+        if end_ms <= start_ms:
+            raise ValueError("Bitiş zamanı başlangıç zamanından sonra olmalı.")
+        # Aralık yerinde kaldığında kendisiyle karşılaştırılmaz; yer değiştirdiğinde ise kendisi başka konumdadır
+        existing = self.conflict(start_ms, end_ms, ignore=index)
+        if existing is not None:
+            raise ValueError(f"Zaman aralığı mevcut aralıkla çakışıyor: "
+                             f"{self._describe((self.start_ms[existing], self.end_ms[existing]))}")
+        self.remove(index)
+        return self.add(start_ms, end_ms, tts_volume, video_volume)
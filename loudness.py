@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import numpy as np
+from wav_io import open_wav_memmap, read_wav_header
+from pcm_cache import PCMCache, PCM_CACHE_DIR
+
+# Ses yüksekliği dizininin pencere uzunluğu (saniye)
+LOUDNESS_WINDOW_SECONDS = 0.1
+
+# Dizin biçimi değiştiğinde artırılır; eski dosyalar yeniden hesaplanır
+LOUDNESS_VERSION = 1
+
+# Altyazı sırasında video sesinin inmesi gereken düzey (dBFS, RMS); anlatım bunun üzerinde anlaşılır kalır
+TARGET_VIDEO_DB = -30.0
+
+# Önerilen video ses seviyesinin alt sınırı ve yuvarlama adımı
+MIN_VIDEO_VOLUME = 0.1
+VOLUME_STEP = 0.05
+
+# Aynı seviyeyi öneren ve aralarındaki boşluk bundan kısa olan altyazılar tek aralıkta birleştirilir (saniye)
+MERGE_GAP_SECONDS = 0.5
+
+# Sessiz pencerelerde log10(0) olmaması için güç alt sınırı (-100 dBFS)
+_MIN_POWER = 1e-10
+
+# Dizin hesaplanırken tek seferde okunan pencere sayısı
+_CHUNK_WINDOWS = 600
+
+
+class LoudnessIndex:
+    """
+    Video sesinin kısa pencerelerdeki ortalama gücü (kanalların ortalaması) ve önek toplamı.
+    Herhangi bir zaman aralığının RMS düzeyi iki önek toplamının farkıyla bulunur; her altyazı O(1)'dir.
+    """
+
+    def __init__(self, power, window=LOUDNESS_WINDOW_SECONDS):
+        self.power = np.asarray(power, dtype=np.float64)
+        self.window = window
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self.power)])
+
+    @classmethod
+    def from_pcm(cls, pcm_path, window=LOUDNESS_WINDOW_SECONDS):
+        """16 bit PCM WAV dosyasından (ör. PCMCache dosyası) dizini bellek eşlemesiyle parça parça hesaplar."""
+        samples = open_wav_memmap(pcm_path)
+        size = max(1, int(round(window * read_wav_header(pcm_path)['sample_rate'])))
+        count = int(np.ceil(len(samples) / size))
+        power = np.zeros(count)
+        for w0 in range(0, count, _CHUNK_WINDOWS):
+            w1 = min(count, w0 + _CHUNK_WINDOWS)
+            block = np.asarray(samples[w0 * size:w1 * size], dtype=np.float32) / 2 ** 15
+            squares = (block * block).mean(axis=1)
+            # Son pencere kısa olabilir; eksik kısmı sessiz sayılmaz, kendi uzunluğuyla ortalanır
+            full = len(squares) // size
+            power[w0:w0 + full] = squares[:full * size].reshape(full, size).mean(axis=1)
+            if full < w1 - w0:
+                power[w0 + full] = squares[full * size:].mean()
+        return cls(power, window)
+
+    @classmethod
+    def load(cls, path):
+        """Kaydedilmiş dizini okur; dosya yoksa veya sürümü farklıysa None döner."""
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != LOUDNESS_VERSION:
+                    return None
+                return cls(data['power'], float(data['window']))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path):
+        # Toplu işlerde aynı dizin birden çok süreçten yazılabildiğinden geçici dosya adı benzersizdir
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp.npz', dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, power=self.power, window=self.window, version=LOUDNESS_VERSION)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def levels_db(self, starts, ends):
+        """Saniye dizileriyle verilen aralıkların RMS düzeyini dBFS olarak döndürür (vektörel)."""
+        count = len(self.power)
+        i0 = np.clip(np.floor(np.asarray(starts, dtype=float) / self.window).astype(int), 0, count)
+        i1 = np.clip(np.ceil(np.asarray(ends, dtype=float) / self.window).astype(int), 0, count)
+        i1 = np.maximum(i1, np.minimum(i0 + 1, count))
+        windows = np.maximum(i1 - i0, 1)
+        mean = (self.cumulative[i1] - self.cumulative[i0]) / windows
+        return 10 * np.log10(np.maximum(mean, _MIN_POWER))
+
+
+def loudness_index(video_path, pcm_cache_dir=PCM_CACHE_DIR, log_callback=None, cancel_token=None):
+    """
+    Videonun ses yüksekliği dizinini döndürür. Dizin video içeriğinin özetiyle PCM önbelleğinde saklanır;
+    yalnızca ilk çağrıda (gerekirse ses çözülerek) hesaplanır. Çözülmüş PCM sonradan silinse de dizin kalır.
+    """
+    from audio_mixer import MIX_FPS
+
+    cache = PCMCache(pcm_cache_dir)
+    index_path = os.path.join(cache.cache_dir, f"{cache.key(video_path)}_loudness.npz")
+    index = LoudnessIndex.load(index_path)
+    if index is not None and index.window == LOUDNESS_WINDOW_SECONDS:
+        return index
+    pcm_path = cache.get_or_decode(video_path, MIX_FPS, log_callback=log_callback, cancel_token=cancel_token)
+    if log_callback:
+        log_callback("Video sesinin ses yüksekliği dizini hesaplanıyor...")
+    index = LoudnessIndex.from_pcm(pcm_path)
+    index.save(index_path)
+    return index
+
+
+def suggest_intervals(index, captions, video_volume=1.0, tts_volume=1.0, target_db=TARGET_VIDEO_DB):
+    """
+    Her altyazı penceresinde video sesini target_db düzeyine (tts_volume 1'den küçükse daha da aşağı)
+    indirecek video ses seviyesini önerir.
+    Video zaten yeterince sessizse (önerilen seviye video_volume'dan düşük değilse) aralık oluşturulmaz;
+    aynı seviyedeki yakın altyazılar birleştirilir. Aralıklar arayüzdeki gibi çakışmaz; çakışan altyazının
+    aralığı öncekinin bitişinden başlar.
+    Giriş: index (LoudnessIndex), captions (srt_parser.CaptionStore)
+    Çıkış: merge_audio_with_srt'nin beklediği volume_intervals listesi
+    """
+    if not len(captions):
+        return []
+    starts = np.frombuffer(captions.start_ms, dtype=np.int64) / 1000.0
+    ends = np.frombuffer(captions.end_ms, dtype=np.int64) / 1000.0
+    levels = index.levels_db(starts, ends)
+    # Anlatım kısılmışsa video da aynı oranda daha fazla kısılır; aradaki fark korunur
+    target_db += 20 * np.log10(max(tts_volume, 1e-3))
+    gains = np.clip(10 ** ((target_db - levels) / 20), MIN_VIDEO_VOLUME, 1.0)
+    # Kısılan seviye hedefi aşmasın diye adım aşağı yuvarlanır
+    gains = np.maximum(MIN_VIDEO_VOLUME, np.floor(gains / VOLUME_STEP + 1e-9) * VOLUME_STEP)
+
+    intervals = []
+    for start, end, gain in zip(starts, ends, gains):
+        if gain >= video_volume - 1e-9:
+            continue
+        gain = round(float(gain), 2)
+        previous = intervals[-1] if intervals else None
+        if previous and previous['video_volume'] == gain and start - previous['end'] < MERGE_GAP_SECONDS:
+            previous['end'] = max(previous['end'], float(end))
+            continue
+        if previous:
+            start = max(start, previous['end'])
+            if start >= end:
+                continue
+        intervals.append({'start': float(start), 'end': float(end), 'tts_volume': tts_volume, 'video_volume': gain})
+    return intervals
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import threading
+import subprocess
+from wav_io import read_wav_header
+
+# (mutlak yol, boyut, değişiklik zamanı) anahtarlı bilgi önbelleği
+_probe_cache = {}
+_probe_lock = threading.Lock()
+
+
+def _cache_key(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def _cached(kind, path, compute):
+    key = (kind,) + _cache_key(path)
+    with _probe_lock:
+        if key in _probe_cache:
+            return _probe_cache[key]
+    value = compute(path)
+    with _probe_lock:
+        _probe_cache[key] = value
+    return value
+
+
+def get_ffprobe_binary():
+    """PATH'teki veya moviepy'nin ffmpeg programıyla aynı dizindeki ffprobe'u döndürür; yoksa None."""
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe:
+        return ffprobe
+    from ffmpeg_mux import get_ffmpeg_binary
+    ffmpeg = get_ffmpeg_binary()
+    candidate = os.path.join(os.path.dirname(ffmpeg), os.path.basename(ffmpeg).replace('ffmpeg', 'ffprobe'))
+    return candidate if os.path.isfile(candidate) else None
+
+
+def _probe_media(path):
+    ffprobe = get_ffprobe_binary()
+    if ffprobe is None:
+        # ffprobe yoksa moviepy'nin tek bir "ffmpeg -i" çağrısıyla yaptığı ayrıştırma kullanılır
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        infos = ffmpeg_parse_infos(path)
+        return {
+            'duration': infos.get('duration') or 0.0,
+            'has_video': infos.get('video_found', False),
+            'has_audio': infos.get('audio_found', False),
+            'video_codec': None,
+            'video_size': infos.get('video_size'),
+            'video_fps': infos.get('video_fps'),
+            'audio_codec': None,
+            'audio_sample_rate': infos.get('audio_fps'),
+            'audio_channels': None
+        }
+
+    output = subprocess.run([ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+                            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    data = json.loads(output)
+    video = next((s for s in data.get('streams', []) if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), None)
+    fps = None
+    if video and video.get('avg_frame_rate', '0/0') != '0/0':
+        numerator, denominator = video['avg_frame_rate'].split('/')
+        fps = float(numerator) / float(denominator)
+    return {
+        'duration': float(data.get('format', {}).get('duration', 0.0)),
+        'has_video': video is not None,
+        'has_audio': audio is not None,
+        'video_codec': video.get('codec_name') if video else None,
+        'video_size': [video.get('width'), video.get('height')] if video else None,
+        'video_fps': fps,
+        'audio_codec': audio.get('codec_name') if audio else None,
+        'audio_sample_rate': int(audio['sample_rate']) if audio and 'sample_rate' in audio else None,
+        'audio_channels': audio.get('channels') if audio else None
+    }
+
+
+def probe_media(path):
+    """
+    Kap süresini ve akış bilgilerini tek bir ffprobe çağrısıyla okur; sonuç yol, boyut ve zamana göre önbelleklenir.
+    Çıkış: {'duration', 'has_video', 'has_audio', 'video_codec', 'video_size', 'video_fps',
+            'audio_codec', 'audio_sample_rate', 'audio_channels'}
+    """
+    return _cached('media', path, _probe_media)
+
+
+def _probe_audio_duration(path):
+    try:
+        return read_wav_header(path)['duration']
+    except ValueError:
+        # Bazı TTS sürücüleri .wav uzantılı olsa da farklı biçimde yazar
+        return _probe_media(path)['duration']
+
+
+def probe_audio_duration(path):
+    """Ses dosyasının süresini WAV başlığından okur; dosya WAV değilse ffprobe kullanılır."""
+    return _cached('audio_duration', path, _probe_audio_duration)
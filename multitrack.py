@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+"""
+Aynı videoya birden fazla altyazı varyantını (ör. farklı diller veya sesler) tek çözme geçişiyle render eden araç.
+
+Örnek:
+    python multitrack.py varyantlar.json --single-file
+
+Varyant listesi dosyası:
+    {
+        "video": "ders1.mp4",
+        "output_dir": "multitrack_output",
+        "output_format": "mp4",
+        "variants": [
+            {"name": "tr", "srt": "ders1_tr.srt", "language": "tur", "title": "Türkçe betimleme",
+             "settings": {"voice": "Microsoft Tolga", "tts_rate": 180}},
+            {"name": "en", "srt": "ders1_en.srt", "language": "eng",
+             "settings": {"voice": "Microsoft David", "video_volume": 80},
+             "intervals": [{"start": "00:00:05,000", "end": "00:00:09,500", "tts_volume": 100, "video_volume": 30}]}
+        ]
+    }
+"settings", "intervals" ve "intervals_file" anahtarları batch_runner iş tanımıyla aynıdır.
+Video bir kez incelenir ve sesi bir kez çözülür; varyantların seslendirme ve karıştırması eş zamanlı yürür.
+Çıktılar output_dir/<name>.<biçim> dosyalarına, --single-file ile tüm varyantlar tek mp4'te ayrı ses akışları
+olarak output_dir/<video adı>_multitrack.mp4 dosyasına yazılır.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+MULTITRACK_OUTPUT_DIR = "multitrack_output"
+
+
+def decode_source(video_path, pcm_cache_dir, work_dir, log_callback=None, cancel_token=None):
+    """
+    Videoyu bir kez inceler ve sesini bir kez çözer.
+    pcm_cache_dir None ise ses work_dir altında geçici bir önbelleğe çözülür; render sonunda silinir.
+    Çıkış: (probe_media bilgisi, PCM dosyası veya videoda ses yoksa None)
+    """
+    from media_probe import probe_media
+    from pcm_cache import PCMCache
+    from audio_mixer import MIX_FPS
+
+    info = probe_media(video_path)
+    if not info['has_audio']:
+        return info, None
+    cache = PCMCache(pcm_cache_dir or os.path.join(work_dir, "pcm_cache"))
+    return info, cache.get_or_decode(video_path, MIX_FPS, log_callback=log_callback, cancel_token=cancel_token)
+
+
+def render_variant(variant, info, source_pcm, output_dir, log_callback=None, cancel_token=None):
+    """
+    Tek bir varyantı seslendirir ve paylaşılan video sesiyle karıştırıp work_dir/<name>_mix.wav dosyasına yazar.
+    Çıkış: (karışım WAV yolu, işlem sonunda silinecek geçici dosyalar)
+    """
+    from batch_runner import job_render_options
+    from srt_parser import CaptionStore
+    from tts_cache import TTSCache
+    from audio_mixer import GainEnvelope, MixedAudioClip, MemmapPCMReader, MIX_FPS
+    from render import synthesize_captions_chunked, build_tts_files, write_mix_wav, cleanup_temp_files
+    from progress import RenderMetrics
+    from checkpoint import RenderCancelled
+
+    work_dir = os.path.join(output_dir, variant['name'])
+    os.makedirs(work_dir, exist_ok=True)
+    options = job_render_options(variant, work_dir)
+    metrics = RenderMetrics()
+    captions = CaptionStore.from_srt(variant['srt'])
+    if log_callback:
+        log_callback(f"{len(captions)} altyazı seslendiriliyor...")
+
+    tts_cache = TTSCache(options['tts_cache_dir']) if options['tts_cache_dir'] else None
+    caption_files, temp_files = synthesize_captions_chunked(captions, options['tts_rate'], options['voice'],
+                                                            log_callback, tts_cache, options['tts_workers'],
+                                                            work_dir, metrics, options['tts_backend'],
+                                                            cancel_token, in_memory=True)
+    mix_path = os.path.join(work_dir, f"{variant['name']}_mix.wav")
+    video_audio = MemmapPCMReader(source_pcm, info['duration']) if source_pcm else None
+    try:
+        tts_files = build_tts_files(captions, caption_files)
+        envelope = GainEnvelope(options['volume_intervals'], options['tts_volume'], options['video_volume'],
+                                options['ducking'])
+        audio_duration = max([info['duration']] + [tts['start'] + tts['duration'] for tts in tts_files])
+        mixed = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+        write_mix_wav(mixed, mix_path, metrics, cancel_token)
+    except RenderCancelled:
+        cleanup_temp_files(temp_files + [mix_path])
+        raise
+    finally:
+        if video_audio is not None:
+            video_audio.close()
+    return mix_path, temp_files
+
+
+def render_multitrack(video_path, variants, output_dir=MULTITRACK_OUTPUT_DIR, output_format="mp4",
+                      single_file=False, stream_copy=True, pcm_cache_dir=None, workers=None, log_callback=None,
+                      cancel_token=None):
+    """
+    Aynı videoya birden fazla varyantı render eder. Video sesi bir kez çözülür ve bellek eşlemesiyle tüm
+    varyantlarca paylaşılır; varyantlar en fazla workers iş parçacığında eş zamanlı seslendirilip karıştırılır.
+    single_file True ise tüm karışımlar tek mp4'te ayrı ses akışları olarak birleştirilir (ilk varyant varsayılan).
+    Çıkış: {varyant adı: çıktı yolu}; single_file ile tüm varyantlar aynı dosyayı gösterir.
+    """
+    from ffmpeg_mux import mux_audio_tracks
+    from render import finalize_from_wav, cleanup_temp_files, log_stream_copy_fallback
+    from batch_runner import job_name
+
+    # Varyant adı çalışma dizini ve çıktı dosyası adı olduğundan batch_runner iş adları gibi doğrulanır
+    variants = [dict(variant, name=job_name(variant)) for variant in variants]
+    names = [variant['name'] for variant in variants]
+    if len({os.path.normcase(name) for name in names}) != len(names):
+        raise ValueError("Varyant adları benzersiz olmalı; her varyant kendi dizinini kullanır.")
+    if single_file and output_format != "mp4":
+        raise ValueError("Tek dosyada birden fazla ses akışı yalnızca mp4 biçiminde yazılabilir.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    if log_callback:
+        log_callback(f"{len(variants)} varyant için video sesi hazırlanıyor...")
+    info, source_pcm = decode_source(video_path, pcm_cache_dir, output_dir, log_callback, cancel_token)
+
+    def variant_log(name):
+        if not log_callback:
+            return None
+        return lambda message: log_callback(f"[{name}] {message}")
+
+    temp_files = []
+    mix_paths = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers or len(variants)) as executor:
+            futures = {variant['name']: executor.submit(render_variant, variant, info, source_pcm, output_dir,
+                                                        variant_log(variant['name']), cancel_token)
+                       for variant in variants}
+            for name, future in futures.items():
+                mix_paths[name], variant_temp_files = future.result()
+                temp_files.extend(variant_temp_files)
+                temp_files.append(mix_paths[name])
+
+        outputs = {}
+        if single_file:
+            base_name = os.path.splitext(os.path.basename(video_path))[0]
+            output_path = os.path.join(output_dir, f"{base_name}_multitrack.mp4")
+            audio_paths = [mix_paths[name] for name in names]
+            titles = [variant.get('title', variant['name']) for variant in variants]
+            languages = [variant.get('language') for variant in variants]
+            try:
+                mux_audio_tracks(video_path, audio_paths, output_path, titles, languages,
+                                 'copy' if stream_copy else 'libx264')
+            except Exception as e:
+                if not stream_copy:
+                    raise
+                log_stream_copy_fallback(log_callback, e)
+                mux_audio_tracks(video_path, audio_paths, output_path, titles, languages, 'libx264')
+            outputs = {name: output_path for name in names}
+        else:
+            for name in names:
+                output_path = os.path.join(output_dir, f"{name}.{output_format}")
+                outputs[name] = finalize_from_wav(video_path, mix_paths[name], output_path, output_format,
+                                                  stream_copy, variant_log(name))
+    finally:
+        cleanup_temp_files(temp_files)
+        if not pcm_cache_dir and source_pcm:
+            shutil.rmtree(os.path.dirname(source_pcm), ignore_errors=True)
+
+    if log_callback:
+        log_callback(f"{len(variants)} varyant {time.perf_counter() - started:.1f} sn'de render edildi.")
+    return outputs
+
+
+def main(argv=None):
+    from pcm_cache import PCM_CACHE_DIR
+
+    parser = argparse.ArgumentParser(description="Aynı videoya birden fazla sesli betimleme varyantı render eder.")
+    parser.add_argument('manifest', help="Video ve varyant listesini içeren JSON dosyası")
+    parser.add_argument('--single-file', action='store_true',
+                        help="Tüm varyantları tek mp4 içinde ayrı ses akışları olarak yaz")
+    parser.add_argument('--workers', type=int, default=None, help="Aynı anda render edilecek varyant sayısı")
+    parser.add_argument('--no-pcm-cache', action='store_true',
+                        help="Çözülen video sesini kalıcı önbelleğe yazma")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    outputs = render_multitrack(manifest['video'], manifest['variants'],
+                                manifest.get('output_dir', MULTITRACK_OUTPUT_DIR),
+                                manifest.get('output_format', 'mp4'),
+                                args.single_file or manifest.get('single_file', False),
+                                manifest.get('stream_copy', True),
+                                None if args.no_pcm_cache else PCM_CACHE_DIR, args.workers, print)
+    for name, output_path in outputs.items():
+        print(f"{name}: {output_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
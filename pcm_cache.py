@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from wav_io import write_wav_header, read_wav_header
+from tts_cache import evict_oldest
+
+try:
+    import fcntl
+except ImportError:
+    # Windows'ta dosya kilidi msvcrt ile alınır
+    fcntl = None
+    import msvcrt
+
+# Çözülmüş video seslerinin varsayılan konumu ve boyut sınırı
+PCM_CACHE_DIR = os.path.join("conversion", "pcm_cache")
+PCM_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
+_CHUNK = 1024 * 1024
+_INDEX_NAME = "index.json"
+_LOCK_NAME = "index.lock"
+
+# Aynı süreçteki iş parçacıkları için; süreçler arası sıralama index.lock dosya kilidiyle yapılır
+_index_lock = threading.Lock()
+
+
+@contextmanager
+def _locked(lock_path):
+    """index.json'u oku-değiştir-yaz süresince hem iş parçacıklarını hem de aynı önbelleği paylaşan süreçleri sıralar."""
+    with _index_lock, open(lock_path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def content_hash(path):
+    """Dosya içeriğinin SHA-256 özetini döndürür."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PCMCache:
+    """
+    Video seslerini sabit örnekleme hızında 16 bit PCM WAV olarak saklayan disk önbelleği.
+    Dosyalar video içeriğinin özetine göre adlandırılır; aynı içerikteki kopyalar tek dosyayı paylaşır.
+    İçerik özeti (yol, boyut, değiştirilme zamanı) üçlüsüne göre index.json'da tutulduğundan
+    değişmeyen bir video yeniden okunmaz. index.json toplu işlerdeki gibi ayrı süreçlerden de güncellenebilir;
+    her güncelleme dosya kilidi altında okunup birleştirilerek yazılır. Boyut sınırı aşıldığında en uzun süredir
+    kullanılmayanlar silinir ve dosyası kalmayan index kayıtları atılır.
+    """
+
+    def __init__(self, cache_dir=PCM_CACHE_DIR, max_bytes=PCM_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, _INDEX_NAME)
+        self.lock_path = os.path.join(self.cache_dir, _LOCK_NAME)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        # Yalnızca _locked altında çağrılır; geçici ad yine de benzersizdir, yarım dosya index'in yerini almaz
+        fd, temp_path = tempfile.mkstemp(suffix='.json.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def key(self, video_path):
+        """Videonun içerik özetini döndürür; yol, boyut ve zaman değişmediyse index'ten alınır."""
+        stat = os.stat(video_path)
+        location = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        with _locked(self.lock_path):
+            index = self._load_index()
+            if location in index:
+                return index[location]
+        digest = content_hash(video_path)
+        with _locked(self.lock_path):
+            index = self._load_index()
+            # Aynı yolun eski kayıtları atılır
+            prefix = f"{os.path.abspath(video_path)}|"
+            index = {entry: value for entry, value in index.items() if not entry.startswith(prefix)}
+            index[location] = digest
+            self._save_index(index)
+        return digest
+
+    def path_for(self, key, fps, nchannels):
+        return os.path.join(self.cache_dir, f"{key}_{fps}_{nchannels}.wav")
+
+    def get(self, video_path, fps, nchannels=2):
+        """Önbellekteki PCM dosyasının yolunu döndürür, yoksa None. Erişim zamanı LRU için güncellenir."""
+        path = self.path_for(self.key(video_path), fps, nchannels)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_decode(self, video_path, fps, nchannels=2, log_callback=None, cancel_token=None):
+        """
+        Önbellekte yoksa videonun sesini ffmpeg ile bir kez çözüp önbelleğe yazar ve yolunu döndürür.
+        cancel_token iptal edilirse çözme durdurulur ve yarım dosya silinir.
+        """
+        from ffmpeg_mux import get_ffmpeg_binary
+        from checkpoint import check_cancelled
+
+        key = self.key(video_path)
+        path = self.path_for(key, fps, nchannels)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        if log_callback:
+            log_callback("Video sesi çözülüp önbelleğe alınıyor...")
+        fd, temp_path = tempfile.mkstemp(suffix='.wav.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_wav_header(f, nchannels, fps, 0)
+                command = [get_ffmpeg_binary(), '-v', 'error', '-i', video_path, '-vn', '-f', 's16le',
+                           '-acodec', 'pcm_s16le', '-ar', str(fps), '-ac', str(nchannels), '-']
+                decoder = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                try:
+                    for chunk in iter(lambda: decoder.stdout.read(_CHUNK), b''):
+                        check_cancelled(cancel_token)
+                        f.write(chunk)
+                finally:
+                    decoder.stdout.close()
+                    if decoder.poll() is None:
+                        decoder.terminate()
+                    stderr = decoder.stderr.read()
+                    decoder.wait()
+                if decoder.returncode != 0:
+                    raise subprocess.CalledProcessError(decoder.returncode, 'ffmpeg', stderr=stderr)
+            # Başlıktaki veri boyutu çözme bittikten sonra düzeltilir
+            frames = read_wav_header(temp_path)['frames']
+            with open(temp_path, 'r+b') as f:
+                write_wav_header(f, nchannels, fps, frames)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict(keep=[path])
+        return path
+
+    def evict(self, keep=()):
+        """
+        Toplam boyut max_bytes değerini aşıyorsa, keep içindekiler hariç en eski dosyaları siler ve
+        hiçbir dosyası kalmayan içerik özetlerinin index kayıtlarını atar.
+        """
+        total, removed = evict_oldest(self.cache_dir, self.max_bytes, keep)
+        if removed:
+            # Dosya adları "<özet>_<hız>_<kanal>.wav" biçimindedir; başka hız/kanal dosyası kalan özetler korunur
+            digests = {os.path.basename(path).split('_', 1)[0] for path in removed}
+            with _locked(self.lock_path):
+                with os.scandir(self.cache_dir) as it:
+                    digests -= {entry.name.split('_', 1)[0] for entry in it if entry.name.endswith('.wav')}
+                index = self._load_index()
+                pruned = {location: digest for location, digest in index.items() if digest not in digests}
+                if len(pruned) != len(index):
+                    self._save_index(pruned)
+        return total
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+import math
+import queue
+import threading
+import subprocess
+import time
+import numpy as np
+from audio_mixer import MixedAudioClip, BLOCK_SECONDS, MIX_FPS
+from ffmpeg_mux import get_ffmpeg_binary, open_pcm_encoder, close_pcm_encoder
+from wav_io import quantize, open_wav_memmap
+from checkpoint import RenderCancelled, check_cancelled
+
+# Seslendirme aşamasının zaman çizelgesinde tek seferde ilerlediği altyazı sayısı
+SYNTH_CHUNK_SIZE = 32
+
+# Aşamalar arasındaki kuyrukların blok cinsinden kapasitesi (geri basınç sınırı)
+QUEUE_BLOCKS = 8
+
+_POLL_SECONDS = 0.1
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+class SynthesisWatermark:
+    """
+    Seslendirmenin zaman çizelgesinde ulaştığı noktayı tutar. Altyazılar başlangıç sırasıyla
+    seslendirildiğinden, eşiğin öncesinde başlayan tüm TTS sesleri hazırdır.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.time = 0.0
+        self.pending = []
+
+    def publish(self, tts_files, watermark):
+        with self.condition:
+            self.pending.extend(tts_files)
+            self.time = watermark
+            self.condition.notify_all()
+
+    def wait_for(self, t, stop):
+        """Eşik t'ye ulaşana kadar bekler ve o ana kadar yayımlanan yeni girişleri döndürür."""
+        with self.condition:
+            while self.time < t:
+                if stop.is_set():
+                    raise PipelineStopped()
+                self.condition.wait(_POLL_SECONDS)
+            pending, self.pending = self.pending, []
+        return pending
+
+
+def _put(q, item, stop):
+    while True:
+        if stop.is_set():
+            raise PipelineStopped()
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _get(q, stop):
+    while True:
+        if stop.is_set():
+            raise PipelineStopped()
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+
+
+class _Stage(threading.Thread):
+    """Hata durumunda tüm boru hattını durduran ve meşgul kaldığı süreyi ölçen aşama iş parçacığı."""
+
+    def __init__(self, name, target, stop, errors):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.stop = stop
+        self.errors = errors
+        self.busy = 0.0
+
+    def run(self):
+        try:
+            self._target_fn(self)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self.errors.append(e)
+            self.stop.set()
+
+
+def render_pipelined(video_path, video_info, captions, synthesize_chunk, envelope, output_path, audio_codec,
+                     mux_video=True, video_codec='copy', log_callback=None, block_seconds=BLOCK_SECONDS,
+                     queue_blocks=QUEUE_BLOCKS, fps=MIX_FPS, nchannels=2, metrics=None, cancel_token=None,
+                     source_pcm=None, segment_seconds=None):
+    """
+    Seslendirme, video sesini çözme, karıştırma ve kodlama aşamalarını eş zamanlı çalıştırır.
+    Aşamalar sınırlı kuyruklarla bağlıdır; yavaş bir aşama öncekileri bekletir.
+    Giriş: captions (başlangıca göre sıralı altyazılar), synthesize_chunk (altyazı listesi -> tts_files)
+    Çıkış: seslendirilen tüm TTS girişleri
+    metrics (progress.RenderMetrics) verilirse aşamaların meşgul süreleri ve karıştırma ilerlemesi buna aktarılır.
+    ffmpeg kodlayıcısı başarısız olursa subprocess.CalledProcessError yükseltilir.
+    cancel_token iptal edilirse seslendirme parçaları ve karışım blokları arasında durulur ve RenderCancelled yükselir.
+    source_pcm (pcm_cache.PCMCache dosyası) verilirse video sesi ffmpeg yerine bellek eşlemesinden okunur.
+    segment_seconds verilirse output_path m3u8 oynatma listesidir; çıktı bölüm bölüm yazılır.
+    """
+    stop = threading.Event()
+    errors = []
+    watermark = SynthesisWatermark()
+    decoded = queue.Queue(maxsize=queue_blocks)
+    mixed = queue.Queue(maxsize=queue_blocks)
+    block = max(1, int(block_seconds * fps))
+    all_tts = []
+    encoder_result = {}
+
+    def synthesize(stage):
+        for chunk_start in range(0, len(captions), SYNTH_CHUNK_SIZE):
+            check_cancelled(cancel_token)
+            chunk = [captions[i] for i in range(chunk_start, min(chunk_start + SYNTH_CHUNK_SIZE, len(captions)))]
+            started = time.perf_counter()
+            tts_files = synthesize_chunk(chunk)
+            stage.busy += time.perf_counter() - started
+            all_tts.extend(tts_files)
+            next_index = chunk_start + SYNTH_CHUNK_SIZE
+            next_start = captions[next_index]['start'].total_seconds() if next_index < len(captions) else math.inf
+            watermark.publish(tts_files, next_start)
+            if stop.is_set():
+                raise PipelineStopped()
+        watermark.publish([], math.inf)
+
+    def decode(stage):
+        if not video_info['has_audio']:
+            _put(decoded, None, stop)
+            return
+        if source_pcm:
+            samples = open_wav_memmap(source_pcm)
+            for position in range(0, len(samples), block):
+                started = time.perf_counter()
+                frames = samples[position:position + block] / 2 ** 15
+                stage.busy += time.perf_counter() - started
+                _put(decoded, (position, frames), stop)
+            _put(decoded, None, stop)
+            return
+        command = [get_ffmpeg_binary(), '-v', 'error', '-i', video_path, '-vn', '-f', 's16le',
+                   '-acodec', 'pcm_s16le', '-ar', str(fps), '-ac', str(nchannels), '-']
+        reader = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            position = 0
+            while True:
+                started = time.perf_counter()
+                data = reader.stdout.read(block * nchannels * 2)
+                stage.busy += time.perf_counter() - started
+                if not data:
+                    break
+                frames = np.frombuffer(data, dtype='<i2').reshape(-1, nchannels) / 2 ** 15
+                _put(decoded, (position, frames), stop)
+                position += len(frames)
+            _put(decoded, None, stop)
+        finally:
+            reader.stdout.close()
+            reader.terminate()
+            reader.wait()
+
+    def mix(stage):
+        mixer = MixedAudioClip(None, [], envelope, 0.0, fps)
+        mixer.nchannels = nchannels
+        # moviepy'nin VideoFileClip.audio için yaptığı gibi örnekler kap süresiyle sınırlanır
+        video_samples = int(fps * video_info['duration'])
+        position = 0
+        decoding = True
+        while True:
+            frames = None
+            if decoding:
+                item = _get(decoded, stop)
+                if item is None:
+                    decoding = False
+                else:
+                    # Kap süresinden sonra çözülen örnekler (ör. AAC dolgu) atılır
+                    _, frames = item
+                    frames = frames[:max(0, video_samples - position)]
+                    if len(frames) == 0:
+                        continue
+            if frames is None:
+                # Video sesi bittiyse kalan süre yalnızca TTS seslerinden oluşur
+                watermark_entries = watermark.wait_for(math.inf, stop)
+                mixer.timeline.extend(watermark_entries)
+                total = int(fps * max(video_info['duration'], mixer.timeline.end))
+                if position >= total:
+                    break
+                frames = np.zeros((min(block, total - position), nchannels))
+            check_cancelled(cancel_token)
+            t = (1.0 / fps) * np.arange(position, position + len(frames))
+            # Otomatik kısma, bloktan sonra başlayacak anlatımları da bilmelidir
+            mixer.timeline.extend(watermark.wait_for(t[-1] + 1.0 / fps + envelope.lookahead, stop))
+            started = time.perf_counter()
+            out = mixer.mix_frames(t, frames)
+            stage.busy += time.perf_counter() - started
+            _put(mixed, quantize(out).tobytes(), stop)
+            position += len(frames)
+            if metrics:
+                # Toplam süre seslendirme bitene kadar kesin değildir; video süresi tahmin olarak kullanılır
+                total_seconds = int(math.ceil(max(video_info['duration'], mixer.timeline.end)))
+                metrics.advance('mix', min(total_seconds, int(position / fps)), total_seconds)
+        _put(mixed, None, stop)
+
+    def encode(stage):
+        encoder = open_pcm_encoder(output_path, fps, nchannels, audio_codec, video_path if mux_video else None,
+                                   video_codec, segment_seconds=segment_seconds)
+        try:
+            while True:
+                data = _get(mixed, stop)
+                if data is None:
+                    break
+                started = time.perf_counter()
+                encoder.stdin.write(data)
+                stage.busy += time.perf_counter() - started
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            close_pcm_encoder(encoder, check=False)
+            raise
+        try:
+            close_pcm_encoder(encoder)
+        except subprocess.CalledProcessError as e:
+            encoder_result['error'] = e
+            stop.set()
+
+    started = time.perf_counter()
+    stages = [_Stage(name, target, stop, errors) for name, target in
+              (('seslendirme', synthesize), ('çözme', decode), ('karıştırma', mix), ('kodlama', encode))]
+    metric_names = {'seslendirme': 'synthesis', 'çözme': 'decode', 'karıştırma': 'mix', 'kodlama': 'encode'}
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+
+    # İptal, durdurulan kodlayıcının hatasından önce bildirilir
+    cancelled = [error for error in errors if isinstance(error, RenderCancelled)]
+    if cancelled:
+        raise cancelled[0]
+    if 'error' in encoder_result:
+        raise encoder_result['error']
+    if errors:
+        raise errors[0]
+
+    if metrics:
+        for stage in stages:
+            metrics.record(metric_names[stage.name], stage.busy)
+
+    if log_callback:
+        timings = ', '.join(f"{stage.name} {stage.busy:.1f} sn" for stage in stages)
+        log_callback(f"Ardışık render {time.perf_counter() - started:.1f} sn sürdü ({timings}).")
+    return all_tts
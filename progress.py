@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Render aşamaları; olaylar ve ölçüm dosyası bu adları kullanır
+STAGES = ('parse', 'synthesis', 'probe', 'decode', 'mix', 'encode', 'cleanup')
+
+STAGE_LABELS = {
+    'parse': "Altyazılar okunuyor",
+    'synthesis': "Seslendirme",
+    'probe': "Ses süreleri okunuyor",
+    'decode': "Video sesi çözülüyor",
+    'mix': "Karıştırma",
+    'encode': "Kodlama",
+    'cleanup': "Temizlik"
+}
+
+
+def peak_rss_bytes():
+    """
+    Bu sürecin ve beklenmiş alt süreçlerinin (ffmpeg, TTS işçileri) en yüksek bellek kullanımını döndürür.
+    Çıkış: {'self': bayt veya None, 'children': bayt veya None}
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows'ta resource modülü yoktur; psutil kuruluysa tepe çalışma kümesi kullanılır
+        try:
+            import psutil
+        except ImportError:
+            return {'self': None, 'children': None}
+        info = psutil.Process().memory_info()
+        return {'self': getattr(info, 'peak_wset', None), 'children': None}
+    # Linux ru_maxrss değerini KB, macOS bayt cinsinden verir
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return {'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale}
+
+
+class RenderMetrics:
+    """
+    Bir render'ın aşama sürelerini ve ilerlemesini toplar, her değişikliği progress_callback'e olay olarak iletir.
+    Olaylar sözlüktür:
+        {'type': 'stage_start', 'stage'}
+        {'type': 'stage_end', 'stage', 'seconds'}
+        {'type': 'progress', 'stage', 'done', 'total', 'rate', 'eta'}
+    rate saniyede işlenen birim (seslendirmede altyazı, karıştırmada saniye ses), eta kalan saniyedir.
+    Olaylar render iş parçacıklarından gelir; arayüz kendi hızında tüketmelidir.
+    """
+
+    def __init__(self, progress_callback=None):
+        self.progress_callback = progress_callback
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.stage_seconds = {}
+        self.stage_started = {}
+        self.progress = {}
+        self.info = {}
+
+    def _emit(self, event):
+        if self.progress_callback:
+            self.progress_callback(event)
+
+    def start(self, stage):
+        with self.lock:
+            self.stage_started[stage] = time.perf_counter()
+        self._emit({'type': 'stage_start', 'stage': stage})
+
+    def end(self, stage):
+        with self.lock:
+            seconds = time.perf_counter() - self.stage_started.pop(stage)
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        self._emit({'type': 'stage_end', 'stage': stage, 'seconds': seconds})
+
+    @contextmanager
+    def stage(self, stage):
+        self.start(stage)
+        try:
+            yield self
+        finally:
+            self.end(stage)
+
+    def record(self, stage, seconds):
+        """Eş zamanlı çalışan aşamaların (ör. boru hattı) ölçülen meşgul sürelerini ekler."""
+        with self.lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def advance(self, stage, done, total):
+        """Aşamanın ilerlemesini bildirir; hız ve kalan süre aşamanın başlangıcından hesaplanır."""
+        now = time.perf_counter()
+        with self.lock:
+            elapsed = now - self.stage_started.get(stage, self.started)
+            self.progress[stage] = {'done': done, 'total': total}
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else None
+        self._emit({'type': 'progress', 'stage': stage, 'done': done, 'total': total, 'rate': rate, 'eta': eta})
+
+    def progress_for(self, stage, offset=0, total=None):
+        """(done, total) bildiren alt işlevler için bu aşamaya ilerleme aktaran bir geri çağırma döndürür."""
+        def callback(done, chunk_total):
+            self.advance(stage, offset + done, total if total is not None else chunk_total)
+        return callback
+
+    def to_dict(self):
+        with self.lock:
+            stages = dict(self.stage_seconds)
+            progress = {stage: dict(value) for stage, value in self.progress.items()}
+        elapsed = time.perf_counter() - self.started
+        result = {
+            'total_seconds': round(elapsed, 3),
+            'stages': {stage: round(seconds, 3) for stage, seconds in stages.items()},
+            'peak_rss_bytes': peak_rss_bytes()
+        }
+        synthesis = progress.get('synthesis')
+        if synthesis and stages.get('synthesis'):
+            result['captions_per_second'] = round(synthesis['done'] / stages['synthesis'], 3)
+        result.update(self.info)
+        return result
+
+    def write_json(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, path)
+
+
+def make_proglog_logger(metrics, stage, cancel_token=None):
+    """
+    moviepy'nin write_audiofile/write_videofile ilerleme çubuğunu metrics olaylarına aktaran bir logger döndürür.
+    cancel_token iptal edildiyse bir sonraki parçada checkpoint.RenderCancelled yükseltilir.
+    """
+    import proglog
+    from checkpoint import check_cancelled
+
+    class _MetricsLogger(proglog.ProgressBarLogger):
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if attr == 'index':
+                check_cancelled(cancel_token)
+                total = self.bars[bar].get('total') or 0
+                # proglog son adımda indeksi toplam değerine eşitler
+                metrics.advance(stage, min(value + 1, total) if total else value + 1, total)
+
+    return _MetricsLogger()
+
+
+def format_progress(event):
+    """Bir ilerleme olayını kullanıcıya gösterilecek kısa bir metne çevirir."""
+    text = f"{STAGE_LABELS.get(event['stage'], event['stage'])}: {event['done']}/{event['total']}"
+    if event.get('eta') is not None:
+        text += f", kalan ~{int(event['eta'])} sn"
+    return text
@@ -0,0 +1,935 @@
+# -*- coding: utf-8 -*-
+
+import os
+import math
+import shutil
+import time
+import subprocess
+import numpy as np
+from srt_parser import CaptionStore
+from media_probe import probe_audio_duration, probe_media
+from ffmpeg_mux import (mux_audio, mux_audio_stream_copy, encode_audio, open_pcm_encoder, close_pcm_encoder,
+                        drop_partial_last_segment)
+from wav_io import quantize
+from tts_cache import TTSCache, TTS_CACHE_DIR, normalize_text
+from pcm_cache import PCMCache, PCM_CACHE_DIR
+from tts_backends import get_backend, DEFAULT_BACKEND
+from progress import RenderMetrics, make_proglog_logger
+from checkpoint import RenderCancelled, check_cancelled
+
+# moviepy ve ses karıştırıcı ağır modüller olduğundan yalnızca render sırasında içe aktarılır
+
+# Önizleme penceresinin iki yanına eklenen süre (saniye); geçişlerin duyulabilmesi için
+PREVIEW_PADDING_SECONDS = 1.0
+
+
+def synthesize_captions(captions, tts_rate=200, voice=None, log_callback=None, tts_cache=None, tts_workers=1,
+                        work_dir="conversion", first_index=0, progress_callback=None, backend=None, in_memory=False):
+    """
+    Altyazıları seslendirir. Aynı metin yalnızca bir kez seslendirilir, önbellekte bulunanlar atlanır.
+    Giriş: captions, tts_rate, voice, log_callback, tts_cache (TTSCache veya None),
+    tts_workers (1'den büyükse seslendirme süreç havuzunda paralel yapılır), work_dir (geçici dosyaların dizini),
+    first_index (altyazılar parça parça seslendirilirken geçici dosya adlarının çakışmaması için ilk indeks),
+    progress_callback ((tamamlanan altyazı, toplam altyazı) alır),
+    backend (tts_backends arka uç adı veya nesnesi; None ise varsayılan arka uç),
+    in_memory (True ise ve önbellek kullanılmıyorsa, arka uç destekliyorsa ses diske hiç yazılmaz)
+    Çıkış: (altyazı başına WAV yolları veya bellek içi seslendirmede WAV baytları, işlem sonunda silinecek geçici
+    dosyalar). Seslendirilemeyen altyazıların yolu None olur.
+    """
+    backend = get_backend(backend)
+    engine_version = backend.version()
+    in_memory = in_memory and tts_cache is None and backend.capabilities.in_memory
+    files = [None] * len(captions)
+    waiting = {}
+    jobs = []
+    job_keys = []
+    cached_count = 0
+
+    for index, entry in enumerate(captions):
+        text = entry['text']
+        if tts_cache:
+            key = tts_cache.key(text, voice, tts_rate, engine_version)
+        else:
+            key = normalize_text(text)
+        if key in waiting:
+            waiting[key].append(index)
+            continue
+        waiting[key] = [index]
+        cached = tts_cache.get(key) if tts_cache else None
+        if cached:
+            files[index] = cached
+            cached_count += 1
+            continue
+        if tts_cache:
+            audio_filename = tts_cache.temp_path()
+        elif in_memory:
+            audio_filename = None
+        else:
+            audio_filename = os.path.join(work_dir, f"temp_tts_{first_index + index}.wav")
+        jobs.append((text, audio_filename))
+        job_keys.append(key)
+
+    if log_callback and cached_count:
+        log_callback(f"{cached_count} altyazı önbellekten alındı, {len(jobs)} altyazı seslendirilecek.")
+
+    temp_files = []
+    tts_progress = None
+    if progress_callback:
+        # Önbellekten gelenler ve tekrarlar baştan tamamlanmış sayılır
+        ready = len(captions) - len(jobs)
+        progress_callback(ready, len(captions))
+
+        def tts_progress(done, total):
+            progress_callback(ready + done, len(captions))
+
+    if jobs and in_memory:
+        results = backend.synthesize_in_memory([text for text, _ in jobs], 1.0, tts_rate, voice, tts_workers,
+                                               log_callback, tts_progress)
+        for key, data in zip(job_keys, results):
+            files[waiting[key][0]] = data
+    elif jobs:
+        # TTS ses seviyesini burada varsayılan olarak ayarlıyoruz
+        failed = set(backend.synthesize(jobs, 1.0, tts_rate, voice, tts_workers, log_callback, tts_progress))
+        for job_index, (key, (text, audio_filename)) in enumerate(zip(job_keys, jobs)):
+            if job_index in failed:
+                if not tts_cache:
+                    temp_files.append(audio_filename)
+                elif os.path.exists(audio_filename):
+                    os.remove(audio_filename)
+                continue
+            if tts_cache:
+                audio_filename = tts_cache.commit(key, audio_filename)
+            else:
+                temp_files.append(audio_filename)
+            files[waiting[key][0]] = audio_filename
+
+    # Tekrarlanan altyazılar ilk seslendirmeyi kullanır
+    for indices in waiting.values():
+        for index in indices[1:]:
+            files[index] = files[indices[0]]
+
+    if tts_cache:
+        tts_cache.evict(keep=[path for path in files if path])
+
+    return files, temp_files
+
+
+def synthesize_captions_chunked(captions, tts_rate=200, voice=None, log_callback=None, tts_cache=None,
+                                tts_workers=1, work_dir="conversion", metrics=None, backend=None, cancel_token=None,
+                                checkpoint=None, in_memory=False):
+    """
+    Altyazıları CHECKPOINT_CAPTIONS'lık parçalar halinde seslendirir; iptal her parçadan önce denetlenir.
+    checkpoint (RenderCheckpoint) verilirse tamamlanan parçalar kaydedilir ve daha önce tamamlanmış parçalar atlanır.
+    Çıkış: synthesize_captions ile aynı
+    """
+    from checkpoint import CHECKPOINT_CAPTIONS, check_cancelled
+
+    metrics = metrics or RenderMetrics()
+    files = [None] * len(captions)
+    temp_files = []
+    try:
+        for chunk_start in range(0, len(captions), CHECKPOINT_CAPTIONS):
+            check_cancelled(cancel_token)
+            indices = range(chunk_start, min(chunk_start + CHECKPOINT_CAPTIONS, len(captions)))
+            if checkpoint and all(checkpoint.caption_file(index) for index in indices):
+                for index in indices:
+                    files[index] = checkpoint.caption_file(index)
+                metrics.advance('synthesis', indices[-1] + 1, len(captions))
+                continue
+            chunk = [captions[index] for index in indices]
+            chunk_files, chunk_temp_files = synthesize_captions(chunk, tts_rate, voice, log_callback, tts_cache,
+                                                                tts_workers, work_dir, chunk_start,
+                                                                metrics.progress_for('synthesis', chunk_start,
+                                                                                     len(captions)), backend,
+                                                                in_memory and checkpoint is None)
+            files[chunk_start:chunk_start + len(chunk)] = chunk_files
+            temp_files.extend(chunk_temp_files)
+            if checkpoint:
+                checkpoint.add_captions({index: path for index, path in zip(indices, chunk_files) if path})
+    except RenderCancelled:
+        # Kontrol noktası yoksa render devam ettirilemez; tamamlanan parçaların geçici dosyaları bırakılmaz
+        if checkpoint is None:
+            cleanup_temp_files(temp_files)
+        raise
+    if checkpoint and not tts_cache:
+        # Önceki çalışmada seslendirilen geçici dosyalar da iş bitince silinir
+        temp_files.extend(path for path in set(files) if path and path not in temp_files)
+    return files, temp_files
+
+
+def build_tts_files(captions, caption_files):
+    """
+    Seslendirilen altyazılar için karıştırıcının kullandığı {'file', 'start', 'duration'} listesini oluşturur.
+    Bellek içi seslendirilen altyazıların girişinde WAV baytları 'data' anahtarındadır; 'file' yalnızca addır.
+    """
+    from wav_io import read_wav_header
+
+    tts_files = []
+    for entry, audio_filename in zip(captions, caption_files):
+        if audio_filename is None:
+            continue
+        if isinstance(audio_filename, bytes):
+            # Tekrarlanan altyazılar aynı bayt nesnesini paylaşır; ad da aynı olduğundan örnekler bir kez çözülür
+            tts_files.append({
+                'file': f"<bellek:{id(audio_filename)}>",
+                'data': audio_filename,
+                'start': entry['start'].total_seconds(),
+                'duration': read_wav_header(audio_filename)['duration']
+            })
+            continue
+        tts_files.append({
+            'file': audio_filename,
+            'start': entry['start'].total_seconds(),
+            'duration': probe_audio_duration(audio_filename)
+        })
+    return tts_files
+
+
+def build_composite_audio(video_audio, video_duration, tts_files, tts_volume=1.0, video_volume=1.0,
+                          volume_intervals=None):
+    """
+    Video sesini ve TTS seslerini aralık başına alt kliplere bölüp CompositeAudioClip ile birleştirir.
+    Çıkış: (birleşik ses klibi, işlem sonunda kapatılacak TTS klipleri)
+    """
+    from moviepy.editor import AudioFileClip, CompositeAudioClip
+    from audio_mixer import GainEnvelope
+
+    # Parçaların ses seviyeleri her parça için tüm aralıkları taramak yerine ikili aramayla bulunur
+    envelope = GainEnvelope(volume_intervals, tts_volume, video_volume)
+
+    # Tüm zaman noktalarını topla
+    times = set([0, video_duration])
+    for tts in tts_files:
+        times.add(tts['start'])
+        times.add(tts['start'] + tts['duration'])
+    if volume_intervals:
+        for interval in volume_intervals:
+            times.add(interval['start'])
+            times.add(interval['end'])
+    times = sorted(times)
+
+    # Zaman aralıklarını oluştur ve ses seviyelerini belirle
+    intervals = []
+    for i in range(len(times) - 1):
+        start = times[i]
+        end = times[i + 1]
+        tts_vol, video_vol = (float(gain) for gain in envelope.gains_at(start))
+        intervals.append({
+            'start': start,
+            'end': end,
+            'tts_volume': tts_vol,
+            'video_volume': video_vol
+        })
+
+    # Video sesini parçalarına ayır ve ses seviyesini ayarla
+    adjusted_video_audio_segments = []
+    for interval in intervals:
+        start = interval['start']
+        end = interval['end']
+        video_vol = interval['video_volume']
+        segment = video_audio.subclip(start, end).volumex(video_vol)
+        segment = segment.set_start(start)
+        adjusted_video_audio_segments.append(segment)
+
+    # TTS seslerini ayarla
+    adjusted_tts_audio_clips = []
+    tts_audio_clips = []  # TTS ses kliplerini saklamak için
+    for tts in tts_files:
+        tts_start = tts['start']
+        tts_duration = tts['duration']
+        tts_audio = AudioFileClip(tts['file'])
+        tts_audio_clips.append(tts_audio)  # Kapatmak için saklıyoruz
+        tts_end = tts_start + tts_duration
+        for interval in intervals:
+            interval_start = interval['start']
+            interval_end = interval['end']
+            tts_vol = interval['tts_volume']
+            # Çakışma kontrolü
+            overlap_start = max(tts_start, interval_start)
+            overlap_end = min(tts_end, interval_end)
+            if overlap_start < overlap_end:
+                # Çakışma var
+                tts_clip_start = overlap_start - tts_start
+                tts_clip_end = overlap_end - tts_start
+                if tts_clip_end > tts_duration:
+                    tts_clip_end = tts_duration
+                tts_clip = tts_audio.subclip(tts_clip_start, tts_clip_end)
+                tts_clip = tts_clip.volumex(tts_vol)
+                tts_clip = tts_clip.set_start(overlap_start)
+                adjusted_tts_audio_clips.append(tts_clip)
+
+    # Tüm sesleri birleştir
+    all_audio_clips = adjusted_video_audio_segments + adjusted_tts_audio_clips
+    return CompositeAudioClip(all_audio_clips), tts_audio_clips
+
+
+def log_stream_copy_fallback(log_callback, error):
+    """Görüntü akışı kopyalanamayıp video yeniden kodlanacağında ffmpeg'in hata çıktısını günlüğe yazar."""
+    if not log_callback:
+        return
+    stderr = getattr(error, 'stderr', None)
+    detail = stderr.decode(errors='replace').strip() if isinstance(stderr, bytes) else str(error)
+    log_callback(f"Görüntü akışı kopyalanamadı, video yeniden kodlanacak: {detail}")
+
+
+def write_audio_and_mux(video_path, final_audio, video_output_path, log_callback=None, metrics=None,
+                        logger='bar'):
+    """
+    Yalnızca karıştırılmış sesi yazar ve kaynak videonun görüntü akışıyla yeniden kodlamadan birleştirir.
+    Çıkış: başarılıysa True; görüntü akışı kopyalanamazsa False (yeniden kodlama gerekir)
+    """
+    metrics = metrics or RenderMetrics()
+    audio_path = os.path.splitext(video_output_path)[0] + "_audio.wav"
+    final_audio.fps = 44100
+    with metrics.stage('mix'):
+        final_audio.write_audiofile(audio_path, fps=44100, codec='pcm_s16le', logger=logger)
+    try:
+        with metrics.stage('encode'):
+            mux_audio_stream_copy(video_path, audio_path, video_output_path)
+        return True
+    except subprocess.CalledProcessError as e:
+        log_stream_copy_fallback(log_callback, e)
+        return False
+    finally:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+
+def write_mix_wav(mixed, mix_path, metrics=None, cancel_token=None):
+    """Karışımı blok blok 16 bit PCM WAV dosyasına yazar; bellekte yalnızca tek blok tutulur."""
+    from wav_io import write_wav_header
+
+    metrics = metrics or RenderMetrics()
+    total_seconds = int(math.ceil(mixed.duration))
+    with open(mix_path, 'wb') as f:
+        write_wav_header(f, mixed.nchannels, mixed.fps, int(mixed.fps * mixed.duration))
+        for i0, block in mixed.iter_blocks():
+            check_cancelled(cancel_token)
+            f.write(quantize(block).tobytes())
+            metrics.advance('mix', min(total_seconds, int((i0 + len(block)) / mixed.fps)), total_seconds)
+    return mix_path
+
+
+def finalize_from_wav(video_path, mix_path, video_output_path, output_format, stream_copy=True,
+                      log_callback=None):
+    """Karışım WAV dosyasından mp4 (video akışıyla birleştirerek) veya mp3 çıktısı üretir."""
+    if output_format == "mp3":
+        encode_audio(mix_path, video_output_path, 'libmp3lame')
+        return video_output_path
+    if stream_copy:
+        try:
+            return mux_audio_stream_copy(video_path, mix_path, video_output_path)
+        except subprocess.CalledProcessError as e:
+            log_stream_copy_fallback(log_callback, e)
+    return mux_audio(video_path, mix_path, video_output_path, 'libx264', 'aac')
+
+
+def render_incremental(video_path, video_audio, video_duration, tts_files, tts_volume, video_volume,
+                       volume_intervals, output_format, video_output_path, stream_copy, work_dir, output_name,
+                       log_callback=None, metrics=None, logger='bar', cancel_token=None, ducking=None):
+    """
+    Önceki çalışmanın karışımını ve zaman çizelgesini kullanarak yalnızca değişen zaman aralıklarını yeniden karıştırır.
+    Önceki çalışma yoksa veya video ya da genel ayarlar değiştiyse tüm zaman çizelgesi karıştırılır.
+    """
+    from audio_mixer import GainEnvelope, MixedAudioClip, MIX_FPS
+    from incremental import (incremental_paths, build_timeline, load_timeline, save_timeline, affected_ranges,
+                             patch_mix_wav)
+
+    mix_path, timeline_path = incremental_paths(work_dir, output_name)
+    envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+    audio_duration = max([video_duration] + [tts['start'] + tts['duration'] for tts in tts_files])
+    final_audio = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+
+    timeline = build_timeline(video_path, tts_files, volume_intervals, tts_volume, video_volume, audio_duration,
+                              MIX_FPS, ducking)
+    previous = load_timeline(timeline_path) if os.path.exists(mix_path) else None
+    ranges = affected_ranges(previous, timeline)
+
+    # Karışım güncellenirken kesilirse bir sonraki çalışma tam render yapsın diye eski zaman çizelgesi silinir
+    if os.path.exists(timeline_path):
+        os.remove(timeline_path)
+
+    metrics = metrics or RenderMetrics()
+    with metrics.stage('mix'):
+        if ranges is None:
+            if log_callback:
+                log_callback("Önceki karışım kullanılamıyor, tüm zaman çizelgesi karıştırılıyor.")
+            final_audio.write_audiofile(mix_path, fps=MIX_FPS, codec='pcm_s16le', logger=logger)
+        else:
+            if log_callback:
+                changed = sum(end - start for start, end in ranges)
+                log_callback(f"{len(ranges)} değişen zaman aralığı ({changed:.1f} sn) yeniden karıştırılıyor.")
+            patch_mix_wav(mix_path, final_audio, ranges, MIX_FPS, cancel_token=cancel_token)
+
+    save_timeline(timeline_path, timeline)
+    with metrics.stage('encode'):
+        return finalize_from_wav(video_path, mix_path, video_output_path, output_format, stream_copy,
+                                 log_callback)
+
+
+def cleanup_temp_files(temp_files):
+    for temp_file in temp_files:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def open_video_audio(video_path, info, source_pcm=None, start=0.0, end=None):
+    """
+    Videonun sesini karıştırıcı için açar. source_pcm (PCMCache dosyası) verilirse bellek eşlemesiyle okunur,
+    yoksa ffmpeg borusundan start saniyesinden itibaren (end verilirse o saniyeye kadar) çözülür.
+    Videoda ses yoksa None döner.
+    """
+    from audio_mixer import MemmapPCMReader, PCMStreamReader, MIX_FPS
+
+    if not info['has_audio']:
+        return None
+    if source_pcm:
+        return MemmapPCMReader(source_pcm, info['duration'])
+    duration = info['duration'] if end is None else min(end, info['duration'])
+    return PCMStreamReader(video_path, duration, MIX_FPS, start=start)
+
+
+def stream_mixed_audio(mixed_clip, output_path, audio_codec, video_path=None, video_codec='copy', metrics=None,
+                       cancel_token=None, segment_seconds=None):
+    """
+    Karışımı blok blok hesaplayıp doğrudan ffmpeg kodlayıcısına aktarır; ara dosya yazılmaz.
+    Kodlama karıştırmayla eş zamanlı yürüdüğünden 'encode' süresi kodlayıcıyı beklerken geçen süredir.
+    segment_seconds verilirse output_path m3u8 oynatma listesidir ve çıktı bölüm bölüm yazılır.
+    ffmpeg başarısız olursa subprocess.CalledProcessError yükseltilir.
+    """
+    metrics = metrics or RenderMetrics()
+    encoder = open_pcm_encoder(output_path, mixed_clip.fps, mixed_clip.nchannels, audio_codec, video_path,
+                               video_codec, segment_seconds=segment_seconds)
+    total_seconds = int(math.ceil(mixed_clip.duration))
+    try:
+        for i0, block in mixed_clip.iter_blocks():
+            check_cancelled(cancel_token)
+            data = quantize(block).tobytes()
+            started = time.perf_counter()
+            encoder.stdin.write(data)
+            metrics.record('encode', time.perf_counter() - started)
+            metrics.advance('mix', min(total_seconds, int((i0 + len(block)) / mixed_clip.fps)), total_seconds)
+    except BrokenPipeError:
+        pass
+    except BaseException:
+        close_pcm_encoder(encoder, check=False)
+        raise
+    close_pcm_encoder(encoder)
+    return output_path
+
+
+def render_stream(video_path, tts_files, tts_volume, video_volume, volume_intervals, output_format,
+                  video_output_path, stream_copy=True, log_callback=None, metrics=None, cancel_token=None,
+                  source_pcm=None, ducking=None, segment_seconds=None):
+    """
+    Zaman çizelgesini sabit bloklar halinde karıştırıp kodlayıcıya akıtan render yolu.
+    Bellek kullanımı ve açık dosya sayısı video uzunluğundan ve altyazı sayısından bağımsızdır.
+    source_pcm verilirse video sesi çözülmeden önbellekteki PCM dosyasından okunur (bkz. open_video_audio).
+    segment_seconds verilirse video_output_path m3u8 oynatma listesidir (bkz. segment_playlist_path).
+    """
+    from audio_mixer import GainEnvelope, MixedAudioClip, MIX_FPS
+
+    info = probe_media(video_path)
+    video_audio = open_video_audio(video_path, info, source_pcm)
+    try:
+        envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+        audio_duration = max([info['duration']] + [tts['start'] + tts['duration'] for tts in tts_files])
+        mixed = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+        if output_format == "mp3":
+            return stream_mixed_audio(mixed, video_output_path, 'libmp3lame', metrics=metrics,
+                                      cancel_token=cancel_token, segment_seconds=segment_seconds)
+        if stream_copy:
+            try:
+                return stream_mixed_audio(mixed, video_output_path, 'aac', video_path, 'copy', metrics, cancel_token,
+                                          segment_seconds)
+            except subprocess.CalledProcessError as e:
+                log_stream_copy_fallback(log_callback, e)
+                mixed = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+        return stream_mixed_audio(mixed, video_output_path, 'aac', video_path, 'libx264', metrics, cancel_token,
+                                  segment_seconds)
+    finally:
+        if video_audio is not None:
+            video_audio.close()
+
+
+def render_pipelined_job(video_path, captions, tts_rate, voice, tts_cache, tts_workers, work_dir, tts_volume,
+                         video_volume, volume_intervals, output_format, video_output_path, stream_copy=True,
+                         log_callback=None, metrics=None, backend=None, cancel_token=None, source_pcm=None,
+                         ducking=None, in_memory=False, segment_seconds=None):
+    """
+    Seslendirme, çözme, karıştırma ve kodlamayı boru hattı olarak eş zamanlı çalıştırır.
+    source_pcm verilirse çözme aşaması ffmpeg yerine önbellekteki PCM dosyasını okur.
+    segment_seconds verilirse ilk bölüm, tüm altyazılar seslendirilmeden oynatılabilir hale gelir.
+    Çıkış: işlem sonunda silinecek geçici dosyalar
+    """
+    from audio_mixer import GainEnvelope
+    from pipeline import render_pipelined, SYNTH_CHUNK_SIZE
+
+    metrics = metrics or RenderMetrics()
+    temp_files = []
+    chunk_offset = [0]
+
+    def synthesize_chunk(chunk):
+        # Paralel seslendirmede havuz kurulumunu parça başına bölmemek için tek süreç yeterince büyük parçalarla çalışır
+        caption_files, chunk_temp_files = synthesize_captions(chunk, tts_rate, voice, log_callback, tts_cache,
+                                                              tts_workers if len(chunk) >= SYNTH_CHUNK_SIZE else 1,
+                                                              work_dir, chunk_offset[0],
+                                                              metrics.progress_for('synthesis', chunk_offset[0],
+                                                                                   len(captions)), backend,
+                                                              in_memory)
+        chunk_offset[0] += len(chunk)
+        temp_files.extend(chunk_temp_files)
+        return build_tts_files(chunk, caption_files)
+
+    info = probe_media(video_path)
+    envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+    try:
+        if output_format == "mp3":
+            render_pipelined(video_path, info, captions, synthesize_chunk, envelope, video_output_path, 'libmp3lame',
+                             mux_video=False, log_callback=log_callback, metrics=metrics,
+                             cancel_token=cancel_token, source_pcm=source_pcm, segment_seconds=segment_seconds)
+            return temp_files
+        try:
+            render_pipelined(video_path, info, captions, synthesize_chunk, envelope, video_output_path, 'aac',
+                             video_codec='copy' if stream_copy else 'libx264', log_callback=log_callback,
+                             metrics=metrics, cancel_token=cancel_token, source_pcm=source_pcm,
+                             segment_seconds=segment_seconds)
+        except subprocess.CalledProcessError as e:
+            if not stream_copy:
+                raise
+            log_stream_copy_fallback(log_callback, e)
+            chunk_offset[0] = 0
+            render_pipelined(video_path, info, captions, synthesize_chunk, envelope, video_output_path, 'aac',
+                             video_codec='libx264', log_callback=log_callback, metrics=metrics,
+                             cancel_token=cancel_token, source_pcm=source_pcm, segment_seconds=segment_seconds)
+    except RenderCancelled:
+        cleanup_temp_files(temp_files + [video_output_path])
+        raise
+    return temp_files
+
+
+def render_checkpointed(video_path, srt_path, captions, tts_rate, voice, tts_cache, tts_workers, work_dir,
+                        output_name, tts_volume, video_volume, volume_intervals, output_format, video_output_path,
+                        stream_copy=True, log_callback=None, metrics=None, backend=None, cancel_token=None,
+                        source_pcm=None, ducking=None):
+    """
+    Kaldığı yerden devam edebilen render. Seslendirilen altyazılar ve karışımın diske yazılan kısmı
+    work_dir/<output_name>_checkpoint.json dosyasına işlenir; aynı iş yeniden çalıştırıldığında
+    tamamlanan parçalar atlanır. Karışım önce WAV dosyasına blok blok yazılır, sonra kodlanır.
+    Çıkış: işlem sonunda silinecek geçici dosyalar
+    """
+    from audio_mixer import GainEnvelope, MixedAudioClip, MIX_FPS, BLOCK_SECONDS
+    from checkpoint import (RenderCheckpoint, CHECKPOINT_MIX_SECONDS, checkpoint_path, signature,
+                            check_cancelled)
+    from incremental import file_signature
+    from wav_io import write_wav_header, read_wav_header
+
+    metrics = metrics or RenderMetrics()
+    backend = get_backend(backend)
+    synthesis_signature = signature([file_signature(srt_path), tts_rate, voice, backend.version()])
+    mix_signature = signature([file_signature(video_path), tts_volume, video_volume, volume_intervals or [],
+                               MIX_FPS, ducking.to_list() if ducking else None])
+    checkpoint = RenderCheckpoint(checkpoint_path(work_dir, output_name), synthesis_signature, mix_signature)
+    if log_callback and checkpoint.resumed():
+        log_callback(f"Önceki çalışmadan devam ediliyor: {len(checkpoint.captions)} altyazı seslendirilmiş, "
+                     f"{checkpoint.mixed_frames / MIX_FPS:.1f} sn karıştırılmış.")
+
+    with metrics.stage('synthesis'):
+        caption_files, temp_files = synthesize_captions_chunked(captions, tts_rate, voice, log_callback, tts_cache,
+                                                                tts_workers, work_dir, metrics, backend,
+                                                                cancel_token, checkpoint)
+    with metrics.stage('probe'):
+        tts_files = build_tts_files(captions, caption_files)
+        info = probe_media(video_path)
+
+    mix_path = os.path.join(work_dir, f"{output_name}_partial.wav")
+    video_audio = open_video_audio(video_path, info, source_pcm)
+    try:
+        envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+        audio_duration = max([info['duration']] + [tts['start'] + tts['duration'] for tts in tts_files])
+        mixed = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+        total = int(MIX_FPS * audio_duration)
+        start = checkpoint.mixed_frames
+        if checkpoint.total_frames != total or not os.path.exists(mix_path) or \
+                read_wav_header(mix_path)['channels'] != mixed.nchannels:
+            start = 0
+        if start == 0:
+            # Dosya tam boyutta önceden ayrılır; devam ederken yalnızca kalan bloklar yazılır
+            with open(mix_path, 'wb') as f:
+                write_wav_header(f, mixed.nchannels, MIX_FPS, total)
+                f.truncate(f.tell() + total * mixed.nchannels * 2)
+        data_offset = read_wav_header(mix_path)['data_offset']
+        block = max(1, int(BLOCK_SECONDS * MIX_FPS))
+        save_every = max(block, int(CHECKPOINT_MIX_SECONDS * MIX_FPS))
+        # Son blok kısa olabildiğinden kaydedilen konum blok sınırında olmayabilir; yazım o bloğun başından sürer
+        first = start - start % block
+        with metrics.stage('mix'), open(mix_path, 'r+b') as f:
+            f.seek(data_offset + first * mixed.nchannels * 2)
+            last_saved = start
+            for i0 in range(first, total, block):
+                check_cancelled(cancel_token)
+                i1 = min(total, i0 + block)
+                f.write(quantize(mixed.mix((1.0 / MIX_FPS) * np.arange(i0, i1))).tobytes())
+                if i1 - last_saved >= save_every or i1 == total:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    checkpoint.set_mixed(i1, total)
+                    last_saved = i1
+                metrics.advance('mix', int(i1 / MIX_FPS), int(math.ceil(audio_duration)))
+    finally:
+        if video_audio is not None:
+            video_audio.close()
+
+    check_cancelled(cancel_token)
+    with metrics.stage('encode'):
+        finalize_from_wav(video_path, mix_path, video_output_path, output_format, stream_copy, log_callback)
+    checkpoint.remove()
+    return temp_files + [mix_path]
+
+
+def render_preview(video_path, captions, window, tts_rate, voice, tts_cache, tts_workers, work_dir, output_name,
+                   tts_volume, video_volume, volume_intervals, output_format, log_callback=None, metrics=None,
+                   backend=None, source_pcm=None, ducking=None, in_memory=False):
+    """
+    Yalnızca window (başlangıç, bitiş saniye) çevresindeki kısa bölümü render eder; ses seviyelerini denemek içindir.
+    Yalnızca pencereyle çakışan altyazılar seslendirilir ve video sesinin yalnızca o kesiti çözülür; pencereden
+    önce biten altyazıların taşan sesleri duyulmaz. mp3 biçiminde WAV, mp4 biçiminde kısa bir klip yazılır.
+    source_pcm verilirse video sesi hiç çözülmez; kesit önbellekteki PCM dosyasından okunur.
+    Çıkış: (önizleme dosyası yolu, işlem sonunda silinecek geçici dosyalar)
+    """
+    from audio_mixer import GainEnvelope, MixedAudioClip, MIX_FPS
+    from wav_io import write_wav_header
+
+    metrics = metrics or RenderMetrics()
+    with metrics.stage('probe'):
+        info = probe_media(video_path)
+    start = max(0.0, window[0] - PREVIEW_PADDING_SECONDS)
+    end = window[1] + PREVIEW_PADDING_SECONDS
+    if output_format == "mp4":
+        end = min(end, info['duration'])
+    if end <= start:
+        raise ValueError(f"Önizleme penceresi videonun dışında: {window[0]:.2f}-{window[1]:.2f} sn")
+
+    selected = [captions[index] for index in captions.overlapping(int(start * 1000), int(end * 1000))]
+    if log_callback:
+        log_callback(f"Önizleme: {start:.2f}-{end:.2f} sn, {len(selected)} altyazı.")
+    with metrics.stage('synthesis'):
+        caption_files, temp_files = synthesize_captions(selected, tts_rate, voice, log_callback, tts_cache,
+                                                        tts_workers, work_dir,
+                                                        progress_callback=metrics.progress_for('synthesis'),
+                                                        backend=backend, in_memory=in_memory)
+    with metrics.stage('probe'):
+        tts_files = build_tts_files(selected, caption_files)
+
+    extension = "mp4" if output_format == "mp4" else "wav"
+    preview_path = os.path.join(work_dir, f"{output_name}_preview.{extension}")
+    video_audio = None
+    if start < info['duration']:
+        video_audio = open_video_audio(video_path, info, source_pcm, start, end)
+    try:
+        envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+        mixed = MixedAudioClip(video_audio, tts_files, envelope, end, MIX_FPS)
+        total = int(MIX_FPS * end) - int(round(MIX_FPS * start))
+        total_seconds = int(math.ceil(end - start))
+        with metrics.stage('mix'):
+            if extension == "wav":
+                with open(preview_path, 'wb') as f:
+                    write_wav_header(f, mixed.nchannels, MIX_FPS, total)
+                    for i0, block in mixed.iter_blocks(start=start):
+                        f.write(quantize(block).tobytes())
+                        metrics.advance('mix', min(total_seconds, int(i0 / MIX_FPS - start + 1)), total_seconds)
+            else:
+                # Kesit kısa olduğundan görüntü en hızlı ayarla yeniden kodlanır; kopyalama anahtar kareye kayardı
+                encoder = open_pcm_encoder(preview_path, MIX_FPS, mixed.nchannels, 'aac', video_path, 'libx264',
+                                           video_window=(start, end - start),
+                                           video_args=['-preset', 'ultrafast'])
+                try:
+                    for i0, block in mixed.iter_blocks(start=start):
+                        encoder.stdin.write(quantize(block).tobytes())
+                        metrics.advance('mix', min(total_seconds, int(i0 / MIX_FPS - start + 1)), total_seconds)
+                except BrokenPipeError:
+                    pass
+                except BaseException:
+                    close_pcm_encoder(encoder, check=False)
+                    raise
+                close_pcm_encoder(encoder)
+    finally:
+        if video_audio is not None:
+            video_audio.close()
+    return preview_path, temp_files
+
+
+def segment_playlist_path(work_dir, output_name):
+    """Bölümlü çıktının m3u8 oynatma listesi; liste ve bölümleri work_dir/<output_name>_segments dizinindedir."""
+    return os.path.join(work_dir, f"{output_name}_segments", f"{output_name}.m3u8")
+
+
+def merge_audio_with_srt(video_path, srt_path, tts_volume=1.0, tts_rate=200, voice=None, output_format="mp4",
+                         video_volume=1.0, log_callback=None, volume_intervals=None,
+                         tts_cache_dir=TTS_CACHE_DIR, tts_workers=1, mixer="composite",
+                         stream_copy=True, work_dir="conversion", output_name="final_output", incremental=False,
+                         pipelined=False, progress_callback=None, metrics_path=None, tts_backend=DEFAULT_BACKEND,
+                         cancel_token=None, checkpoint=False, preview=None, pcm_cache_dir=PCM_CACHE_DIR,
+                         ducking=None, segment_seconds=None):
+    """
+    tts_backend seslendirme arka ucunun adı (bkz. tts_backends.BACKENDS) veya bir SynthesisBackend nesnesidir;
+    voice bu arka ucun ses kimliği olmalıdır.
+    progress_callback verilirse aşama başlangıç/bitiş ve ilerleme olayları (bkz. progress.RenderMetrics) ona iletilir;
+    bu durumda altyazı başına günlük satırı yazılmaz. metrics_path verilirse aşama süreleri, saniyedeki altyazı sayısı
+    ve tepe bellek kullanımı iş bitince (hata olsa da) bu JSON dosyasına yazılır.
+    cancel_token (checkpoint.CancelToken) iptal edildiğinde render altyazı parçaları ve karışım blokları arasında
+    checkpoint.RenderCancelled yükselterek durur. checkpoint True ise render kaldığı yerden devam edebilir
+    (bkz. render_checkpointed); bu durumda mixer ve pipelined dikkate alınmaz.
+    preview (başlangıç, bitiş) saniye olarak verilirse yalnızca bu pencerenin çevresi render edilir ve
+    önizleme dosyasının yolu döner (bkz. render_preview); tam çıktı yazılmaz.
+    pcm_cache_dir verilirse video sesi bir kez çözülüp bu dizinde saklanır ve sonraki render'larda bellek
+    eşlemesiyle okunur (bkz. pcm_cache.PCMCache); None ise her render sesi yeniden çözer. Boru hattı ve önizleme
+    sesi önbellekte varsa kullanır ama önbelleği doldurmak için beklemez.
+    Önbellek kapalıyken ve arka uç destekliyorsa (capabilities.in_memory) altyazı sesleri diske yazılmadan bellekte
+    tutulur; kontrol noktası, artımlı render ve composite karıştırıcı dosyaya ihtiyaç duyduğundan bu yolu kullanmaz.
+    ducking (audio_mixer.Ducking) verilirse video sesi anlatım boyunca otomatik kısılır; volume_intervals elle
+    girilen istisnalar olarak geçerli kalır. composite karıştırıcı kısmayı desteklemediğinden numpy kullanılır.
+    segment_seconds verilirse çıktı tek dosya yerine bu uzunlukta, tek başına oynatılabilen bölümler ve bir m3u8
+    oynatma listesi olarak yazılır; her bölüm karışım o noktaya ulaşınca hazırdır ve dönen yol oynatma listesidir
+    (bkz. segment_playlist_path). Bölümler akış halinde kodlandığından boru hattı veya stream karıştırıcısı
+    kullanılır; kontrol noktası ve artımlı render ile birlikte kullanılamaz.
+    volume_intervals volume_intervals sözlüklerinin listesi veya bir intervals.IntervalIndex olabilir.
+    """
+    # Dizin verilirse kontrol noktası imzası ve zaman çizelgesi için düz listeye çevrilir
+    volume_intervals = list(volume_intervals or [])
+    metrics = RenderMetrics(progress_callback)
+    metrics.info.update({'video': video_path, 'srt': srt_path, 'mixer': 'pipelined' if pipelined else mixer,
+                         'incremental': incremental, 'checkpoint': checkpoint, 'tts_workers': tts_workers,
+                         'preview': list(preview) if preview else None,
+                         'ducking': ducking.to_list() if ducking else None,
+                         'segment_seconds': segment_seconds})
+    backend = get_backend(tts_backend)
+    metrics.info['tts_backend'] = backend.name
+    try:
+        output_path = _merge_audio_with_srt(video_path, srt_path, tts_volume, tts_rate, voice, output_format,
+                                            video_volume, log_callback, volume_intervals, tts_cache_dir,
+                                            tts_workers, mixer, stream_copy, work_dir, output_name, incremental,
+                                            pipelined, metrics, backend, cancel_token, checkpoint, preview,
+                                            pcm_cache_dir, ducking, segment_seconds)
+        if segment_seconds and not preview and output_format == "mp3":
+            from audio_mixer import MIX_FPS
+            drop_partial_last_segment(output_path, MIX_FPS)
+        metrics.info.update({'status': 'ok', 'output': output_path})
+        return output_path
+    except RenderCancelled:
+        metrics.info['status'] = 'cancelled'
+        if segment_seconds and not preview:
+            # Yarım kalan oynatma listesi ve bölümleri bırakılmaz
+            shutil.rmtree(os.path.dirname(segment_playlist_path(work_dir, output_name)), ignore_errors=True)
+        raise
+    except BaseException as e:
+        metrics.info.update({'status': 'error', 'error': str(e)})
+        raise
+    finally:
+        if metrics_path:
+            metrics.write_json(metrics_path)
+
+
+def _merge_audio_with_srt(video_path, srt_path, tts_volume, tts_rate, voice, output_format, video_volume,
+                          log_callback, volume_intervals, tts_cache_dir, tts_workers, mixer, stream_copy, work_dir,
+                          output_name, incremental, pipelined, metrics, backend, cancel_token, checkpoint, preview,
+                          pcm_cache_dir, ducking, segment_seconds):
+    # moviepy'nin konsol ilerleme çubuğu yerine ilerleme olayları üretilir; iptal de bu çubuk üzerinden denetlenir
+    use_events = metrics.progress_callback or cancel_token is not None
+    logger = make_proglog_logger(metrics, 'mix', cancel_token) if use_events else 'bar'
+
+    # Her iş kendi çalışma dizinini kullanır; aynı anda çalışan işlerin dosyaları çakışmaz
+    os.makedirs(work_dir, exist_ok=True)
+    with metrics.stage('parse'):
+        captions = CaptionStore.from_srt(srt_path)
+    metrics.info['captions'] = len(captions)
+
+    if log_callback:
+        log_callback(f"SRT dosyasında toplam {len(captions)} altyazı bulundu.")
+
+    # Artımlı render değişmeyen altyazıların seslerini önbellekten aldığı için önbellek her zaman açıktır
+    if incremental and not tts_cache_dir:
+        tts_cache_dir = os.path.join(work_dir, "tts_cache")
+
+    # Tüm altyazılar tek motorla seslendirilir; tts_cache_dir None ise önbellek kullanılmaz
+    tts_cache = TTSCache(tts_cache_dir) if tts_cache_dir else None
+    video_output_path = os.path.join(work_dir, f"{output_name}.{output_format}")
+
+    if segment_seconds and not preview:
+        if checkpoint or incremental:
+            raise ValueError("Bölümlü çıktı kontrol noktası veya artımlı render ile birlikte kullanılamaz.")
+        # Önceki render'ın bölümleri yeni oynatma listesine karışmasın diye dizin boşaltılır
+        video_output_path = segment_playlist_path(work_dir, output_name)
+        shutil.rmtree(os.path.dirname(video_output_path), ignore_errors=True)
+        os.makedirs(os.path.dirname(video_output_path))
+        # Bölümler karışım ilerledikçe yazılmalı; sonucu sonda yazan karıştırıcılar yerine akış kullanılır
+        if not pipelined:
+            mixer = "stream"
+        metrics.info['mixer'] = 'pipelined' if pipelined else mixer
+
+    source_pcm = None
+    if pcm_cache_dir:
+        from audio_mixer import MIX_FPS
+        pcm_cache = PCMCache(pcm_cache_dir)
+        with metrics.stage('probe'):
+            has_audio = probe_media(video_path)['has_audio']
+        if has_audio and (preview or (pipelined and not incremental and not checkpoint)):
+            # Bu modlar tüm sesin çözülmesini beklemez; önbellek yalnızca hazırsa kullanılır
+            source_pcm = pcm_cache.get(video_path, MIX_FPS)
+        elif has_audio:
+            with metrics.stage('decode'):
+                source_pcm = pcm_cache.get_or_decode(video_path, MIX_FPS, log_callback=log_callback,
+                                                     cancel_token=cancel_token)
+    metrics.info['pcm_cache'] = bool(source_pcm)
+
+    # Seslerin diskte kalması gerekmiyorsa (önbellek, kontrol noktası, artımlı render ve dosyadan okuyan composite
+    # karıştırıcı yoksa) altyazı sesleri bellekte tutulur; karıştırıcı doğrudan baytlardan okur
+    in_memory = tts_cache is None and not checkpoint and not incremental and \
+        (bool(preview) or pipelined or mixer != "composite" or ducking is not None)
+    metrics.info['in_memory_tts'] = in_memory and backend.capabilities.in_memory
+
+    if preview:
+        preview_path, temp_files = render_preview(video_path, captions, preview, tts_rate, voice, tts_cache,
+                                                  tts_workers, work_dir, output_name, tts_volume, video_volume,
+                                                  volume_intervals, output_format, log_callback, metrics, backend,
+                                                  source_pcm, ducking, in_memory)
+        with metrics.stage('cleanup'):
+            cleanup_temp_files(temp_files)
+        if log_callback:
+            log_callback(f"Önizleme hazır: {preview_path}")
+        return preview_path
+
+    if checkpoint and not incremental:
+        temp_files = render_checkpointed(video_path, srt_path, captions, tts_rate, voice, tts_cache, tts_workers,
+                                         work_dir, output_name, tts_volume, video_volume, volume_intervals,
+                                         output_format, video_output_path, stream_copy, log_callback, metrics,
+                                         backend, cancel_token, source_pcm, ducking)
+        with metrics.stage('cleanup'):
+            cleanup_temp_files(temp_files)
+        if log_callback:
+            log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
+        return video_output_path
+
+    if pipelined and not incremental:
+        # Boru hattı akış karıştırıcısını kullanır; mixer argümanı dikkate alınmaz
+        temp_files = render_pipelined_job(video_path, captions, tts_rate, voice, tts_cache, tts_workers, work_dir,
+                                          tts_volume, video_volume, volume_intervals, output_format,
+                                          video_output_path, stream_copy, log_callback, metrics, backend,
+                                          cancel_token, source_pcm, ducking, in_memory, segment_seconds)
+        with metrics.stage('cleanup'):
+            cleanup_temp_files(temp_files)
+        if log_callback:
+            log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
+        return video_output_path
+
+    temp_files = []
+    try:
+        with metrics.stage('synthesis'):
+            if cancel_token is not None:
+                caption_files, temp_files = synthesize_captions_chunked(captions, tts_rate, voice, log_callback,
+                                                                        tts_cache, tts_workers, work_dir, metrics,
+                                                                        backend, cancel_token, in_memory=in_memory)
+            else:
+                caption_files, temp_files = synthesize_captions(captions, tts_rate, voice, log_callback,
+                                                                tts_cache, tts_workers, work_dir,
+                                                                progress_callback=metrics.progress_for('synthesis'),
+                                                                backend=backend, in_memory=in_memory)
+
+        with metrics.stage('probe'):
+            tts_files = build_tts_files(captions, caption_files)
+
+        return _mix_and_write(video_path, tts_files, temp_files, tts_volume, video_volume, volume_intervals,
+                              output_format, video_output_path, mixer, stream_copy, work_dir, output_name,
+                              incremental, log_callback, metrics, logger, cancel_token, source_pcm, ducking,
+                              segment_seconds)
+    except RenderCancelled:
+        # İptal edilen render'ın geçici TTS dosyaları ve yarım çıktısı bırakılmaz
+        cleanup_temp_files(temp_files + [video_output_path])
+        raise
+
+
+def _mix_and_write(video_path, tts_files, temp_files, tts_volume, video_volume, volume_intervals, output_format,
+                   video_output_path, mixer, stream_copy, work_dir, output_name, incremental, log_callback, metrics,
+                   logger, cancel_token, source_pcm=None, ducking=None, segment_seconds=None):
+    from moviepy.editor import VideoFileClip
+    from audio_mixer import GainEnvelope, MixedAudioClip, MemmapPCMReader, MIX_FPS
+
+    if mixer == "stream" and not incremental:
+        # Karıştırma ve kodlama eş zamanlıdır; 'encode' kodlayıcıyı bekleme süresini ayrıca gösterir
+        with metrics.stage('mix'):
+            render_stream(video_path, tts_files, tts_volume, video_volume, volume_intervals, output_format,
+                          video_output_path, stream_copy, log_callback, metrics, cancel_token, source_pcm, ducking,
+                          segment_seconds)
+        with metrics.stage('cleanup'):
+            cleanup_temp_files(temp_files)
+        if log_callback:
+            log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
+        return video_output_path
+
+    with metrics.stage('probe'):
+        # Ses önbellekten okunacaksa moviepy'nin ses okuyucusu hiç başlatılmaz
+        video = VideoFileClip(video_path, audio=source_pcm is None)
+    video_audio = MemmapPCMReader(source_pcm, video.duration) if source_pcm else video.audio
+
+    # Video sürelerini al - Otomatik algılama
+    video_duration = video.duration
+
+    if incremental:
+        try:
+            render_incremental(video_path, video_audio, video_duration, tts_files, tts_volume, video_volume,
+                               volume_intervals, output_format, video_output_path, stream_copy, work_dir,
+                               output_name, log_callback, metrics, logger, cancel_token, ducking)
+        finally:
+            with metrics.stage('cleanup'):
+                video.close()
+        if log_callback:
+            log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
+        return video_output_path
+
+    if mixer == "numpy" or ducking is not None:
+        # Kazanç eğrisi bir kez oluşturulur, karışım parça parça vektörel olarak yapılır.
+        # Otomatik kısma alt kliplerle ifade edilemediğinden composite yerine de bu yol kullanılır.
+        envelope = GainEnvelope(volume_intervals, tts_volume, video_volume, ducking)
+        audio_duration = max([video_duration] + [tts['start'] + tts['duration'] for tts in tts_files])
+        final_audio = MixedAudioClip(video_audio, tts_files, envelope, audio_duration, MIX_FPS)
+        tts_audio_clips = []
+    else:
+        final_audio, tts_audio_clips = build_composite_audio(video_audio, video_duration, tts_files, tts_volume,
+                                                             video_volume, volume_intervals)
+
+    # Final videoyu oluştur
+    final_video = video.set_audio(final_audio)
+
+    try:
+        # FFMPEG kullanarak videoyu kaydet
+        if output_format == "mp4":
+            if not (stream_copy and write_audio_and_mux(video_path, final_audio, video_output_path, log_callback,
+                                                        metrics, logger)):
+                with metrics.stage('encode'):
+                    final_video.write_videofile(video_output_path, codec='libx264', audio_codec='aac',
+                                                logger=make_proglog_logger(metrics, 'encode', cancel_token)
+                                                if logger != 'bar' else 'bar')
+        elif output_format == "mp3":
+            final_audio.fps = 44100  # Audio FPS ayarlanıyor
+            # Karıştırma ve mp3 kodlaması moviepy içinde birlikte yapılır
+            with metrics.stage('mix'):
+                final_audio.write_audiofile(video_output_path, codec='mp3', logger=logger)
+    finally:
+        with metrics.stage('cleanup'):
+            # TTS ses kliplerini kapatın
+            for tts_audio in tts_audio_clips:
+                tts_audio.close()
+
+            # Video ve final video kliplerini kapatın
+            final_video.close()
+            video.close()
+            # final_audio.close()  # CompositeAudioClip'in close metodu yok
+
+    with metrics.stage('cleanup'):
+        # Geçici TTS dosyalarını temizle
+        cleanup_temp_files(temp_files)
+
+    if log_callback:
+        log_callback(f"İşlem tamamlandı. Çıktı dosyası: {video_output_path}")
+
+    return video_output_path
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+"""
+Render işlerini HTTP üzerinden kabul eden yerel servis.
+
+Örnek:
+    python render_service.py --port 8765 --concurrency 2
+
+Uç noktalar:
+    POST /jobs                 İş ekler; gövde batch_runner iş tanımıyla aynıdır (name isteğe bağlı):
+                               {"video": "ders1.mp4", "srt": "ders1.srt", "settings": {...}, "intervals": [...]}
+    GET  /jobs                 Tüm işlerin durumu
+    GET  /jobs/<id>            Tek işin durumu
+    GET  /jobs/<id>/events     İlerleme olayları (text/event-stream); önceki olaylar da yeniden gönderilir
+    GET  /jobs/<id>/output     Biten işin çıktı dosyası
+    GET  /jobs/<id>/segments/<dosya>
+                               Bölümlü çıktının ("segment_seconds" ayarı) oynatma listesi ve bölümleri; iş sürerken
+                               de alınabilir, oynatıcı listeyi yeniledikçe yeni bölümler eklenir
+    DELETE /jobs/<id>          İşi iptal eder (kuyruktaysa hiç başlamaz)
+    GET  /voices?backend=...   Seslendirme arka ucunun sesleri
+Video ve SRT yolları servisin çalıştığı makinedeki dosyalardır.
+TTS motorları, önbellek ve medya bilgileri süreç ömrü boyunca açık tutulur; işler aynı süreçte çalışır.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import traceback
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+from checkpoint import CancelToken, RenderCancelled
+
+SERVICE_OUTPUT_DIR = "service_output"
+
+# Bir iş için saklanan en fazla olay sayısı; yeni abonelere bu geçmiş yeniden gönderilir
+EVENT_HISTORY = 1000
+
+_READ_CHUNK = 64 * 1024
+
+_SEGMENT_CONTENT_TYPES = {'.m3u8': 'application/vnd.apple.mpegurl', '.ts': 'video/mp2t', '.mp3': 'audio/mpeg'}
+
+_STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                409: "Conflict", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RenderJob:
+    """Kuyruktaki bir render işi; olaylar abonelere asyncio kuyruklarıyla dağıtılır."""
+
+    def __init__(self, job_id, spec, work_dir):
+        self.id = job_id
+        self.spec = spec
+        self.work_dir = work_dir
+        self.status = 'queued'
+        self.output = None
+        self.error = None
+        self.created_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.progress = None
+        self.history = deque(maxlen=EVENT_HISTORY)
+        self.subscribers = set()
+        self.cancel_token = CancelToken()
+
+    def publish(self, event):
+        # İlerleme olayları sık geldiğinden geçmişte yalnızca en sonuncusu tutulur
+        if event['type'] == 'progress':
+            self.progress = event
+        else:
+            self.history.append(event)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(event)
+
+    def finished(self):
+        return self.status in ('done', 'error', 'cancelled')
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.spec['name'], 'status': self.status, 'created_at': self.created_at,
+                'output': self.output, 'error': self.error, 'progress': self.progress}
+
+
+class RenderService:
+    """
+    İşleri sınırlı eş zamanlılıkla çalıştıran kuyruk. merge_audio_with_srt iş parçacığı havuzunda çalışır;
+    olaylar olay döngüsüne call_soon_threadsafe ile aktarılır.
+    """
+
+    def __init__(self, output_dir=SERVICE_OUTPUT_DIR, concurrency=1):
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="render")
+        self.workers = []
+
+    async def start(self, warm_backends=()):
+        os.makedirs(self.output_dir, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        # Ağır modüller ve TTS motorları ilk işi beklemeden ısıtılır
+        await loop.run_in_executor(self.executor, warm_up, list(warm_backends))
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def submit(self, spec):
+        from batch_runner import job_name
+
+        for key in ('video', 'srt'):
+            if not spec.get(key):
+                raise HTTPError(400, f"'{key}' alanı gerekli")
+            if not os.path.isfile(spec[key]):
+                raise HTTPError(400, f"Dosya bulunamadı: {spec[key]}")
+        job_id = uuid.uuid4().hex[:12]
+        spec = dict(spec, name=spec.get('name') or job_id)
+        try:
+            spec['name'] = job_name(spec)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        job = RenderJob(job_id, spec, os.path.join(self.output_dir, job_id))
+        self.jobs[job_id] = job
+        job.publish({'type': 'status', 'status': 'queued'})
+        self.queue.put_nowait(job)
+        return job
+
+    def get(self, job_id):
+        if job_id not in self.jobs:
+            raise HTTPError(404, f"İş bulunamadı: {job_id}")
+        return self.jobs[job_id]
+
+    def cancel(self, job_id):
+        """Kuyruktaki işi hemen, çalışan işi bir sonraki blokta durdurur."""
+        job = self.get(job_id)
+        if job.finished():
+            raise HTTPError(409, f"İş zaten bitti: {job.status}")
+        job.cancel_token.cancel()
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.publish({'type': 'status', 'status': 'cancelled', 'output': None, 'error': None})
+        return job
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.cancel_token.cancelled:
+                self.queue.task_done()
+                continue
+            job.status = 'running'
+            job.publish({'type': 'status', 'status': 'running'})
+
+            def emit(event, job=job):
+                loop.call_soon_threadsafe(job.publish, event)
+
+            try:
+                job.output = await loop.run_in_executor(self.executor, run_service_job, job.spec, job.work_dir,
+                                                        emit, job.cancel_token)
+                job.status = 'done'
+            except RenderCancelled:
+                job.status = 'cancelled'
+            except Exception as e:
+                job.status = 'error'
+                job.error = str(e)
+            job.publish({'type': 'status', 'status': job.status, 'output': job.output, 'error': job.error})
+            self.queue.task_done()
+
+
+def warm_up(backends):
+    """moviepy ve karıştırıcıyı içe aktarır, verilen arka uçların motorlarını başlatır."""
+    import render  # noqa: F401
+    import audio_mixer  # noqa: F401
+    from tts_backends import get_backend
+    for name in backends:
+        try:
+            get_backend(name).list_voices()
+        except Exception as e:
+            print(f"{name} arka ucu başlatılamadı: {e}", file=sys.stderr)
+
+
+def run_service_job(spec, work_dir, emit, cancel_token=None):
+    """İşi iş parçacığında çalıştırır; günlük satırları ve ilerleme olayları emit ile iletilir."""
+    from render import merge_audio_with_srt
+    from batch_runner import job_render_options
+
+    os.makedirs(work_dir, exist_ok=True)
+
+    def log_callback(message):
+        emit({'type': 'log', 'message': message})
+
+    try:
+        options = job_render_options(spec, work_dir)
+        return merge_audio_with_srt(spec['video'], spec['srt'], log_callback=log_callback, progress_callback=emit,
+                                    metrics_path=os.path.join(work_dir, "metrics.json"),
+                                    cancel_token=cancel_token, **options)
+    except RenderCancelled:
+        raise
+    except Exception:
+        log_callback(traceback.format_exc())
+        raise
+
+
+async def read_request(reader):
+    """İstek satırını, başlıkları ve (Content-Length kadar) gövdeyi okur."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('iso-8859-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise HTTPError(400, "Geçersiz istek satırı")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    body = b''
+    if int(headers.get('content-length', 0)):
+        body = await reader.readexactly(int(headers['content-length']))
+    return method.upper(), target, headers, body
+
+
+async def write_response(writer, status, body=b'', content_type='application/json; charset=utf-8', headers=None):
+    lines = [f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}",
+             f"Content-Length: {len(body)}", "Connection: close"]
+    lines += [f"{key}: {value}" for key, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1') + body)
+    await writer.drain()
+
+
+async def write_json(writer, status, data):
+    await write_response(writer, status, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+
+async def stream_events(writer, job):
+    """İşin olaylarını server-sent events olarak gönderir; iş bitince bağlantı kapanır."""
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                 b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+    subscriber = asyncio.Queue()
+    backlog = list(job.history) + ([job.progress] if job.progress else [])
+    job.subscribers.add(subscriber)
+    try:
+        for event in backlog:
+            writer.write(format_sse(event))
+        await writer.drain()
+        while not job.finished():
+            event = await subscriber.get()
+            # Birikmiş ilerleme olaylarından yalnızca sonuncusu gönderilir; yavaş istemciler servisi bekletmez
+            events = [event]
+            while not subscriber.empty():
+                events.append(subscriber.get_nowait())
+            latest_progress = None
+            for event in events:
+                if event['type'] == 'progress':
+                    latest_progress = event
+                else:
+                    writer.write(format_sse(event))
+            if latest_progress:
+                writer.write(format_sse(latest_progress))
+            await writer.drain()
+    finally:
+        job.subscribers.discard(subscriber)
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+async def send_file(writer, path, content_type):
+    size = os.path.getsize(path)
+    headers = {'Content-Disposition': f'attachment; filename="{os.path.basename(path)}"'}
+    lines = ["HTTP/1.1 200 OK", f"Content-Type: {content_type}", f"Content-Length: {size}", "Connection: close"]
+    lines += [f"{key}: {value}" for key, value in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1'))
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+
+
+async def dispatch(service, writer, method, target, body):
+    url = urlsplit(target)
+    parts = [part for part in url.path.split('/') if part]
+
+    if parts == ['jobs']:
+        if method == 'POST':
+            try:
+                spec = json.loads(body or b'{}')
+            except ValueError:
+                raise HTTPError(400, "Gövde geçerli JSON değil")
+            job = service.submit(spec)
+            return await write_json(writer, 202, job.to_dict())
+        if method == 'GET':
+            return await write_json(writer, 200, [job.to_dict() for job in service.jobs.values()])
+        raise HTTPError(405, "Desteklenmeyen yöntem")
+
+    if len(parts) == 2 and parts[0] == 'jobs' and method == 'DELETE':
+        return await write_json(writer, 200, service.cancel(parts[1]).to_dict())
+
+    if len(parts) >= 2 and parts[0] == 'jobs' and method == 'GET':
+        job = service.get(parts[1])
+        if len(parts) == 2:
+            return await write_json(writer, 200, job.to_dict())
+        if parts[2:] == ['events']:
+            return await stream_events(writer, job)
+        if parts[2:] == ['output']:
+            if job.status != 'done':
+                raise HTTPError(409, f"İş henüz bitmedi: {job.status}")
+            content_type = _SEGMENT_CONTENT_TYPES.get(os.path.splitext(job.output)[1]) or \
+                ('audio/mpeg' if job.output.endswith('.mp3') else 'video/mp4')
+            return await send_file(writer, job.output, content_type)
+        if len(parts) == 4 and parts[2] == 'segments':
+            from render import segment_playlist_path
+            segment_dir = os.path.dirname(segment_playlist_path(job.work_dir, job.spec['name']))
+            path = os.path.join(segment_dir, os.path.basename(parts[3]))
+            content_type = _SEGMENT_CONTENT_TYPES.get(os.path.splitext(path)[1])
+            if not content_type or not os.path.isfile(path):
+                raise HTTPError(404, "Bölüm bulunamadı")
+            return await send_file(writer, path, content_type)
+
+    if parts == ['voices'] and method == 'GET':
+        from tts_backends import get_backend
+        backend_name = parse_qs(url.query).get('backend', [None])[0]
+        try:
+            backend = get_backend(backend_name)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        loop = asyncio.get_running_loop()
+        voices = await loop.run_in_executor(None, backend.list_voices)
+        return await write_json(writer, 200, [{'id': voice_id, 'name': name} for voice_id, name in voices])
+
+    raise HTTPError(404, "Bulunamadı")
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            method, target, _, body = await read_request(reader)
+            await dispatch(service, writer, method, target, body)
+        except HTTPError as e:
+            await write_json(writer, e.status, {'error': str(e)})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                await write_json(writer, 500, {'error': str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(host, port, output_dir, concurrency, warm_backends=()):
+    service = RenderService(output_dir, concurrency)
+    await service.start(warm_backends)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"Servis http://{host}:{port} adresinde çalışıyor ({concurrency} eş zamanlı iş).")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    from tts_backends import DEFAULT_BACKEND
+
+    parser = argparse.ArgumentParser(description="Render işlerini HTTP üzerinden kabul eden yerel servis.")
+    parser.add_argument('--host', default="127.0.0.1", help="Dinlenecek adres")
+    parser.add_argument('--port', type=int, default=8765, help="Dinlenecek port")
+    parser.add_argument('--concurrency', type=int, default=1, help="Aynı anda çalışacak iş sayısı")
+    parser.add_argument('--output-dir', default=SERVICE_OUTPUT_DIR, help="İşlerin çalışma dizinlerinin kökü")
+    parser.add_argument('--warm', nargs='*', default=[DEFAULT_BACKEND],
+                        help="Servis açılırken başlatılacak seslendirme arka uçları")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.output_dir, args.concurrency, args.warm))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+
+def parse_time(time_str):
+    hours, minutes, seconds_milliseconds = time_str.split(':')
+    seconds, milliseconds = seconds_milliseconds.replace('.', ',').split(',')
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds), milliseconds=int(milliseconds))
+
+
+def format_time(td):
+    total_seconds = int(td.total_seconds())
+    milliseconds = int(td.microseconds / 1000)
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+
+
+def parse_time_ms(time_str):
+    """"ss:dd:ss,ms" biçimindeki zamanı tam sayı milisaniyeye dönüştürür."""
+    hours, minutes, seconds_milliseconds = time_str.strip().split(':')
+    seconds, milliseconds = seconds_milliseconds.replace('.', ',').split(',')
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(milliseconds)
+
+
+def iter_srt_captions(srt_path):
+    """
+    SRT dosyasını satır satır okuyarak (başlangıç ms, bitiş ms, metin) üçlüleri üretir.
+    UTF-8 BOM, CRLF satır sonları, fazladan boş satırlar ve numarasız bloklar desteklenir.
+    """
+    with open(srt_path, 'r', encoding='utf-8-sig') as f:
+        timing = None
+        text_lines = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                if timing and text_lines:
+                    yield timing[0], timing[1], ' '.join(text_lines)
+                timing = None
+                text_lines = []
+                continue
+            if timing is None:
+                if '-->' in line:
+                    start_str, _, end_str = line.partition('-->')
+                    timing = (parse_time_ms(start_str), parse_time_ms(end_str.split()[0]))
+                # Zaman satırından önceki blok numarası atlanır
+                continue
+            text_lines.append(line)
+        if timing and text_lines:
+            yield timing[0], timing[1], ' '.join(text_lines)
+
+
+def parse_srt_file(srt_path):
+    captions = []
+    for start_ms, end_ms, text in iter_srt_captions(srt_path):
+        captions.append({
+            'start': timedelta(milliseconds=start_ms),
+            'end': timedelta(milliseconds=end_ms),
+            'text': text
+        })
+    return captions
+
+
+def overlapping_range(starts, max_ends, t0, t1):
+    """
+    Başlangıca göre sıralı girişlerde [t0, t1] ile çakışabilecek indeks aralığını (lo, hi) döndürür.
+    max_ends, bitiş zamanlarının önek maksimumudur; bu nedenle aday aralık ikili aramayla bulunur.
+    """
+    lo = bisect_right(max_ends, t0)
+    hi = bisect_left(starts, t1)
+    return lo, max(lo, hi)
+
+
+class CaptionStore:
+    """
+    Altyazıları tam sayı milisaniye dizileri ve tek bir metin arabelleği içinde saklayan sıkışık depo.
+    Altyazılar başlangıç zamanına göre sıralı tutulur. İndekslenince eski parse_srt_file
+    sözlüğü ({'start': timedelta, 'end': timedelta, 'text': str}) döner.
+    """
+
+    def __init__(self, captions=()):
+        rows = list(captions)
+        if any(rows[i][0] > rows[i + 1][0] for i in range(len(rows) - 1)):
+            rows.sort(key=lambda row: row[0])
+        self.start_ms = array('q', (row[0] for row in rows))
+        self.end_ms = array('q', (row[1] for row in rows))
+        self.text_offsets = array('q', [0])
+        texts = []
+        for row in rows:
+            texts.append(row[2])
+            self.text_offsets.append(self.text_offsets[-1] + len(row[2]))
+        self._text = ''.join(texts)
+        self.max_end_ms = array('q')
+        running = 0
+        for end in self.end_ms:
+            running = max(running, end)
+            self.max_end_ms.append(running)
+
+    @classmethod
+    def from_srt(cls, srt_path):
+        return cls(iter_srt_captions(srt_path))
+
+    def __len__(self):
+        return len(self.start_ms)
+
+    def text(self, index):
+        return self._text[self.text_offsets[index]:self.text_offsets[index + 1]]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return {
+            'start': timedelta(milliseconds=self.start_ms[index]),
+            'end': timedelta(milliseconds=self.end_ms[index]),
+            'text': self.text(index)
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def overlapping(self, t0_ms, t1_ms):
+        """[t0_ms, t1_ms) aralığıyla çakışan altyazıların indekslerini döndürür."""
+        lo, hi = overlapping_range(self.start_ms, self.max_end_ms, t0_ms, t1_ms)
+        return [index for index in range(lo, hi) if self.end_ms[index] > t0_ms]
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import shutil
+import asyncio
+import subprocess
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BACKEND = "pyttsx3"
+
+
+class BackendCapabilities:
+    """
+    Bir seslendirme arka ucunun yetenekleri.
+    native_batching: birden fazla metni tek motor turunda seslendirebilir
+    in_memory: sesi dosyaya yazmadan WAV baytları olarak döndürebilir
+    max_parallelism: aynı anda çalıştırılabilecek en fazla seslendirme sayısı
+    """
+
+    def __init__(self, native_batching=False, in_memory=False, max_parallelism=1):
+        self.native_batching = native_batching
+        self.in_memory = in_memory
+        self.max_parallelism = max_parallelism
+
+    def to_dict(self):
+        return {'native_batching': self.native_batching, 'in_memory': self.in_memory,
+                'max_parallelism': self.max_parallelism}
+
+
+class SynthesisBackend:
+    """
+    merge_audio_with_srt'nin kullandığı seslendirme arka ucu arayüzü.
+    Alt sınıflar list_voices, version ve synthesize_many'yi uygular; synthesize_many eş zamanlı çalışabilir.
+    İşler [(metin, dosya adı), ...] listesidir; sonuç seslendirilemeyen işlerin sıralı indeksleridir.
+    """
+
+    name = None
+    capabilities = BackendCapabilities()
+
+    def list_voices(self):
+        """Sesleri (id, ad) çiftleri olarak döndürür."""
+        raise NotImplementedError
+
+    def resolve_voice(self, voice):
+        """Ses adını veya kimliğini ses kimliğine çevirir; bulunamazsa None döner."""
+        for voice_id, name in self.list_voices():
+            if voice in (voice_id, name):
+                return voice_id
+        return None
+
+    def version(self):
+        """Önbellek anahtarına giren motor sürümünü döndürür."""
+        raise NotImplementedError
+
+    async def synthesize_many(self, jobs, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                              progress_callback=None):
+        raise NotImplementedError
+
+    async def synthesize_to_memory(self, text, volume=1.0, rate=200, voice=None):
+        """Metni dosya yazmadan seslendirip WAV baytlarını döndürür (capabilities.in_memory ise)."""
+        raise NotImplementedError(f"{self.name} arka ucu bellek içi seslendirmeyi desteklemiyor")
+
+    async def synthesize_many_to_memory(self, texts, volume=1.0, rate=200, voice=None, workers=1,
+                                        log_callback=None, progress_callback=None):
+        """
+        Metinleri synthesize_to_memory ile en fazla workers eş zamanlı çağrıda seslendirir.
+        Çıkış: metin başına WAV baytları; seslendirilemeyen metinler için None
+        """
+        semaphore = asyncio.Semaphore(max(1, min(workers, self.capabilities.max_parallelism)))
+        total = len(texts)
+        done = [0]
+        results = [None] * total
+
+        async def synthesize_one(index, text):
+            async with semaphore:
+                try:
+                    results[index] = await self.synthesize_to_memory(text, volume, rate, voice)
+                except (OSError, RuntimeError) as e:
+                    if log_callback:
+                        log_callback(f"Hata: {index + 1}. altyazı seslendirilemedi: {e}")
+                    return
+            done[0] += 1
+            if progress_callback:
+                progress_callback(done[0], total)
+            elif log_callback:
+                log_callback(f"{done[0]}/{total}: '{text}' içeriği seslendirildi.")
+
+        await asyncio.gather(*(synthesize_one(index, text) for index, text in enumerate(texts)))
+        return results
+
+    def synthesize(self, jobs, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                   progress_callback=None):
+        """synthesize_many'nin eşzamanlı (bloklayan) sürümü; çalışan bir olay döngüsü içinden çağrılmamalıdır."""
+        return asyncio.run(self.synthesize_many(jobs, volume, rate, voice, workers, log_callback,
+                                                progress_callback))
+
+    def synthesize_in_memory(self, texts, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                             progress_callback=None):
+        """synthesize_many_to_memory'nin eşzamanlı (bloklayan) sürümü."""
+        return asyncio.run(self.synthesize_many_to_memory(texts, volume, rate, voice, workers, log_callback,
+                                                          progress_callback))
+
+
+class Pyttsx3Backend(SynthesisBackend):
+    """
+    pyttsx3 (SAPI5, NSSpeechSynthesizer, eSpeak) arka ucu.
+    Motor iş parçacığına bağlı olduğundan tek süreçte tüm çağrılar aynı iş parçacığında çalışır;
+    workers > 1 ise her biri kendi motorunu açan süreç havuzu kullanılır.
+    """
+
+    name = "pyttsx3"
+    capabilities = BackendCapabilities(native_batching=True, in_memory=False, max_parallelism=os.cpu_count() or 1)
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+
+    def _call(self, function, *args):
+        # list_voices da motoru başlattığından seslendirmeyle aynı iş parçacığında çalıştırılır
+        return self._executor.submit(function, *args).result()
+
+    def list_voices(self):
+        from tts_engine import list_voices
+        return self._call(list_voices)
+
+    def version(self):
+        from tts_engine import get_tts_engine_version
+        return get_tts_engine_version()
+
+    def _synthesize_blocking(self, jobs, volume, rate, voice, workers, log_callback, progress_callback):
+        from tts_engine import text_to_speech_batch, text_to_speech_parallel
+        if workers > 1:
+            return text_to_speech_parallel(jobs, min(workers, self.capabilities.max_parallelism), volume, rate,
+                                           voice, log_callback, progress_callback)
+        text_to_speech_batch(jobs, volume, rate, voice, log_callback, progress_callback)
+        return [index for index, (_, filename) in enumerate(jobs) if not os.path.exists(filename)]
+
+    async def synthesize_many(self, jobs, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                              progress_callback=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._synthesize_blocking, jobs, volume, rate, voice,
+                                          workers, log_callback, progress_callback)
+
+
+def get_espeak_binary():
+    """PATH'teki espeak-ng (yoksa espeak) programının yolunu döndürür; bulunamazsa None."""
+    return shutil.which('espeak-ng') or shutil.which('espeak')
+
+
+class EspeakBackend(SynthesisBackend):
+    """
+    espeak-ng komut satırı arka ucu. Her metin ayrı bir süreçte seslendirildiğinden
+    workers kadar süreç gerçekten eş zamanlı çalışır; ses stdout'tan doğrudan belleğe de alınabilir.
+    """
+
+    name = "espeak-ng"
+    capabilities = BackendCapabilities(native_batching=False, in_memory=True, max_parallelism=os.cpu_count() or 1)
+
+    def __init__(self, binary=None):
+        self.binary = binary or get_espeak_binary()
+
+    def _require_binary(self):
+        if not self.binary:
+            raise RuntimeError("espeak-ng bulunamadı; PATH'e eklenmeli")
+        return self.binary
+
+    @functools.lru_cache(maxsize=1)
+    def list_voices(self):
+        output = subprocess.run([self._require_binary(), '--voices'], check=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL).stdout.decode('utf-8', errors='replace')
+        voices = []
+        # Sütunlar: Pty Language Age/Gender VoiceName File Other Languages
+        for line in output.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) >= 5:
+                # -v dil kodunu kabul eder; kimlik olarak dil kodu kullanılır
+                voices.append((fields[1], f"{fields[3]} ({fields[1]})"))
+        return tuple(voices)
+
+    @functools.lru_cache(maxsize=1)
+    def version(self):
+        output = subprocess.run([self._require_binary(), '--version'], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL).stdout.decode('utf-8', errors='replace')
+        match = re.search(r'(\d+(?:\.\d+)+)', output)
+        return f"espeak-ng-{match.group(1) if match else 'unknown'}-{sys.platform}"
+
+    def _command(self, text, volume, rate, voice, output):
+        # espeak-ng hızı pyttsx3 gibi dakikadaki kelime, genliği 0-200 aralığında (100 varsayılan) alır
+        command = [self._require_binary(), '-s', str(int(rate)), '-a', str(int(round(volume * 100)))]
+        if voice:
+            command += ['-v', voice]
+        command += ['--stdout'] if output is None else ['-w', output]
+        # Metin '-' ile başlasa bile seçenek sayılmaması için standart girişten verilir
+        return command + ['--stdin']
+
+    async def _run(self, text, volume, rate, voice, output=None):
+        process = await asyncio.create_subprocess_exec(*self._command(text, volume, rate, voice, output),
+                                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                                       stderr=subprocess.PIPE)
+        stdout, stderr = await process.communicate(text.encode('utf-8'))
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8', errors='replace').strip() or f"çıkış kodu {process.returncode}")
+        return stdout
+
+    async def synthesize_to_memory(self, text, volume=1.0, rate=200, voice=None):
+        return await self._run(text, volume, rate, voice)
+
+    async def synthesize_many(self, jobs, volume=1.0, rate=200, voice=None, workers=1, log_callback=None,
+                              progress_callback=None):
+        semaphore = asyncio.Semaphore(max(1, min(workers, self.capabilities.max_parallelism)))
+        total = len(jobs)
+        done = [0]
+        failed = []
+
+        async def synthesize_one(index, text, filename):
+            async with semaphore:
+                try:
+                    await self._run(text, volume, rate, voice, filename)
+                except (OSError, RuntimeError) as e:
+                    failed.append(index)
+                    if log_callback:
+                        log_callback(f"Hata: {index + 1}. altyazı seslendirilemedi: {e}")
+                    return
+            done[0] += 1
+            if progress_callback:
+                progress_callback(done[0], total)
+            elif log_callback:
+                log_callback(f"{done[0]}/{total}: '{text}' içeriği seslendirildi.")
+
+        await asyncio.gather(*(synthesize_one(index, text, filename)
+                               for index, (text, filename) in enumerate(jobs)))
+        return sorted(failed)
+
+
+BACKENDS = {
+    Pyttsx3Backend.name: Pyttsx3Backend,
+    EspeakBackend.name: EspeakBackend
+}
+
+_backend_instances = {}
+
+
+def get_backend(backend=None):
+    """
+    Arka uç adını (veya zaten bir SynthesisBackend nesnesini) paylaşılan arka uç nesnesine çevirir.
+    Motorlar süreç başına bir kez oluşturulur.
+    """
+    if isinstance(backend, SynthesisBackend):
+        return backend
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Bilinmeyen seslendirme arka ucu: {name}")
+    if name not in _backend_instances:
+        _backend_instances[name] = BACKENDS[name]()
+    return _backend_instances[name]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import tempfile
+import unicodedata
+
+# Seslendirme önbelleğinin varsayılan konumu ve boyut sınırı
+TTS_CACHE_DIR = os.path.join("conversion", "tts_cache")
+TTS_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def normalize_text(text):
+    """Önbellek anahtarı için metni Unicode NFC biçimine getirir ve boşlukları sadeleştirir."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def evict_oldest(cache_dir, max_bytes, keep=()):
+    """
+    Dizindeki .wav dosyalarının toplam boyutu max_bytes değerini aşıyorsa, keep içindekiler hariç en uzun
+    süredir kullanılmayanları siler. Kalan toplam boyutu ve silinen dosyaların yollarını döndürür.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.is_file() or not entry.name.endswith('.wav'):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    entries.sort()
+    removed = []
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+            removed.append(path)
+        except OSError:
+            pass
+    return total, removed
+
+
+class TTSCache:
+    """
+    Seslendirilmiş WAV dosyalarını (metin, ses, hız, motor sürümü) özetine göre saklayan disk önbelleği.
+    Dosyalar atomik olarak yazılır; boyut sınırı aşıldığında en uzun süredir kullanılmayanlar silinir.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, text, voice, rate, engine_version):
+        payload = json.dumps([normalize_text(text), voice, rate, engine_version], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key):
+        """Önbellekteki dosyanın yolunu döndürür, yoksa None. Erişim zamanı LRU için güncellenir."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def temp_path(self):
+        """Önbellek dizininde, commit() ile yerine taşınacak geçici bir dosya yolu oluşturur."""
+        fd, path = tempfile.mkstemp(suffix='.wav.tmp', dir=self.cache_dir)
+        os.close(fd)
+        return path
+
+    def commit(self, key, temp_path):
+        """Geçici dosyayı atomik olarak önbellekteki yerine taşır ve yeni yolu döndürür."""
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        return path
+
+    def evict(self, keep=()):
+        """Toplam boyut max_bytes değerini aşıyorsa, keep içindekiler hariç en eski dosyaları siler."""
+        return evict_oldest(self.cache_dir, self.max_bytes, keep)[0]
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import math
+import importlib.metadata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import functools
+
+# Bir seslendirme turunda motor kuyruğuna eklenecek en fazla altyazı sayısı
+TTS_BATCH_SIZE = 200
+
+# Tüm seslendirmeler için açık tutulan TTS motoru
+_tts_engine = None
+
+
+def get_tts_engine():
+    """Paylaşılan TTS motorunu döndürür; motor yalnızca ilk çağrıda başlatılır."""
+    global _tts_engine
+    if _tts_engine is None:
+        import pyttsx3
+        _tts_engine = pyttsx3.init()
+    return _tts_engine
+
+
+@functools.lru_cache(maxsize=1)
+def list_voices():
+    """Sistemdeki sesleri (id, ad) çiftleri olarak döndürür; liste süreç başına bir kez okunur."""
+    return tuple((voice.id, voice.name) for voice in get_tts_engine().getProperty('voices'))
+
+
+def resolve_voice(voice):
+    """Ses adını veya kimliğini ses kimliğine çevirir; bulunamazsa None döner."""
+    for voice_id, name in list_voices():
+        if voice in (voice_id, name):
+            return voice_id
+    return None
+
+
+def text_to_speech_batch(jobs, volume=1.0, rate=200, voice=None, log_callback=None, progress_callback=None):
+    """
+    Birden fazla metni tek bir TTS motoruyla ayrı WAV dosyalarına dönüştürür.
+    Giriş: jobs ([(metin, dosya adı), ...]), volume, rate, voice, log_callback,
+    progress_callback ((tamamlanan, toplam) alır; verilirse altyazı başına günlük satırı yazılmaz)
+    Her TTS_BATCH_SIZE iş kuyruğa eklenir ve olay döngüsü parti başına bir kez çalıştırılır.
+    """
+    engine = get_tts_engine()
+    if voice:
+        engine.setProperty('voice', voice)
+    engine.setProperty('volume', volume)
+    engine.setProperty('rate', rate)
+
+    total = len(jobs)
+    done = [0]
+
+    def on_finished(name, completed):
+        done[0] += 1
+        if progress_callback:
+            progress_callback(done[0], total)
+        elif log_callback:
+            index = int(name)
+            log_callback(f"{index + 1}/{total}: '{jobs[index][0]}' içeriği seslendirildi.")
+
+    token = engine.connect('finished-utterance', on_finished)
+    try:
+        for batch_start in range(0, total, TTS_BATCH_SIZE):
+            for index in range(batch_start, min(batch_start + TTS_BATCH_SIZE, total)):
+                text, filename = jobs[index]
+                engine.save_to_file(text, filename, name=str(index))
+            engine.runAndWait()
+    finally:
+        engine.disconnect(token)
+
+
+def text_to_speech(text, filename, volume=1.0, rate=200, voice=None):
+    text_to_speech_batch([(text, filename)], volume, rate, voice)
+
+
+def get_tts_engine_version():
+    """Önbellek anahtarına giren TTS motoru sürümünü döndürür."""
+    try:
+        version = importlib.metadata.version('pyttsx3')
+    except importlib.metadata.PackageNotFoundError:
+        version = 'unknown'
+    return f"pyttsx3-{version}-{sys.platform}"
+
+
+def _synthesize_shard(shard, volume, rate, voice):
+    """İşçi süreçte bir parça altyazıyı o sürecin kendi TTS motoruyla seslendirir."""
+    text_to_speech_batch([(text, filename) for _, text, filename in shard], volume, rate, voice)
+    missing = [filename for _, _, filename in shard if not os.path.exists(filename)]
+    if missing:
+        raise RuntimeError(f"{len(missing)} ses dosyası oluşturulamadı")
+    return [index for index, _, _ in shard]
+
+
+def _run_shards(shards, workers, volume, rate, voice, on_shard_done):
+    """Parçaları süreç havuzunda çalıştırır; çöken havuz yüzünden tamamlanamayan parçaları döndürür."""
+    broken = []
+    failed = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(_synthesize_shard, shard, volume, rate, voice): shard for shard in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                future.result()
+            except BrokenProcessPool:
+                broken.append(shard)
+                continue
+            except Exception as e:
+                failed.append((shard, e))
+                continue
+            on_shard_done(shard)
+    return broken, failed
+
+
+def text_to_speech_parallel(jobs, workers, volume=1.0, rate=200, voice=None, log_callback=None,
+                            progress_callback=None):
+    """
+    Metinleri süreç havuzunda paralel olarak seslendirir; her işçi kendi TTS motorunu kullanır.
+    Giriş: jobs ([(metin, dosya adı), ...]), workers (süreç sayısı), volume, rate, voice, log_callback,
+    progress_callback (text_to_speech_batch ile aynı)
+    Çıkış: seslendirilemeyen işlerin indeksleri (sıralı liste)
+    Bir işçinin çökmesi yalnızca kendi parçasını başarısız kılar.
+    """
+    total = len(jobs)
+    if total == 0:
+        return []
+    # Yükü dengelemek için her işçiye birden fazla küçük parça düşer
+    shard_size = max(1, min(TTS_BATCH_SIZE, math.ceil(total / (workers * 4))))
+    indexed = [(index, text, filename) for index, (text, filename) in enumerate(jobs)]
+    shards = [indexed[i:i + shard_size] for i in range(0, total, shard_size)]
+    done = [0]
+
+    def on_shard_done(shard):
+        for index, text, _ in shard:
+            done[0] += 1
+            if not progress_callback and log_callback:
+                log_callback(f"{done[0]}/{total}: '{text}' içeriği seslendirildi.")
+        if progress_callback:
+            progress_callback(done[0], total)
+
+    broken, failed = _run_shards(shards, workers, volume, rate, voice, on_shard_done)
+
+    # Havuz çöktüğünde bekleyen parçalar da başarısız sayıldığından önce hepsi yeni bir havuzda yeniden denenir.
+    # İkinci kez çökmeye denk gelenler, paralellik korunarak yarıya bölünüp ayrı havuzlarda denenir; çöken parça her
+    # bölünmede çökmeye denk gelenler arasında kaldığından sonunda tek başına kalır ve seslendirilemedi sayılır
+    if broken:
+        broken, retry_failed = _run_shards(broken, workers, volume, rate, voice, on_shard_done)
+        failed.extend(retry_failed)
+    groups = [broken] if broken else []
+    while groups:
+        group = groups.pop()
+        if len(group) == 1:
+            failed.append((group[0], BrokenProcessPool("TTS işçi süreci beklenmedik şekilde sonlandı")))
+            continue
+        half = len(group) // 2
+        for part in (group[:half], group[half:]):
+            part_broken, part_failed = _run_shards(part, workers, volume, rate, voice, on_shard_done)
+            failed.extend(part_failed)
+            if part_broken:
+                groups.append(part_broken)
+
+    failed_indices = []
+    for shard, error in failed:
+        if log_callback:
+            log_callback(f"Hata: {shard[0][0] + 1}-{shard[-1][0] + 1} arasındaki altyazılar seslendirilemedi: {error}")
+        failed_indices.extend(index for index, _, _ in shard)
+    return sorted(failed_indices)
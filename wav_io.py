@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import io
+import struct
+import numpy as np
+
+
+def read_wav_header(path):
+    """
+    WAV dosyasının RIFF başlığını okur; ses verisinin kendisi okunmaz.
+    path yerine bellekteki WAV baytları da verilebilir; data_offset bu durumda baytların içindeki konumdur.
+    Çıkış: {'channels', 'sample_rate', 'sample_width', 'data_offset', 'frames', 'duration'}
+    """
+    in_memory = isinstance(path, (bytes, bytearray))
+    with (io.BytesIO(path) if in_memory else open(path, 'rb')) as f:
+        if in_memory:
+            path = "<bellek>"
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"Geçerli bir WAV dosyası değil: {path}")
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"WAV dosyasında veri bölümü bulunamadı: {path}")
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"WAV dosyasında fmt bölümü veri bölümünden sonra: {path}")
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+        f.seek(0, 2)
+        file_size = f.tell()
+
+    _, channels, sample_rate, _, block_align, bits = fmt
+    # Akış halinde yazılan dosyalarda başlıktaki boyut 0 veya hatalı olabilir; dosya boyutu esas alınır
+    data_size = file_size - data_offset
+    if 0 < chunk_size <= data_size:
+        data_size = chunk_size
+    frames = data_size // block_align
+    return {
+        'channels': channels,
+        'sample_rate': sample_rate,
+        'sample_width': bits // 8,
+        'data_offset': data_offset,
+        'frames': frames,
+        'duration': frames / sample_rate if sample_rate else 0.0
+    }
+
+
+def wav_bytes_samples(data):
+    """Bellekteki 16 bit PCM WAV baytlarının örneklerini (kare, kanal) biçiminde kopyalamadan döndürür."""
+    header = read_wav_header(data)
+    if header['sample_width'] != 2:
+        raise ValueError("Yalnızca 16 bit PCM WAV destekleniyor: <bellek>")
+    return np.frombuffer(data, dtype='<i2', count=header['frames'] * header['channels'],
+                         offset=header['data_offset']).reshape(-1, header['channels'])
+
+
+def open_wav_memmap(path, mode='r'):
+    """16 bit PCM WAV dosyasının örneklerini (kare, kanal) biçiminde bellek eşlemeli dizi olarak açar."""
+    header = read_wav_header(path)
+    if header['sample_width'] != 2:
+        raise ValueError(f"Yalnızca 16 bit PCM WAV destekleniyor: {path}")
+    return np.memmap(path, dtype='<i2', mode=mode, offset=header['data_offset'],
+                     shape=(header['frames'], header['channels']))
+
+
+def write_wav_header(f, channels, sample_rate, frames, sample_width=2):
+    """Dosyanın başına 44 baytlık standart PCM WAV başlığını yazar."""
+    data_size = frames * channels * sample_width
+    f.write(struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels,
+                        sample_rate, sample_rate * channels * sample_width, channels * sample_width,
+                        sample_width * 8, b'data', data_size))
+
+
+def quantize(samples, sample_width=2):
+    """[-1, 1] aralığındaki örnekleri moviepy'nin yaptığı gibi kırparak tam sayı PCM'e çevirir."""
+    samples = np.maximum(-0.99, np.minimum(0.99, samples))
+    inttype = {1: 'int8', 2: 'int16', 4: 'int32'}[sample_width]
+    return (2 ** (8 * sample_width - 1) * samples).astype(inttype)